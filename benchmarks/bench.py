@@ -0,0 +1,262 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Performance benchmarks for the iolink ports.
+
+Run them from the root of the repository, e.g. against the simulated port::
+
+    python -m benchmarks.bench --interface sim --output results.json
+
+The results are written as JSON so that they can be compared between releases.
+"""
+
+import iolink
+from iolink.cyclic import CyclicPdEngine
+from iolink.instrument import LatencyHistogram
+from iolink.interfaces.sim.sim import SimDevice
+from iolink.manager import PortManager
+from iolink.misc import available_interfaces
+from iolink.port import PortWrapper
+from iolink.worker import PortWorker
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+
+
+def sim_port_kwargs():
+    device = SimDevice(pd_in_length=13, pd_out_length=9, parameters={0x51: bytes([0, 32])}, isdu_latency=0.005)
+    return {'device': device}
+
+
+def port_kwargs_for(options, count=1):
+    """Returns the keyword arguments of `count` ports, one set of --port-kwargs for each port."""
+    if options.interface == 'sim':
+        return [sim_port_kwargs() for _ in range(count)]
+    port_kwargs = options.port_kwargs or [{}]
+    if len(port_kwargs) < count:
+        raise ValueError('{} ports need {} sets of --port-kwargs, got {}'.format(count, count, len(port_kwargs)))
+    return [dict(kwargs) for kwargs in port_kwargs[:count]]
+
+
+def timed_loop(func, duration):
+    """Calls func repeatedly for about `duration` seconds and returns the calls per second."""
+    calls = 0
+    batch = 100
+    start = time.perf_counter()
+    end = start + duration
+    while True:
+        for _ in range(batch):
+            func()
+        calls += batch
+        now = time.perf_counter()
+        if now >= end:
+            return calls / (now - start)
+
+
+def bench_pd_rate(port, options):
+    buf = memoryview(bytearray(64))
+    output = bytes(options.pd_out_length)
+    return {
+        'get_device_pd_input_and_status_per_s': timed_loop(port.get_device_pd_input_and_status, options.duration),
+        'get_device_pd_input_into_per_s': timed_loop(lambda: port.get_device_pd_input_into(buf), options.duration),
+        'set_device_pd_output_per_s': timed_loop(lambda: port.set_device_pd_output(output), options.duration),
+    }
+
+
+def bench_isdu_latency(port, options):
+    results = {}
+    operations = [('read', lambda: port.read_device_isdu(options.isdu_index, 0))]
+    if options.isdu_write_data is not None:
+        data = bytes.fromhex(options.isdu_write_data)
+        operations.append(('write', lambda: port.write_device_isdu(options.isdu_index, 0, data)))
+    for name, operation in operations:
+        histogram = LatencyHistogram()
+        end = time.perf_counter() + options.duration
+        while time.perf_counter() < end:
+            start = time.perf_counter_ns()
+            operation()
+            histogram.record(time.perf_counter_ns() - start)
+        results[name + '_ns'] = histogram.snapshot()
+    return results
+
+
+def bench_isdu_batch(port, options):
+    items = [(options.isdu_index, 0)] * options.batch_size
+    sequential = timed_loop(lambda: [port.read_device_isdu(index, subindex) for index, subindex in items],
+                            options.duration)
+    batched = timed_loop(lambda: port.read_device_isdu_many(items), options.duration)
+    return {
+        'batch_size': options.batch_size,
+        'sequential_items_per_s': sequential * options.batch_size,
+        'batched_items_per_s': batched * options.batch_size,
+    }
+
+
+class _CycleTimer(PortWrapper):
+    """Records the time of every process data read."""
+
+    def __init__(self, port):
+        super().__init__(port)
+        self.times = []
+
+    def get_device_pd_input_into(self, buf):
+        self.times.append(time.perf_counter())
+        return self.port.get_device_pd_input_into(buf)
+
+
+def _load(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def bench_jitter(port, options):
+    results = {}
+    for load_threads in (0, options.load_threads):
+        timer = _CycleTimer(port)
+        stop = threading.Event()
+        threads = [threading.Thread(target=_load, args=(stop,), daemon=True) for _ in range(load_threads)]
+        for thread in threads:
+            thread.start()
+        with CyclicPdEngine(timer, options.cycle_time) as engine:
+            time.sleep(options.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        histogram = LatencyHistogram()
+        intervals = [b - a for a, b in zip(timer.times, timer.times[1:])]
+        for interval in intervals:
+            histogram.record(int(abs(interval - options.cycle_time) * 1e9))
+        results['load_threads_{}'.format(load_threads)] = {
+            'cycle_time_s': options.cycle_time,
+            'cycles': len(timer.times),
+            'overruns': engine.overruns,
+            'mean_interval_s': sum(intervals) / len(intervals) if intervals else 0,
+            'deviation_ns': histogram.snapshot(),
+        }
+    return results
+
+
+def bench_allocations(port, options):
+    buf = memoryview(bytearray(64))
+    cycles = 10_000
+    results = {}
+    for name, operation in (('get_device_pd_input_and_status', port.get_device_pd_input_and_status),
+                            ('get_device_pd_input_into', lambda: port.get_device_pd_input_into(buf))):
+        operation()
+        gc.collect()
+        gc.disable()
+        tracemalloc.start()
+        blocks = sys.getallocatedblocks()
+        for _ in range(cycles):
+            operation()
+        blocks = sys.getallocatedblocks() - blocks
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        gc.enable()
+        results[name] = {'retained_blocks_per_cycle': blocks / cycles, 'peak_traced_bytes': peak}
+    return results
+
+
+def bench_multi_port(options):
+    results = {}
+    for count in options.port_counts:
+        with PortManager(options.interface, port_kwargs_for(options, count)) as manager:
+            manager.change_device_state_to('Operate')
+            rate = timed_loop(manager.get_pd_all, options.duration)
+        results['ports_{}'.format(count)] = {'ports': count, 'frames_per_s': rate * count}
+    return results
+
+
+def bench_multi_process(options):
+    results = {}
+    for count in options.port_counts:
+        workers = [PortWorker(options.interface, [kwargs], cycle_time=0) for kwargs in port_kwargs_for(options, count)]
+        try:
+            for worker in workers:
+                worker.start()
+                worker.ports[0].change_device_state_to('Operate')
+            start = [worker.ports[0].snapshot().cycle for worker in workers]
+            time.sleep(options.duration)
+            end = [worker.ports[0].snapshot().cycle for worker in workers]
+        finally:
+            for worker in workers:
+                worker.stop()
+        results['ports_{}'.format(count)] = {
+            'ports': count,
+            'frames_per_s': (sum(end) - sum(start)) / options.duration,
+        }
+    return results
+
+
+def run(options):
+    results = {}
+    with iolink.get_port(options.interface, **port_kwargs_for(options)[0]) as port:
+        port.change_device_state_to('Operate')
+        results['pd_rate'] = bench_pd_rate(port, options)
+        results['allocations'] = bench_allocations(port, options)
+        results['isdu_latency'] = bench_isdu_latency(port, options)
+        results['isdu_batch'] = bench_isdu_batch(port, options)
+        results['jitter'] = bench_jitter(port, options)
+    results['multi_port'] = bench_multi_port(options)
+    results['multi_process'] = bench_multi_process(options)
+    return {
+        'meta': {
+            'iolink_version': iolink.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'interface': options.interface,
+            'cpus': os.cpu_count(),
+            'duration_s': options.duration,
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        'results': results,
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--interface', default='sim', choices=sorted(available_interfaces))
+    parser.add_argument('--port-kwargs', type=json.loads, action='append', default=[],
+                        help='JSON object with the keyword arguments of a port, e.g. \'{"com_port": "COM3"}\', '
+                             'given once for each port of the multi-port measurements')
+    parser.add_argument('--duration', type=float, default=1.0, help='duration of each measurement in seconds')
+    parser.add_argument('--cycle-time', type=float, default=0.001, help='cycle time for the jitter measurement')
+    parser.add_argument('--load-threads', type=int, default=2, help='threads that load the CPU during the jitter measurement')
+    parser.add_argument('--pd-out-length', type=int, default=9, help='length of the output process data of the device')
+    parser.add_argument('--isdu-index', type=lambda s: int(s, 0), default=0x51, help='parameter used for ISDU measurements')
+    parser.add_argument('--isdu-write-data', default='0020', help='hex data written to the parameter, empty to skip writes')
+    parser.add_argument('--batch-size', type=int, default=40)
+    parser.add_argument('--port-counts', type=lambda s: [int(n) for n in s.split(',')], default=[1, 2, 4, 8])
+    parser.add_argument('--output', help='file for the JSON results, stdout if omitted')
+    options = parser.parse_args(args)
+    if not options.isdu_write_data:
+        options.isdu_write_data = None
+    if options.interface != 'sim' and max(len(options.port_kwargs), 1) < max(options.port_counts):
+        parser.error('--port-counts up to {} needs --port-kwargs for each of the ports, got {}'.format(
+            max(options.port_counts), len(options.port_kwargs)))
+
+    results = run(options)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Per-call overhead of the ctypes layer of the iqLink port.
+
+Builds the stub library from ``iqcomm_stub.c`` with the C compiler ``cc`` and
+compares the calls of :class:`IqLinkPort` with the untyped calls that the port
+used to make, which wrapped every length and return value in a new ctypes
+object::
+
+    python -m benchmarks.bench_iqcomm --output results.json
+"""
+
+from iolink.interfaces.iqlink import iqlink
+
+import argparse
+import ctypes
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+
+STUB_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'iqcomm_stub.c')
+
+
+def build_stub(directory, compiler='cc'):
+    """Compiles the stub library into `directory` and returns its path."""
+    path = os.path.join(directory, 'libiqcomm_stub.so')
+    subprocess.run([compiler, '-shared', '-fPIC', '-O2', '-o', path, STUB_SOURCE], check=True)
+    return path
+
+
+class LegacyCalls:
+    """The process data calls as the first releases of IqLinkPort made them, without prototypes."""
+
+    def __init__(self, path, port):
+        self._lib = ctypes.cdll.LoadLibrary(path)
+        self._port = ctypes.c_int16(port)
+        self._error_msg_buffer = ctypes.create_string_buffer(256)
+
+    def get_device_pd_input_and_status(self):
+        status = ctypes.c_uint8()
+        pd_data_buffer = ctypes.create_string_buffer(64)
+        ret = self._lib.mst_GetStatus(self._port,
+                                      ctypes.byref(status),
+                                      pd_data_buffer,
+                                      ctypes.c_uint16(len(pd_data_buffer)),
+                                      self._error_msg_buffer)
+        ret = ctypes.c_int16(ret)
+        if ret.value < 0:
+            raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
+        return pd_data_buffer[:ret.value], status
+
+    def set_device_pd_output(self, data):
+        ret = self._lib.mst_SetPDValue(self._port, data, ctypes.c_uint16(len(data)), self._error_msg_buffer)
+        ret = ctypes.c_int16(ret)
+        if ret.value < 0:
+            raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
+        ret = self._lib.mst_SetPDValidity(self._port, 1, self._error_msg_buffer)
+        ret = ctypes.c_int16(ret)
+        if ret.value < 0:
+            raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
+
+
+def per_call_ns(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def run(options):
+    with tempfile.TemporaryDirectory() as directory:
+        path = build_stub(directory, options.compiler)
+        os.environ['IOLINK_IQCOMM_LIB'] = path
+        iqlink._iqcomm_lib = None
+        port = iqlink.IqLinkPort()
+        port.change_device_state_to('Operate')
+        legacy = LegacyCalls(path, port._port.value)
+        output = bytes(options.pd_out_length)
+        outputs = itertools.cycle([bytes(options.pd_out_length), bytes([1] * options.pd_out_length)])
+        buf = bytearray(64)
+        items = [(0x10, 0)] * 10
+        ctypes.cdll.LoadLibrary(path).stub_set_parameter(0x10, b'stub', 4)
+
+        operations = {
+            'get_device_pd_input_and_status': (legacy.get_device_pd_input_and_status,
+                                               port.get_device_pd_input_and_status),
+            'set_device_pd_output': (lambda: legacy.set_device_pd_output(output),
+                                     lambda: port.set_device_pd_output(output)),
+            'set_device_pd_output_changing': (lambda: legacy.set_device_pd_output(next(outputs)),
+                                              lambda: port.set_device_pd_output(next(outputs))),
+            'get_device_pd_input_into': (None, lambda: port.get_device_pd_input_into(buf)),
+            'read_device_isdu_many_10': (None, lambda: port.read_device_isdu_many(items)),
+        }
+        results = {name: {'legacy_ns': [], 'current_ns': []} for name in operations}
+        # interleave the measurements, so that both suffer the same disturbances
+        for _ in range(options.rounds):
+            for name, (legacy_call, current_call) in operations.items():
+                if legacy_call is not None:
+                    results[name]['legacy_ns'].append(per_call_ns(legacy_call, options.number, 3))
+                results[name]['current_ns'].append(per_call_ns(current_call, options.number, 3))
+        port.shut_down()
+
+    for result in results.values():
+        for key in ('legacy_ns', 'current_ns'):
+            result[key] = min(result[key]) if result[key] else None
+        if result['legacy_ns']:
+            result['speedup'] = result['legacy_ns'] / result['current_ns']
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'number': options.number,
+            'rounds': options.rounds,
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        'results': results,
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--compiler', default='cc')
+    parser.add_argument('--number', type=int, default=100_000, help='calls per measurement')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--pd-out-length', type=int, default=13)
+    parser.add_argument('--output', help='file for the JSON results, stdout if omitted')
+    options = parser.parse_args(args)
+
+    results = run(options)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+/*******************************************************************************
+ * Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+ * This software is proprietary to Analog Devices, Inc. and its licensors.
+ *******************************************************************************
+ *
+ * Stand-in for the iqcomm library, to measure and test the ctypes layer of
+ * IqLinkPort without an iqLink. The output process data is looped back to the
+ * input and ISDU parameters are kept in a table.
+ *
+ * Build it with:
+ *     cc -shared -fPIC -O2 -o libiqcomm_stub.so iqcomm_stub.c
+ */
+
+#include <stdbool.h>
+#include <stdint.h>
+#include <string.h>
+
+#define PD_MAX_LEN 32
+#define ISDU_MAX_LEN 232
+
+int stub_connected = 1;
+/* COM port of the master, 0 to find it on any port */
+int stub_com_port = 0;
+int stub_last_connect_com_port = -1;
+int stub_connect_calls = 0;
+int stub_set_pd_value_calls = 0;
+int stub_set_pd_validity_calls = 0;
+int stub_get_status_calls = 0;
+int stub_start_read_od_calls = 0;
+
+typedef struct {
+    uint16_t stackVersion;
+    uint16_t cycleTimeOperate;
+    uint16_t restOfCycleTimeOperate;
+    int revisionID;
+    int inspectionLevel;
+    uint32_t deviceVendorID;
+    uint32_t deviceID;
+    uint16_t deviceFunctionID;
+    uint8_t deviceSerialNumber[17];
+    uint8_t deviceSerialNumberLen;
+    int realBaudrate;
+    int dsActivState;
+    bool dsUploadEnable;
+    bool dsDownloadEnable;
+} mst_ConfigT;
+
+mst_ConfigT stub_config = {
+    .revisionID = 0x11,
+    .deviceVendorID = 0x0362,
+    .deviceID = 0x000107,
+    .deviceFunctionID = 0x0002,
+    .deviceSerialNumber = "SN0042",
+    .deviceSerialNumberLen = 6,
+};
+
+static uint8_t pd[PD_MAX_LEN];
+static uint16_t pd_len = 13;
+static uint8_t pd_valid = 0;
+static uint8_t state = 0;
+
+static uint8_t isdu_data[256][ISDU_MAX_LEN];
+static uint16_t isdu_len[256];
+static uint16_t pending_index;
+static uint8_t pending_data[ISDU_MAX_LEN];
+static uint16_t pending_len;
+
+static int16_t link_lost(char *error_msg)
+{
+    strcpy(error_msg, "Link lost");
+    return -1;
+}
+
+void stub_set_parameter(uint16_t index, const uint8_t *data, uint16_t len)
+{
+    memcpy(isdu_data[index & 0xFF], data, len);
+    isdu_len[index & 0xFF] = len;
+}
+
+int16_t mst_GetVersion(uint16_t *major, uint16_t *minor, char *error_msg)
+{
+    *major = 2;
+    *minor = 0;
+    return 0;
+}
+
+int16_t mst_Connect(uint8_t first_com_port, uint8_t last_com_port, char *error_msg)
+{
+    stub_connect_calls++;
+    stub_last_connect_com_port = first_com_port;
+    if (stub_com_port) {
+        if (stub_com_port < first_com_port || stub_com_port > last_com_port) {
+            strcpy(error_msg, "No master found");
+            return -1;
+        }
+        return stub_com_port;
+    }
+    return first_com_port ? first_com_port : 1;
+}
+
+int16_t mst_Disconnect(int16_t port, char *error_msg)
+{
+    return 0;
+}
+
+int16_t mst_PowerControl(int16_t port, uint8_t on, char *error_msg)
+{
+    if (!on)
+        state = 0;
+    return 0;
+}
+
+int16_t mst_SetOperatingMode(int16_t port, uint8_t mode, uint8_t expected_state, uint8_t *actual_state, char *error_msg)
+{
+    if (!stub_connected)
+        return link_lost(error_msg);
+    state = mode;
+    *actual_state = mode;
+    return 0;
+}
+
+int16_t mst_GetStatus(int16_t port, uint8_t *status, char *data, uint16_t len, char *error_msg)
+{
+    stub_get_status_calls++;
+    if (!stub_connected)
+        return link_lost(error_msg);
+    *status = state == 5 && pd_valid;
+    if (len > pd_len)
+        len = pd_len;
+    memcpy(data, pd, len);
+    return len;
+}
+
+int16_t mst_SetPDValue(int16_t port, const char *data, uint16_t len, char *error_msg)
+{
+    stub_set_pd_value_calls++;
+    if (!stub_connected)
+        return link_lost(error_msg);
+    if (len > PD_MAX_LEN)
+        len = PD_MAX_LEN;
+    memcpy(pd, data, len);
+    return 0;
+}
+
+int16_t mst_SetPDValidity(int16_t port, uint8_t valid, char *error_msg)
+{
+    stub_set_pd_validity_calls++;
+    if (!stub_connected)
+        return link_lost(error_msg);
+    pd_valid = valid;
+    return 0;
+}
+
+int16_t mst_GetConfig(int16_t port, mst_ConfigT *config, char *error_msg)
+{
+    if (!stub_connected)
+        return link_lost(error_msg);
+    *config = stub_config;
+    return 0;
+}
+
+int16_t mst_StartReadOD(int16_t port, uint16_t index, uint8_t subindex, char *error_msg)
+{
+    stub_start_read_od_calls++;
+    pending_index = index & 0xFF;
+    return 0;
+}
+
+int16_t mst_StartWriteOD(int16_t port, uint16_t index, uint8_t subindex, const char *data, uint16_t len,
+                         char *error_msg)
+{
+    pending_index = index & 0xFF;
+    pending_len = len > ISDU_MAX_LEN ? ISDU_MAX_LEN : len;
+    memcpy(pending_data, data, pending_len);
+    return 0;
+}
+
+int16_t mst_WaitODRsp(int16_t port, uint16_t index, uint8_t subindex, char *error_msg)
+{
+    if (!stub_connected) {
+        strcpy(error_msg, "Timeout");
+        return -1;
+    }
+    return 0;
+}
+
+int16_t mst_GetReadODRsp(int16_t port, char *data, uint16_t len, uint16_t *isdu_error, char *error_msg)
+{
+    if (!isdu_len[pending_index]) {
+        *isdu_error = 0x8011;
+        return -1;
+    }
+    if (len > isdu_len[pending_index])
+        len = isdu_len[pending_index];
+    memcpy(data, isdu_data[pending_index], len);
+    return len;
+}
+
+int16_t mst_GetWriteODRsp(int16_t port, uint16_t *isdu_error, char *error_msg)
+{
+    if (!isdu_len[pending_index]) {
+        *isdu_error = 0x8011;
+        return -1;
+    }
+    memcpy(isdu_data[pending_index], pending_data, pending_len);
+    isdu_len[pending_index] = pending_len;
+    return 0;
+}
@@ -1,5 +1,5 @@
 
 from .misc import get_port
-from .port import IsduError
+from .port import DeviceIdentity, IsduError
 
 __version__ = "0.0.5"
@@ -0,0 +1,120 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""asyncio support for IO-Link ports.
+
+The blocking driver calls of a port are run on an executor with a single
+thread per port, so the calls of one port are kept in order while an event
+loop drives many ports concurrently.
+"""
+
+from .misc import available_interfaces
+from .port import DeviceIdentity
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+import asyncio
+import functools
+
+
+class AsyncPort:
+    """Awaitable counterpart of :class:`iolink.port.PortABC`.
+
+    :param PortABC port: the port to wrap.
+    :param executor: executor for the driver calls, a single threaded one is created if omitted.
+    """
+
+    def __init__(self, port, executor=None):
+        self.port = port
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='iolink-port')
+        self._executor = executor
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def power_on(self):
+        await self._call(self.port.power_on)
+
+    async def power_off(self):
+        await self._call(self.port.power_off)
+
+    async def change_device_state_to(self, target_state: str):
+        await self._call(self.port.change_device_state_to, target_state)
+
+    async def get_device_pd_input_and_status(self) -> Tuple[bytes, int]:
+        return await self._call(self.port.get_device_pd_input_and_status)
+
+    async def set_device_pd_output(self, data: bytes):
+        await self._call(self.port.set_device_pd_output, data)
+
+    async def set_device_pd_output_fields(self, offset: int, data: bytes):
+        await self._call(self.port.set_device_pd_output_fields, offset, data)
+
+    async def invalidate_pd_output(self):
+        await self._call(self.port.invalidate_pd_output)
+
+    async def read_device_isdu(self, index: int, subindex: int):
+        return await self._call(self.port.read_device_isdu, index, subindex)
+
+    async def read_device_isdu_into(self, index: int, subindex: int, buf) -> int:
+        return await self._call(self.port.read_device_isdu_into, index, subindex, buf)
+
+    async def write_device_isdu(self, index: int, subindex: int, data):
+        await self._call(self.port.write_device_isdu, index, subindex, data)
+
+    async def get_device_identity(self) -> DeviceIdentity:
+        return await self._call(self.port.get_device_identity)
+
+    async def reconnect(self):
+        await self._call(self.port.reconnect)
+
+    async def shut_down(self):
+        try:
+            await self._call(self.port.shut_down)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def pd_frames(self, interval: float = 0.0) -> AsyncIterator[Tuple[bytes, int]]:
+        """Yields the input process data and state information of the device continuously.
+
+        :param float interval: minimum time between two frames in seconds.
+        """
+        loop = asyncio.get_running_loop()
+        next_frame = loop.time()
+        while True:
+            yield await self._call(self.port.get_device_pd_input_and_status)
+            next_frame += interval
+            delay = next_frame - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                next_frame = loop.time()
+
+
+@asynccontextmanager
+async def get_port(interface, **kwargs):
+    """Asynchronous counterpart of :func:`iolink.get_port` that yields an :class:`AsyncPort`.
+
+    :param str interface: ID of your IO-Link master device, see :func:`iolink.get_port`.
+    :param kwargs: passed on to the port.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='iolink-port')
+    loop = asyncio.get_running_loop()
+    try:
+        port = await loop.run_in_executor(executor, functools.partial(available_interfaces[interface], **kwargs))
+    except BaseException:
+        executor.shutdown(wait=False)
+        raise
+    async_port = AsyncPort(port, executor)
+    try:
+        yield async_port
+    finally:
+        await async_port.shut_down()
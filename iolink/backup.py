@@ -0,0 +1,169 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Backup of the parameters of a device and their restore, e.g. to a replacement device.
+
+A snapshot is stored as a header followed by the zlib compressed parameters::
+
+    header: magic (8s) version (u16) count (u32) payload length (u32) crc32 (u32)
+    parameter: index (u16) subindex (u8) length (u8) content (length bytes)
+
+All numbers are little-endian, the CRC-32 is the one of the uncompressed
+parameters.
+"""
+
+from .port import IsduError
+
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+import struct
+import zlib
+
+MAGIC = b'IOLBAK\x00\x00'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sHIII')
+_PARAMETER = struct.Struct('<HBB')
+# the length of a parameter is stored in a byte
+_MAX_LENGTH = 255
+
+
+class ParameterSnapshot:
+    """The content of the parameters of a device.
+
+    :param dict parameters: maps `(index, subindex)` to the content, in the order they are restored.
+    :param dict errors: maps `(index, subindex)` to the ISDU error code of the parameters that couldn't be read.
+    """
+
+    def __init__(self, parameters=None, errors=None):
+        self.parameters: Dict[Tuple[int, int], bytes] = dict(parameters or {})
+        self.errors: Dict[Tuple[int, int], int] = dict(errors or {})
+
+    def __eq__(self, other):
+        return isinstance(other, ParameterSnapshot) and self.parameters == other.parameters
+
+    def to_bytes(self, level=9) -> bytes:
+        for (index, subindex), data in self.parameters.items():
+            if len(data) > _MAX_LENGTH:
+                raise ValueError('parameter {:#x}.{} has {} bytes, a snapshot holds at most {}'.format(
+                    index, subindex, len(data), _MAX_LENGTH))
+        payload = b''.join(_PARAMETER.pack(index, subindex, len(data)) + data
+                           for (index, subindex), data in self.parameters.items())
+        compressed = zlib.compress(payload, level)
+        return _HEADER.pack(MAGIC, VERSION, len(self.parameters), len(compressed), zlib.crc32(payload)) + compressed
+
+    @classmethod
+    def from_bytes(cls, data) -> 'ParameterSnapshot':
+        """Reads a snapshot, raises `ValueError` if it is damaged."""
+        if len(data) < _HEADER.size:
+            raise ValueError('snapshot is truncated')
+        magic, version, count, length, crc = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('not a parameter snapshot')
+        if version != VERSION:
+            raise ValueError('unsupported snapshot version {}'.format(version))
+        if len(data) != _HEADER.size + length:
+            raise ValueError('snapshot is truncated')
+        try:
+            payload = zlib.decompress(data[_HEADER.size:])
+        except zlib.error as e:
+            raise ValueError('snapshot is damaged') from e
+        if zlib.crc32(payload) != crc:
+            raise ValueError('checksum of the snapshot does not match')
+
+        parameters = {}
+        offset = 0
+        for _ in range(count):
+            # the checksum doesn't cover the header, a damaged count mustn't read past the parameters
+            if offset + _PARAMETER.size > len(payload):
+                raise ValueError('snapshot is damaged')
+            index, subindex, n = _PARAMETER.unpack_from(payload, offset)
+            offset += _PARAMETER.size
+            if offset + n > len(payload):
+                raise ValueError('snapshot is damaged')
+            parameters[(index, subindex)] = payload[offset:offset + n]
+            offset += n
+        if offset != len(payload):
+            raise ValueError('snapshot is damaged')
+        return cls(parameters)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path) -> 'ParameterSnapshot':
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class RestoreResult(NamedTuple):
+    """Outcome of :func:`restore_parameters`."""
+    written: List[Tuple[int, int]]
+    unchanged: List[Tuple[int, int]]
+    errors: Dict[Tuple[int, int], IsduError]
+
+
+def _items(indices):
+    for item in indices:
+        yield item if isinstance(item, tuple) else (item, 0)
+
+
+def _batches(items, batch_size):
+    for i in range(0, len(items), batch_size):
+        yield items[i:i + batch_size]
+
+
+def backup_parameters(port, indices: Iterable, batch_size=32) -> ParameterSnapshot:
+    """Reads the parameters of a device into a snapshot.
+
+    Parameters that can't be read are left out of the snapshot and listed in
+    its :attr:`~ParameterSnapshot.errors`.
+
+    :param PortABC port: the port of the device.
+    :param indices: the parameters, as index or as `(index, subindex)`, in the order they should be restored.
+    :param int batch_size: parameters per call of :meth:`~iolink.port.PortABC.read_device_isdu_many`.
+    """
+    snapshot = ParameterSnapshot()
+    for batch in _batches(list(_items(indices)), batch_size):
+        for item, result in zip(batch, port.read_device_isdu_many(batch)):
+            if isinstance(result, IsduError):
+                snapshot.errors[item] = result.error_code
+            else:
+                snapshot.parameters[item] = bytes(result)
+    return snapshot
+
+
+def restore_parameters(port, snapshot: ParameterSnapshot, batch_size=32) -> RestoreResult:
+    """Writes the parameters of a snapshot to a device.
+
+    The parameters are read back first, only the ones with a different
+    content are written.
+
+    :param PortABC port: the port of the device.
+    :param ParameterSnapshot snapshot: the parameters.
+    :param int batch_size: parameters per batched ISDU call.
+    """
+    written = []
+    unchanged = []
+    errors = {}
+    for batch in _batches(list(snapshot.parameters), batch_size):
+        changed = []
+        for item, current in zip(batch, port.read_device_isdu_many(batch)):
+            if not isinstance(current, IsduError) and current == snapshot.parameters[item]:
+                unchanged.append(item)
+            else:
+                changed.append(item)
+        if not changed:
+            continue
+        items = [(index, subindex, snapshot.parameters[(index, subindex)]) for index, subindex in changed]
+        for item, result in zip(changed, port.write_device_isdu_many(items)):
+            if result is None:
+                written.append(item)
+            else:
+                errors[item] = result
+    return RestoreResult(written, unchanged, errors)
@@ -0,0 +1,209 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .port import IsduError, PortABC, PortWrapper
+
+import time
+
+
+# cache policies, apart from these a TTL in seconds can be given
+PERMANENT = 'permanent'
+NEVER = 'never'
+
+# Identification parameters of the Direct Parameter Page 2 and the ISDU index space
+IDENTIFICATION_POLICIES = {
+    0x10: PERMANENT,  # Vendor Name
+    0x11: PERMANENT,  # Vendor Text
+    0x12: PERMANENT,  # Product Name
+    0x13: PERMANENT,  # Product ID
+    0x14: PERMANENT,  # Product Text
+    0x15: PERMANENT,  # Serial Number
+    0x16: PERMANENT,  # Hardware Revision
+    0x17: PERMANENT,  # Firmware Revision
+}
+
+
+class CachedPort(PortWrapper):
+    """Port that caches the ISDU parameters of the device.
+
+    Reads are answered from the cache according to the policy of the index,
+    writes go to the device and update the cache. The whole cache is dropped
+    when the device is switched off or on, set to Inactive, the connection to
+    it is lost or the port reconnects, since it might have been swapped in the
+    meantime. The identity of the device is also kept when the cache is
+    filled: a device with another identity, seen by :meth:`check_device`,
+    :meth:`get_device_identity` or a change to PreOperate or Operate, drops
+    the cache as well.
+
+    :param PortABC port: the wrapped port.
+    :param dict policies: maps an index to :data:`PERMANENT`, :data:`NEVER` or a TTL in seconds.
+    :param default_policy: policy of the indices that are not in `policies`.
+    """
+
+    def __init__(self, port, policies=None, default_policy=NEVER):
+        super().__init__(port)
+        self.policies = dict(IDENTIFICATION_POLICIES if policies is None else policies)
+        self.default_policy = default_policy
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        # identity of the device the entries are from
+        self._identity = None
+
+    def stats(self):
+        """Returns the hit and miss counters and the number of cached parameters."""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def invalidate(self, index=None):
+        """Drops the cached values of an index or of all indices."""
+        if index is None:
+            self._entries.clear()
+            self._identity = None
+        else:
+            for key in [key for key in self._entries if key[0] == index]:
+                del self._entries[key]
+
+    def preload(self, parameters):
+        """Fills the cache with known content, e.g. from a :class:`~iolink.fingerprint.FingerprintCache`.
+
+        The parameters are cached according to the policies of their indices.
+
+        :param dict parameters: maps `(index, subindex)` to the content.
+        """
+        for key, data in parameters.items():
+            self._store(tuple(key), bytes(data))
+
+    def check_device(self) -> bool:
+        """Drops the cache if the device isn't the one it was filled from, returns `False` then."""
+        if self._identity is None:
+            return True
+        return self._check_identity(self._call(self.port.get_device_identity))
+
+    def power_on(self):
+        self.invalidate()
+        self.port.power_on()
+
+    def power_off(self):
+        self.invalidate()
+        self.port.power_off()
+
+    def change_device_state_to(self, target_state: str):
+        if target_state == 'Inactive':
+            self.invalidate()
+        self._call(self.port.change_device_state_to, target_state)
+        if target_state != 'Inactive':
+            # the device has started up again, it might be another one
+            self.check_device()
+
+    def reconnect(self):
+        self.invalidate()
+        self.port.reconnect()
+
+    def get_device_pd_input_and_status(self):
+        return self._call(self.port.get_device_pd_input_and_status)
+
+    def get_device_pd_input_into(self, buf):
+        return self._call(self.port.get_device_pd_input_into, buf)
+
+    def get_device_identity(self):
+        identity = self._call(self.port.get_device_identity)
+        self._check_identity(identity)
+        return identity
+
+    def read_device_isdu(self, index: int, subindex: int):
+        key = (index, subindex)
+        entry = self._entries.get(key)
+        if entry is not None:
+            data, expires = entry
+            if expires is None or time.monotonic() < expires:
+                self.hits += 1
+                return data
+            del self._entries[key]
+        self.misses += 1
+        data = self._call(self.port.read_device_isdu, index, subindex)
+        self._store(key, data)
+        return data
+
+    # served from the cache like single reads
+    read_device_isdu_into = PortABC.read_device_isdu_into
+
+    # the steps of a request go through the cache as well, they don't overlap with the bus
+    start_isdu_request = PortABC.start_isdu_request
+    poll_isdu_response = PortABC.poll_isdu_response
+    get_isdu_response = PortABC.get_isdu_response
+
+    def read_device_isdu_many(self, items):
+        items = [tuple(item) for item in items]
+        results = [None] * len(items)
+        missing = []
+        now = time.monotonic()
+        for i, key in enumerate(items):
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or now < entry[1]):
+                self.hits += 1
+                results[i] = entry[0]
+            else:
+                missing.append(i)
+        if missing:
+            self.misses += len(missing)
+            answers = self._call(self.port.read_device_isdu_many, [items[i] for i in missing])
+            for i, data in zip(missing, answers):
+                results[i] = data
+                if isinstance(data, bytes):
+                    self._store(items[i], data)
+        return results
+
+    def write_device_isdu_many(self, items):
+        items = list(items)
+        results = self._call(self.port.write_device_isdu_many, items)
+        for (index, subindex, data), error in zip(items, results):
+            if error is None:
+                self._update_after_write(index, subindex, data)
+        return results
+
+    def write_device_isdu(self, index: int, subindex: int, data):
+        self._call(self.port.write_device_isdu, index, subindex, data)
+        self._update_after_write(index, subindex, data)
+
+    def _update_after_write(self, index, subindex, data):
+        if index == 0x02:
+            # a system command like "Restore factory settings" may change any parameter
+            self.invalidate()
+            return
+        # the record and its subindices overlap
+        self.invalidate(index)
+        self._store((index, subindex), bytes(data))
+
+    def _store(self, key, data):
+        policy = self.policies.get(key[0], self.default_policy)
+        if policy == NEVER:
+            return
+        expires = None if policy == PERMANENT else time.monotonic() + policy
+        if not self._entries:
+            self._identity = self._read_identity()
+        self._entries[key] = (data, expires)
+
+    def _read_identity(self):
+        try:
+            return self._call(self.port.get_device_identity)
+        except (IsduError, TimeoutError, ValueError):
+            # without an identity, only the other events drop the cache
+            return None
+
+    def _check_identity(self, identity):
+        if self._identity is not None and identity != self._identity:
+            self.invalidate()
+            return False
+        return True
+
+    def _call(self, func, *args):
+        try:
+            return func(*args)
+        except ConnectionError:
+            self.invalidate()
+            raise
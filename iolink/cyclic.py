@@ -0,0 +1,148 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from collections import deque
+from typing import NamedTuple
+import threading
+import time
+
+
+class PdSnapshot(NamedTuple):
+    """Input process data of one cycle, as published by :class:`CyclicPdEngine`."""
+    data: bytes
+    status: int
+    timestamp: float
+    cycle: int
+
+
+class CyclicPdEngine:
+    """Exchanges the process data of a port on a dedicated thread at a fixed cycle time.
+
+    The latest input is published into one of two buffers while readers take
+    the other one, so :meth:`snapshot` never has to wait for the bus cycle.
+    Outputs passed to :meth:`set_device_pd_output` are written at the start of
+    the next cycle, only the most recent one is kept.
+
+    :param PortABC port: the port, it must not be used by anyone else while the engine runs.
+    :param float cycle_time: process data cycle time in seconds.
+    :param int buffer_size: size of the input buffers, must fit the devices process data.
+    :param listener: called on the engine's thread after every cycle with the input
+        process data as a memoryview that is only valid during the call, the state
+        information, the timestamp and the cycle number, e.g.
+        :meth:`PdNotifier.publish <iolink.notify.PdNotifier.publish>`.
+    """
+
+    def __init__(self, port, cycle_time, buffer_size=64, listener=None):
+        self.port = port
+        self.cycle_time = cycle_time
+        self.listener = listener
+        self.overruns = 0
+        self.error = None
+
+        self._views = (memoryview(bytearray(buffer_size)), memoryview(bytearray(buffer_size)))
+        self._lengths = [0, 0]
+        self._status = [0, 0]
+        self._timestamps = [0.0, 0.0]
+        self._cycles = [0, 0]
+        # sequence number per buffer, odd while the buffer is being written
+        self._seqs = [0, 0]
+        self._front = 0
+        self._outputs = deque(maxlen=1)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def cycles(self):
+        """Number of completed cycles."""
+        return self._cycles[self._front]
+
+    def start(self):
+        if self._thread is not None:
+            raise RuntimeError('engine is already running')
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='CyclicPdEngine', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def snapshot(self) -> PdSnapshot:
+        """Returns the input process data of the latest completed cycle without blocking."""
+        if self.error is not None:
+            raise self.error
+        while True:
+            i = self._front
+            seq = self._seqs[i]
+            snapshot = PdSnapshot(bytes(self._views[i][:self._lengths[i]]),
+                                  self._status[i],
+                                  self._timestamps[i],
+                                  self._cycles[i])
+            if not seq & 1 and self._seqs[i] == seq:
+                return snapshot
+
+    def set_device_pd_output(self, data: bytes):
+        """Queues the output process data for the next cycle, replacing any pending output."""
+        self._outputs.append(data)
+
+    def _run(self):
+        port = self.port
+        outputs = self._outputs
+        views = self._views
+        lengths = self._lengths
+        status = self._status
+        timestamps = self._timestamps
+        cycles = self._cycles
+        seqs = self._seqs
+        cycle_time = self.cycle_time
+        listener = self.listener
+        between_cycles = self._between_cycles
+        wait = self._stop_event.wait
+
+        next_cycle = time.perf_counter()
+        try:
+            while not self._stop_event.is_set():
+                if outputs:
+                    port.set_device_pd_output(outputs.popleft())
+
+                front = self._front
+                back = 1 - front
+                seqs[back] += 1
+                lengths[back], status[back] = port.get_device_pd_input_into(views[back])
+                timestamps[back] = time.perf_counter()
+                cycles[back] = cycles[front] + 1
+                seqs[back] += 1
+                self._front = back
+                if listener is not None:
+                    listener(views[back][:lengths[back]], status[back], timestamps[back], cycles[back])
+
+                next_cycle += cycle_time
+                between_cycles(next_cycle)
+                delay = next_cycle - time.perf_counter()
+                if delay > 0:
+                    wait(delay)
+                else:
+                    # skip the cycles that were missed instead of trying to catch up
+                    self.overruns += 1
+                    next_cycle = time.perf_counter()
+        except Exception as e:
+            self.error = e
+
+    def _between_cycles(self, next_cycle):
+        """Runs on the engine's thread after each cycle, subclasses use the time until `next_cycle`."""
+        pass
@@ -0,0 +1,153 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Persistent cache of what is known about a device, so that a restart can skip its identification.
+
+The entries are keyed by the port and by the identification that the master
+keeps of the device, see :meth:`~iolink.port.PortABC.get_device_identity`.
+A device that is still the same one after a restart is therefore found
+without any ISDU request. The master doesn't know the firmware revision
+(index 0x17) of the device, so an entry outlives an update of the firmware
+that keeps the revision ID and the function ID: call
+:meth:`FingerprintCache.remove` after such an update. Each entry is pickled into a file of its own, like
+the compiled descriptors of :func:`~iolink.iodd.load_iodd`.
+"""
+
+from .cache import IDENTIFICATION_POLICIES
+from .port import IsduError
+
+from typing import Dict, NamedTuple, Optional, Tuple
+import hashlib
+import os
+import pickle
+import threading
+
+# bump this when the layout of the entries changes
+CACHE_VERSION = 2
+
+
+class DeviceFingerprint(NamedTuple):
+    """Key of an entry of the :class:`FingerprintCache`."""
+    port: str
+    vendor_id: int
+    device_id: int
+    serial_number: bytes
+    revision_id: int
+    function_id: int
+
+
+class FingerprintEntry(NamedTuple):
+    """What the :class:`FingerprintCache` keeps of a device.
+
+    `parameters` maps `(index, subindex)` to the content, `errors` maps the
+    parameters that couldn't be read to their ISDU error code, `descriptor`
+    is the compiled :class:`~iolink.iodd.DeviceDescriptor` or `None`.
+    """
+    parameters: Dict[Tuple[int, int], bytes]
+    errors: Dict[Tuple[int, int], int]
+    descriptor: object
+
+
+class FingerprintCache:
+    """Stores the parameters and the descriptor of devices across restarts.
+
+    The cache can be used by several threads at once, e.g. by
+    :meth:`~iolink.manager.PortManager.identify_all`.
+
+    :param str directory: where the entries are stored, it is created with the first entry.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: DeviceFingerprint) -> Optional[FingerprintEntry]:
+        """Returns the entry of a device, `None` if the device is not known."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+        if entry is None:
+            # the file is read without the lock, the ports of a PortManager look up their devices in parallel
+            entry = self._load(fingerprint)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                entry = self._entries.setdefault(fingerprint, entry)
+                self.hits += 1
+        return entry
+
+    def put(self, fingerprint: DeviceFingerprint, entry: FingerprintEntry):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(fingerprint)
+        temp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+        with open(temp_path, 'wb') as f:
+            pickle.dump((fingerprint, entry), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._entries[fingerprint] = entry
+
+    def remove(self, fingerprint: DeviceFingerprint):
+        """Drops the entry of a device, e.g. after its firmware was updated or its parameters were changed."""
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+        try:
+            os.remove(self._path(fingerprint))
+        except FileNotFoundError:
+            pass
+
+    def identify(self, port, port_id, indices=None, resolve_descriptor=None) -> Tuple[DeviceFingerprint,
+                                                                                      FingerprintEntry]:
+        """Identifies the device on a port, from the cache if it is known.
+
+        For a device that is not known yet, the parameters are read over ISDU,
+        the descriptor is resolved and the entry is stored.
+
+        :param PortABC port: the port of the device.
+        :param port_id: name of the port that stays the same across restarts, e.g. 'COM3'.
+        :param indices: the parameters to keep, as index or as `(index, subindex)`,
+            by default the identification parameters 0x10 to 0x17.
+        :param resolve_descriptor: called with the fingerprint and the parameters of a device
+            that is not known yet, returns its :class:`~iolink.iodd.DeviceDescriptor` or `None`.
+        """
+        identity = port.get_device_identity()
+        fingerprint = DeviceFingerprint(str(port_id), *identity)
+        entry = self.get(fingerprint)
+        if entry is not None:
+            return fingerprint, entry
+
+        if indices is None:
+            indices = IDENTIFICATION_POLICIES
+        items = [item if isinstance(item, tuple) else (item, 0) for item in indices]
+        parameters = {}
+        errors = {}
+        for item, result in zip(items, port.read_device_isdu_many(items)):
+            if isinstance(result, IsduError):
+                errors[item] = result.error_code
+            else:
+                parameters[item] = bytes(result)
+        descriptor = resolve_descriptor(fingerprint, parameters) if resolve_descriptor is not None else None
+        entry = FingerprintEntry(parameters, errors, descriptor)
+        self.put(fingerprint, entry)
+        return fingerprint, entry
+
+    def _path(self, fingerprint):
+        key = '{!r}|{}'.format(tuple(fingerprint), CACHE_VERSION)
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf8')).hexdigest() + '.pickle')
+
+    def _load(self, fingerprint):
+        try:
+            with open(self._path(fingerprint), 'rb') as f:
+                stored, entry = pickle.load(f)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError, AttributeError, ImportError):
+            # ImportError and AttributeError come from entries whose classes have moved
+            return None
+        # guards against a hash collision
+        return entry if stored == fingerprint else None
@@ -0,0 +1,214 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .port import PortWrapper
+
+from collections import Counter
+import time
+
+
+class LatencyHistogram:
+    """Histogram of durations in ns with log-linear buckets, as used by HdrHistogram.
+
+    Every power of two is divided into ``2 ** (significant_bits - 1)`` buckets,
+    so a recorded value is off by less than ``2 ** -(significant_bits - 1)``.
+
+    :param int significant_bits: precision of the buckets.
+    """
+
+    def __init__(self, significant_bits=6):
+        self._bits = significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self._counts = [0] * ((64 - significant_bits + 2) * self._half)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        bucket = value.bit_length() - self._bits
+        if bucket <= 0:
+            self._counts[value] += 1
+        else:
+            self._counts[bucket * self._half + (value >> bucket)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percentile):
+        """Returns the value below which the given percentage of the recorded values lie."""
+        if not self.count:
+            return 0
+        threshold = self.count * percentile / 100
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= threshold:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'min': self.min or 0,
+            'max': self.max or 0,
+            'mean': self.total / self.count if self.count else 0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p99.9': self.percentile(99.9),
+        }
+
+    def _highest_value(self, index):
+        if index < 2 * self._half:
+            return index
+        bucket = index // self._half - 1
+        return ((index - bucket * self._half + 1) << bucket) - 1
+
+
+class OperationStats:
+    """Latency histogram and error counts of one operation of a port."""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = Counter()
+
+    def snapshot(self):
+        snapshot = self.histogram.snapshot()
+        snapshot['errors'] = dict(self.errors)
+        return snapshot
+
+
+class InstrumentedPort(PortWrapper):
+    """Port that measures the duration and counts the errors of every call.
+
+    Set :attr:`enabled` to `False` to pass calls straight through, or don't
+    wrap the port at all to avoid any overhead.
+
+    :param PortABC port: the wrapped port.
+    :param str name: name of the port in the exported metrics.
+    """
+
+    def __init__(self, port, name='port', enabled=True):
+        super().__init__(port)
+        self.name = name
+        self.enabled = enabled
+        self.stats = {}
+
+    def reset(self):
+        self.stats = {}
+
+    def snapshot(self):
+        """Returns the statistics of all operations, durations are in ns."""
+        return {operation: stats.snapshot() for operation, stats in self.stats.items()}
+
+    def power_on(self):
+        self._measure('power_on', self.port.power_on)
+
+    def power_off(self):
+        self._measure('power_off', self.port.power_off)
+
+    def change_device_state_to(self, target_state):
+        self._measure('change_device_state_to', self.port.change_device_state_to, target_state)
+
+    def get_device_pd_input_and_status(self):
+        return self._measure('get_device_pd_input_and_status', self.port.get_device_pd_input_and_status)
+
+    def get_device_pd_input_into(self, buf):
+        return self._measure('get_device_pd_input_into', self.port.get_device_pd_input_into, buf)
+
+    def set_device_pd_output(self, data):
+        self._measure('set_device_pd_output', self.port.set_device_pd_output, data)
+
+    def set_device_pd_output_fields(self, offset, data):
+        self._measure('set_device_pd_output_fields', self.port.set_device_pd_output_fields, offset, data)
+
+    def invalidate_pd_output(self):
+        self._measure('invalidate_pd_output', self.port.invalidate_pd_output)
+
+    def read_device_isdu(self, index, subindex):
+        return self._measure('read_device_isdu', self.port.read_device_isdu, index, subindex)
+
+    def read_device_isdu_into(self, index, subindex, buf):
+        return self._measure('read_device_isdu_into', self.port.read_device_isdu_into, index, subindex, buf)
+
+    def write_device_isdu(self, index, subindex, data):
+        self._measure('write_device_isdu', self.port.write_device_isdu, index, subindex, data)
+
+    def read_device_isdu_many(self, items):
+        return self._measure('read_device_isdu_many', self.port.read_device_isdu_many, items)
+
+    def write_device_isdu_many(self, items):
+        return self._measure('write_device_isdu_many', self.port.write_device_isdu_many, items)
+
+    def start_isdu_request(self, index, subindex, data=None):
+        self._measure('start_isdu_request', self.port.start_isdu_request, index, subindex, data)
+
+    def poll_isdu_response(self):
+        return self._measure('poll_isdu_response', self.port.poll_isdu_response)
+
+    def get_isdu_response(self):
+        return self._measure('get_isdu_response', self.port.get_isdu_response)
+
+    def get_device_identity(self):
+        return self._measure('get_device_identity', self.port.get_device_identity)
+
+    def reconnect(self):
+        self._measure('reconnect', self.port.reconnect)
+
+    def shut_down(self):
+        self._measure('shut_down', self.port.shut_down)
+
+    def _measure(self, operation, func, *args):
+        if not self.enabled:
+            return func(*args)
+        try:
+            stats = self.stats[operation]
+        except KeyError:
+            stats = self.stats[operation] = OperationStats()
+        start = time.perf_counter_ns()
+        try:
+            return func(*args)
+        except Exception as e:
+            stats.errors[type(e).__name__] += 1
+            raise
+        finally:
+            stats.histogram.record(time.perf_counter_ns() - start)
+
+
+def to_prometheus(ports, prefix='iolink'):
+    """Exports the statistics of instrumented ports in the Prometheus text format.
+
+    :param ports: the :class:`InstrumentedPort` instances.
+    :param str prefix: prefix of the metric names.
+    """
+    quantiles = (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'), ('0.999', 'p99.9'))
+    lines = [
+        '# HELP {}_call_duration_seconds Duration of the calls to the port.'.format(prefix),
+        '# TYPE {}_call_duration_seconds summary'.format(prefix),
+    ]
+    errors = []
+    for port in ports:
+        for operation, stats in sorted(port.stats.items()):
+            labels = 'port="{}",operation="{}"'.format(port.name, operation)
+            snapshot = stats.histogram.snapshot()
+            for quantile, key in quantiles:
+                lines.append('{}_call_duration_seconds{{{},quantile="{}"}} {:.9f}'.format(
+                    prefix, labels, quantile, snapshot[key] / 1e9))
+            lines.append('{}_call_duration_seconds_sum{{{}}} {:.9f}'.format(
+                prefix, labels, stats.histogram.total / 1e9))
+            lines.append('{}_call_duration_seconds_count{{{}}} {}'.format(prefix, labels, snapshot['count']))
+            for error, count in sorted(stats.errors.items()):
+                errors.append('{}_call_errors_total{{{},error="{}"}} {}'.format(prefix, labels, error, count))
+    lines.append('# HELP {}_call_errors_total Number of calls to the port that raised an error.'.format(prefix))
+    lines.append('# TYPE {}_call_errors_total counter'.format(prefix))
+    lines.extend(errors)
+    return '\n'.join(lines) + '\n'
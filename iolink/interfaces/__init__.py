@@ -0,0 +1,85 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from collections.abc import MutableMapping
+import importlib
+
+ENTRY_POINT_GROUP = 'iolink.interfaces'
+
+# interfaces that come with iolink, they work without the package being installed
+_BUILTIN_INTERFACES = {
+    'iqLink': 'iolink.interfaces.iqlink.iqlink:IqLinkPort',
+    'sim': 'iolink.interfaces.sim.sim:SimPort',
+    'replay': 'iolink.record:ReplayPort',
+    'process': 'iolink.worker:ProcessPort',
+}
+
+
+def _entry_points():
+    try:
+        from importlib import metadata
+    except ImportError:  # Python < 3.8
+        return {}
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        entry_points = entry_points.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10
+        entry_points = entry_points.get(ENTRY_POINT_GROUP, [])
+    return {entry_point.name: entry_point.value for entry_point in entry_points}
+
+
+class InterfaceRegistry(MutableMapping):
+    """Maps the IDs of the interfaces to their port classes.
+
+    Interfaces are registered as ``'module:Class'`` strings, by iolink itself
+    or by other packages through the ``iolink.interfaces`` entry point group.
+    A module is only imported when its port class is looked up for the first
+    time, so importing iolink doesn't load any drivers.
+    """
+
+    def __init__(self):
+        self._paths = None
+        self._classes = {}
+
+    def _discover(self):
+        if self._paths is None:
+            paths = _entry_points()
+            paths.update(_BUILTIN_INTERFACES)
+            self._paths = paths
+        return self._paths
+
+    def __getitem__(self, name):
+        try:
+            return self._classes[name]
+        except KeyError:
+            pass
+        path = self._discover()[name]
+        module_name, _, class_name = path.partition(':')
+        port_class = getattr(importlib.import_module(module_name), class_name)
+        self._classes[name] = port_class
+        return port_class
+
+    def __setitem__(self, name, port_class):
+        """Registers a port class or a ``'module:Class'`` string."""
+        self._discover()
+        self._classes.pop(name, None)
+        if isinstance(port_class, str):
+            self._paths[name] = port_class
+        else:
+            self._paths[name] = '{}:{}'.format(port_class.__module__, port_class.__qualname__)
+            self._classes[name] = port_class
+
+    def __delitem__(self, name):
+        del self._discover()[name]
+        self._classes.pop(name, None)
+
+    def __iter__(self):
+        return iter(self._discover())
+
+    def __len__(self):
+        return len(self._discover())
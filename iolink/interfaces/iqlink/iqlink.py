@@ -6,31 +6,73 @@
 # This software is proprietary to Analog Devices, Inc. and its licensors.
 ################################################################################
 
-from iolink.port import PortABC, IsduError
+from iolink.port import DeviceIdentity, PortABC, IsduError, ISDU_MAX_LENGTH, PD_MAX_LENGTH
 
 import ctypes
 import ctypes.util
 import os
 import re
 import sys
+import types
 
 
 MST_DEV_SER_NUM_MAX_LEN = 16
 
 _iqcomm_lib = None
-
-if sys.platform == 'win32':
-    if hasattr(sys.modules['__main__'], '__file__'):
-        # there might be no main file, e.g. in interactive interpreter mode
-        main_file_directory = os.path.dirname(os.path.abspath(sys.modules['__main__'].__file__))
-        if os.path.isfile(os.path.join(main_file_directory, 'iqcomm.dll')):
-            _iqcomm_lib = ctypes.windll.LoadLibrary(os.path.join(main_file_directory, 'iqcomm.dll'))
-    if _iqcomm_lib is None:
+_iqcomm_functions = None
+
+
+def _find_iqcomm_lib():
+    path = os.environ.get('IOLINK_IQCOMM_LIB')
+    if path:
+        return path
+    if sys.platform == 'win32':
+        if hasattr(sys.modules['__main__'], '__file__'):
+            # there might be no main file, e.g. in interactive interpreter mode
+            main_file_directory = os.path.dirname(os.path.abspath(sys.modules['__main__'].__file__))
+            if os.path.isfile(os.path.join(main_file_directory, 'iqcomm.dll')):
+                return os.path.join(main_file_directory, 'iqcomm.dll')
         this_files_directory = os.path.dirname(__file__)
         if os.path.isfile(os.path.join(this_files_directory, 'iqcomm.dll')):
-            _iqcomm_lib = ctypes.windll.LoadLibrary(os.path.join(this_files_directory, 'iqcomm.dll'))
-        elif ctypes.util.find_library('iqcomm.dll') is not None:
-            _iqcomm_lib = ctypes.windll.LoadLibrary(ctypes.util.find_library('iqcomm.dll'))
+            return os.path.join(this_files_directory, 'iqcomm.dll')
+        return ctypes.util.find_library('iqcomm.dll')
+    return ctypes.util.find_library('iqcomm')
+
+
+def _load_iqcomm_lib():
+    """Loads the iqcomm library on first use and declares the prototypes of its functions.
+
+    The library is searched in the file given by the environment variable
+    `IOLINK_IQCOMM_LIB`, and on Windows next to the main Python file, next to
+    this file and in the PATH. On other platforms the system's library search
+    path is used.
+    """
+    global _iqcomm_lib, _iqcomm_functions
+    if _iqcomm_lib is None:
+        path = _find_iqcomm_lib()
+        if path is None:
+            raise FileNotFoundError('iqcomm.dll' if sys.platform == 'win32' else 'libiqcomm.so')
+        if sys.platform == 'win32':
+            lib = ctypes.windll.LoadLibrary(path)
+            function_type = ctypes.WINFUNCTYPE
+        else:
+            lib = ctypes.cdll.LoadLibrary(path)
+            function_type = ctypes.CFUNCTYPE
+        for name, (restype, argtypes) in _PROTOTYPES.items():
+            function = getattr(lib, name)
+            function.restype = restype
+            function.argtypes = argtypes
+        functions = {}
+        for attribute, (name, errcheck) in _HOT_PATH_FUNCTIONS.items():
+            restype, argtypes = _PROTOTYPES[name]
+            # separate function pointers, so that they can have their own errcheck
+            function = function_type(restype, *argtypes)((name, lib))
+            if errcheck is not None:
+                function.errcheck = errcheck
+            functions[attribute] = function
+        _iqcomm_functions = types.SimpleNamespace(**functions)
+        _iqcomm_lib = lib
+    return _iqcomm_lib
 
 
 class MstConfigT(ctypes.Structure):
@@ -52,6 +94,71 @@ class MstConfigT(ctypes.Structure):
     ]
 
 
+_int16 = ctypes.c_int16
+_uint8 = ctypes.c_uint8
+_uint16 = ctypes.c_uint16
+_buffer = ctypes.c_char_p
+_PROTOTYPES = {
+    'mst_GetVersion': (_int16, [ctypes.POINTER(_uint16), ctypes.POINTER(_uint16), _buffer]),
+    'mst_Connect': (_int16, [_uint8, _uint8, _buffer]),
+    'mst_Disconnect': (_int16, [_int16, _buffer]),
+    'mst_PowerControl': (_int16, [_int16, _uint8, _buffer]),
+    'mst_SetOperatingMode': (_int16, [_int16, _uint8, _uint8, ctypes.POINTER(_uint8), _buffer]),
+    'mst_GetConfig': (_int16, [_int16, ctypes.POINTER(MstConfigT), _buffer]),
+    'mst_GetStatus': (_int16, [_int16, ctypes.POINTER(_uint8), _buffer, _uint16, _buffer]),
+    'mst_SetPDValue': (_int16, [_int16, _buffer, _uint16, _buffer]),
+    'mst_SetPDValidity': (_int16, [_int16, _uint8, _buffer]),
+    'mst_StartReadOD': (_int16, [_int16, _uint16, _uint8, _buffer]),
+    'mst_StartWriteOD': (_int16, [_int16, _uint16, _uint8, _buffer, _uint16, _buffer]),
+    'mst_WaitODRsp': (_int16, [_int16, _uint16, _uint8, _buffer]),
+    'mst_GetReadODRsp': (_int16, [_int16, _buffer, _uint16, ctypes.POINTER(_uint16), _buffer]),
+    'mst_GetWriteODRsp': (_int16, [_int16, ctypes.POINTER(_uint16), _buffer]),
+}
+
+
+def _raise_connection_error(result, function, arguments):
+    # the error message buffer is always the last argument
+    if result < 0:
+        raise ConnectionError(arguments[-1].value.decode('utf8'))
+    return result
+
+
+def _raise_timeout_error(result, function, arguments):
+    if result < 0:
+        raise TimeoutError(arguments[-1].value.decode('utf8'))
+    return result
+
+
+# Functions of the process data and ISDU paths with the translation of their errors.
+# They are typed by the prototypes above. IqLinkPort passes ctypes objects that
+# already match them where it can, which keeps the conversion of the arguments cheap.
+_HOT_PATH_FUNCTIONS = {
+    'get_status': ('mst_GetStatus', _raise_connection_error),
+    'set_pd_value': ('mst_SetPDValue', _raise_connection_error),
+    'set_pd_validity': ('mst_SetPDValidity', _raise_connection_error),
+    'start_read_od': ('mst_StartReadOD', None),
+    'start_write_od': ('mst_StartWriteOD', None),
+    'wait_od_rsp': ('mst_WaitODRsp', _raise_timeout_error),
+    # ISDU errors are reported through an extra argument, they are checked by the caller
+    'get_read_od_rsp': ('mst_GetReadODRsp', None),
+    'get_write_od_rsp': ('mst_GetWriteODRsp', None),
+}
+
+
+def _check_length(data, max_length):
+    # ctypes truncates lengths that don't fit the uint16 of the prototypes without an error
+    if len(data) > max_length:
+        raise ValueError('{} bytes exceed the maximum of {} bytes'.format(len(data), max_length))
+
+
+def _c_data(data):
+    """Passes writable buffers to the driver without a copy, other bytes-like objects as bytes."""
+    try:
+        return (ctypes.c_char * len(data)).from_buffer(data)
+    except TypeError:
+        return bytes(data)
+
+
 class IqLinkPort(PortABC):
 
     # mst_OperModeT
@@ -69,17 +176,30 @@ class IqLinkPort(PortABC):
         'OPERATE': 5,
     }
 
-    def __init__(self, **kwargs):
-        if sys.platform == 'win32':
-            if _iqcomm_lib is None:
-                raise FileNotFoundError('iqcomm.dll')
-        else:
-            raise NotImplementedError('The iqLink support is only available for windows')
+    def __init__(self, com_port=None, **kwargs):
+        _load_iqcomm_lib()
 
         self._port = None
+        self._com_port = com_port
         self._error_msg_buffer = ctypes.create_string_buffer(256)
+        # process data buffers are allocated once and reused on every cycle
+        self._pd_in_buffer = ctypes.create_string_buffer(PD_MAX_LENGTH)
+        self._pd_status = ctypes.c_uint8()
+        self._pd_status_ref = ctypes.byref(self._pd_status)
+        self._pd_into_source = self._pd_in_buffer
+        self._pd_into_target = self._pd_in_buffer
+        self._pd_into_length = ctypes.c_uint16(len(self._pd_in_buffer))
+        self._isdu_buffer = ctypes.create_string_buffer(ISDU_MAX_LENGTH)
+        self._isdu_error = ctypes.c_uint16(0)
+        self._isdu_error_ref = ctypes.byref(self._isdu_error)
+        # what the master holds, to skip writes that wouldn't change anything
+        self._pd_output_written = False
+        self._pd_output_valid = False
+        # the typed function pointers of the hot paths, they raise on errors by themselves
+        for attribute, function in vars(_iqcomm_functions).items():
+            setattr(self, '_' + attribute, function)
         self._check_iqcomm_lib_version()
-        self._connect()
+        self._connect(com_port)
 
     def power_on(self):
         self._switch_power('on')
@@ -98,94 +218,198 @@ class IqLinkPort(PortABC):
         self._go_to_state(op_modes_str)
 
     def get_device_pd_input_and_status(self):
+        n, status = self.get_device_pd_input_into(self._pd_in_buffer)
+        return self._pd_in_buffer[:n], status
+
+    def get_device_pd_input_into(self, buf):
         self._check_port()
-        status = ctypes.c_uint8()
-        pd_data_buffer = ctypes.create_string_buffer(64)
-        ret = _iqcomm_lib.mst_GetStatus(self._port,
-                                        ctypes.byref(status),
-                                        pd_data_buffer,
-                                        ctypes.c_uint16(len(pd_data_buffer)),
-                                        self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
-            raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
-        return pd_data_buffer[:ret.value], status
+        if buf is not self._pd_into_source:
+            # wrap the buffer only once, the driver then writes straight into it
+            self._pd_into_target = (ctypes.c_char * len(buf)).from_buffer(buf)
+            self._pd_into_length = ctypes.c_uint16(min(len(buf), PD_MAX_LENGTH))
+            self._pd_into_source = buf
+        try:
+            n = self._get_status(self._port,
+                                 self._pd_status_ref,
+                                 self._pd_into_target,
+                                 self._pd_into_length,
+                                 self._error_msg_buffer)
+        except ConnectionError:
+            self._forget_pd_output()
+            raise
+        return n, self._pd_status.value
 
     def set_device_pd_output(self, data: bytes):
         self._check_port()
         if not isinstance(data, bytes):
-            return ValueError
-
-        ret = _iqcomm_lib.mst_SetPDValue(self._port,
-                                         data,
-                                         ctypes.c_uint16(len(data)),
-                                         self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
-            raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
-
-        ret = _iqcomm_lib.mst_SetPDValidity(self._port,
-                                            1,
-                                            self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
-            raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
+            raise ValueError('the process data must be bytes')
+        _check_length(data, PD_MAX_LENGTH)
+        try:
+            if not self._pd_output_written or data != self._pd_output:
+                self._pd_output_written = False
+                self._set_pd_value(self._port, data, len(data), self._error_msg_buffer)
+                self._pd_output = data
+                self._pd_output_written = True
+            if not self._pd_output_valid:
+                self._set_pd_validity(self._port, 1, self._error_msg_buffer)
+                self._pd_output_valid = True
+        except ConnectionError:
+            self._forget_pd_output()
+            raise
+
+    def invalidate_pd_output(self):
+        self._check_port()
+        self._pd_output_valid = False
+        self._set_pd_validity(self._port, 0, self._error_msg_buffer)
 
     def read_device_isdu(self, index, subindex):
-        self._check_port()
-        _iqcomm_lib.mst_StartReadOD(self._port, index, subindex, self._error_msg_buffer)
-
-        ret = _iqcomm_lib.mst_WaitODRsp(self._port, index, subindex, self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
-            raise TimeoutError(self._error_msg_buffer.value.decode('utf8'))
-
-        isdu_data_buffer = ctypes.create_string_buffer(1024)
-        isdu_error = ctypes.c_uint16(0)
-        ret = _iqcomm_lib.mst_GetReadODRsp(self._port,
-                                           isdu_data_buffer,
-                                           len(isdu_data_buffer),
-                                           ctypes.byref(isdu_error),
-                                           self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
-            raise IsduError(isdu_error.value)
-
-        return isdu_data_buffer[:ret.value]
+        n = self._read_od(index, subindex, self._isdu_buffer, len(self._isdu_buffer))
+        return self._isdu_buffer[:n]
+
+    def read_device_isdu_into(self, index, subindex, buf):
+        # the driver writes straight into the buffer
+        return self._read_od(index, subindex, (ctypes.c_char * len(buf)).from_buffer(buf),
+                             min(len(buf), ISDU_MAX_LENGTH))
 
     def write_device_isdu(self, index, subindex, data):
         self._check_port()
-        _iqcomm_lib.mst_StartWriteOD(self._port, index, subindex, data, len(data), self._error_msg_buffer)
+        _check_length(data, ISDU_MAX_LENGTH)
+        if not isinstance(data, bytes):
+            data = _c_data(data)
+        self._start_write_od(self._port, index, subindex, data, len(data), self._error_msg_buffer)
+        self._wait_od_rsp(self._port, index, subindex, self._error_msg_buffer)
+        self._isdu_error.value = 0
+        ret = self._get_write_od_rsp(self._port, self._isdu_error_ref, self._error_msg_buffer)
+        if ret < 0:
+            raise IsduError(self._isdu_error.value)
+
+    def start_isdu_request(self, index, subindex, data=None):
+        self._check_port()
+        if data is None:
+            self._start_read_od(self._port, index, subindex, self._error_msg_buffer)
+        else:
+            _check_length(data, ISDU_MAX_LENGTH)
+            if not isinstance(data, bytes):
+                data = _c_data(data)
+            self._start_write_od(self._port, index, subindex, data, len(data), self._error_msg_buffer)
+        self._isdu_request = (index, subindex, data)
+
+    # iqComm has no poll for the response, the wait for it is left to get_isdu_response()
+
+    def get_isdu_response(self):
+        request = self._isdu_request
+        if request is None:
+            raise RuntimeError('no ISDU request was started')
+        self._isdu_request = None
+        index, subindex, data = request
+        self._wait_od_rsp(self._port, index, subindex, self._error_msg_buffer)
+        self._isdu_error.value = 0
+        if data is None:
+            ret = self._get_read_od_rsp(self._port, self._isdu_buffer, len(self._isdu_buffer),
+                                        self._isdu_error_ref, self._error_msg_buffer)
+        else:
+            ret = self._get_write_od_rsp(self._port, self._isdu_error_ref, self._error_msg_buffer)
+        if ret < 0:
+            raise IsduError(self._isdu_error.value)
+        if data is None:
+            return self._isdu_buffer[:ret]
 
-        ret = _iqcomm_lib.mst_WaitODRsp(self._port, index, subindex, self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
-            raise TimeoutError(self._error_msg_buffer.value.decode('utf8'))
+    def _read_od(self, index, subindex, target, length):
+        self._check_port()
+        self._start_read_od(self._port, index, subindex, self._error_msg_buffer)
+        self._wait_od_rsp(self._port, index, subindex, self._error_msg_buffer)
+        self._isdu_error.value = 0
+        ret = self._get_read_od_rsp(self._port, target, length, self._isdu_error_ref, self._error_msg_buffer)
+        if ret < 0:
+            raise IsduError(self._isdu_error.value)
+        return ret
+
+    def read_device_isdu_many(self, items):
+        self._check_port()
+        # bind everything the loop needs to locals once
+        port = self._port
+        error_msg_buffer = self._error_msg_buffer
+        isdu_buffer = self._isdu_buffer
+        isdu_buffer_len = len(isdu_buffer)
+        isdu_error = self._isdu_error
+        isdu_error_ref = self._isdu_error_ref
+        start_read = self._start_read_od
+        wait = self._wait_od_rsp
+        get_read_response = self._get_read_od_rsp
+
+        results = []
+        append = results.append
+        for index, subindex in items:
+            start_read(port, index, subindex, error_msg_buffer)
+            wait(port, index, subindex, error_msg_buffer)
+            isdu_error.value = 0
+            ret = get_read_response(port, isdu_buffer, isdu_buffer_len, isdu_error_ref, error_msg_buffer)
+            if ret < 0:
+                append(IsduError(isdu_error.value))
+            else:
+                append(isdu_buffer[:ret])
+        return results
+
+    def write_device_isdu_many(self, items):
+        self._check_port()
+        port = self._port
+        error_msg_buffer = self._error_msg_buffer
+        isdu_error = self._isdu_error
+        isdu_error_ref = self._isdu_error_ref
+        start_write = self._start_write_od
+        wait = self._wait_od_rsp
+        get_write_response = self._get_write_od_rsp
+
+        results = []
+        append = results.append
+        for index, subindex, data in items:
+            _check_length(data, ISDU_MAX_LENGTH)
+            if not isinstance(data, bytes):
+                data = _c_data(data)
+            start_write(port, index, subindex, data, len(data), error_msg_buffer)
+            wait(port, index, subindex, error_msg_buffer)
+            isdu_error.value = 0
+            if get_write_response(port, isdu_error_ref, error_msg_buffer) < 0:
+                append(IsduError(isdu_error.value))
+            else:
+                append(None)
+        return results
+
+    def get_device_identity(self):
+        # the master reads the identification at the start-up of the device
+        self._check_port()
+        config = MstConfigT()
+        ret = _iqcomm_lib.mst_GetConfig(self._port, ctypes.byref(config), self._error_msg_buffer)
+        if ret < 0:
+            raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
+        serial_number = bytes(config.deviceSerialNumber[:config.deviceSerialNumberLen])
+        return DeviceIdentity(config.deviceVendorID, config.deviceID, serial_number,
+                              config.revisionID, config.deviceFunctionID)
 
-        isdu_error = ctypes.c_uint16(0)
-        ret = _iqcomm_lib.mst_GetWriteODRsp(self._port,
-                                            ctypes.byref(isdu_error),
-                                            self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
-            raise IsduError(isdu_error.value)
+    def reconnect(self):
+        if self._port:
+            # the old connection is most likely dead already, errors don't matter
+            _iqcomm_lib.mst_Disconnect(self._port, self._error_msg_buffer)
+            self._port = None
+        self._forget_pd_output()
+        self._connect(self._com_port)
 
     def shut_down(self):
-        if self._port:
-            ret = _iqcomm_lib.mst_Disconnect(self._port, self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
-            raise ConnectionError(self._error_msg_buffer.value)
+        if not self._port:
+            return
+        ret = _iqcomm_lib.mst_Disconnect(self._port, self._error_msg_buffer)
+        if ret < 0:
+            raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
 
     def _switch_power(self, to):
         assert to.upper() in ['ON', 'OFF']
         self._check_port()
+        self._forget_pd_output()
         if to.upper() == 'ON':
             ret = _iqcomm_lib.mst_PowerControl(self._port, ctypes.c_uint8(1), self._error_msg_buffer)
         else:
             ret = _iqcomm_lib.mst_PowerControl(self._port, ctypes.c_uint8(0), self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
+        if ret < 0:
             raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
 
     def _check_iqcomm_lib_version(self):
@@ -210,12 +434,20 @@ class IqLinkPort(PortABC):
                                           self._error_msg_buffer)
         else:
             ret = _iqcomm_lib.mst_Connect(ctypes.c_uint8(0), ctypes.c_uint8(255), self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
+        if ret < 0:
             raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
-        self._port = ret
+        self._port = ctypes.c_int16(ret)
+        # mst_Connect returns the number of the COM port it connected to,
+        # reconnect() goes back to that master, even if it was detected automatically
+        self._com_port = 'COM{}'.format(ret)
+
+    def _forget_pd_output(self):
+        # the master might have reset the output, the next write sends it again
+        self._pd_output_written = False
+        self._pd_output_valid = False
 
     def _go_to_state(self, mode):
+        self._forget_pd_output()
 
         set_state = ctypes.c_uint8(self.op_modes[mode])
         if mode != 'AUTO':
@@ -229,8 +461,7 @@ class IqLinkPort(PortABC):
                                                expected_state,
                                                ctypes.byref(actual_state),
                                                self._error_msg_buffer)
-        ret = ctypes.c_int16(ret)
-        if ret.value < 0:
+        if ret < 0:
             raise ConnectionError(self._error_msg_buffer.value.decode('utf8'))
 
         if mode != 'AUTO':
@@ -0,0 +1,309 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""In-process simulation of an IO-Link master port with a connected device.
+
+The simulation runs on a virtual clock: every process data exchange advances
+the clock by one cycle and every ISDU request by its configured latency, so
+it runs as fast as the host allows. Pass ``realtime=True`` to the port to make
+it wait for the wall clock to catch up instead.
+"""
+
+from iolink.port import (DeviceIdentity, PortABC, IsduError, ISDU_ERR_INDEX_NOT_AVAILABLE,
+                         ISDU_ERR_SUBINDEX_NOT_AVAILABLE, ISDU_ERR_ACCESS_DENIED, ISDU_ERR_LENGTH_OVERRUN,
+                         ISDU_ERR_LENGTH_UNDERRUN)
+
+import time
+
+
+# bits of the status byte returned by SimPort.get_device_pd_input_and_status
+STATUS_PD_VALID = 0x01
+
+
+class SimDevice:
+    """Model of an IO-Link device that is connected to a :class:`SimPort`.
+
+    :param int pd_in_length: length of the input process data in bytes.
+    :param int pd_out_length: length of the output process data in bytes.
+    :param dict parameters: ISDU object dictionary, maps ``index`` or ``(index, subindex)`` to bytes.
+    :param dict access: maps an index to 'ro', 'wo' or 'rw' (the default).
+    :param float min_cycle_time: minimum cycle time of the device in seconds.
+    :param float isdu_latency: time that a ISDU request takes to complete in seconds.
+    :param int revision_id: IO-Link protocol revision, 0x11 for version 1.1.
+    :param int function_id: function ID of the device.
+    """
+
+    def __init__(self, pd_in_length=2, pd_out_length=2, parameters=None, access=None,
+                 min_cycle_time=0.001, isdu_latency=0.005,
+                 vendor_id=0x0000, device_id=0x000000, serial_number=b'0000000000',
+                 vendor_name=b'Analog Devices', product_name=b'Simulated Device', firmware_revision=b'1.0',
+                 revision_id=0x11, function_id=0x0000):
+        self.pd_in_length = pd_in_length
+        self.pd_out_length = pd_out_length
+        self.min_cycle_time = min_cycle_time
+        self.isdu_latency = isdu_latency
+        self.vendor_id = vendor_id
+        self.device_id = device_id
+        self.serial_number = serial_number
+        self.revision_id = revision_id
+        self.function_id = function_id
+
+        self._default_parameters = {
+            (0x10, 0): vendor_name,
+            (0x12, 0): product_name,
+            (0x15, 0): serial_number,
+            (0x17, 0): firmware_revision,
+        }
+        self.access = {0x02: 'wo', 0x10: 'ro', 0x12: 'ro', 0x15: 'ro', 0x17: 'ro'}
+        for key, value in (parameters or {}).items():
+            if isinstance(key, int):
+                key = (key, 0)
+            self._default_parameters[key] = bytes(value)
+        self.access.update(access or {})
+        self.parameters = dict(self._default_parameters)
+
+        self.pd_in = bytearray(pd_in_length)
+        self.pd_out = bytes(pd_out_length)
+        self.pd_out_valid = False
+        self.state = 'INACTIVE'
+        self.plugged = True
+        self.cycle_count = 0
+
+    def on_cycle(self):
+        """Called once per process data cycle while the device is in Operate.
+
+        Override this to model the behaviour of a device, e.g. to update
+        :attr:`pd_in` from :attr:`pd_out`.
+        """
+        pass
+
+    def on_system_command(self, command):
+        """Called when the system command parameter (index 0x02) is written."""
+        if command == 0x82:
+            # Restore factory settings
+            self.parameters = dict(self._default_parameters)
+
+    def unplug(self):
+        """Simulates pulling the cable of the device."""
+        self.plugged = False
+        self.state = 'INACTIVE'
+        self.pd_out_valid = False
+
+    def plug(self):
+        """Simulates reconnecting the cable of the device."""
+        self.plugged = True
+
+    def read_parameter(self, index, subindex):
+        if self.access.get(index, 'rw') == 'wo':
+            raise IsduError(ISDU_ERR_ACCESS_DENIED)
+        try:
+            return self.parameters[(index, subindex)]
+        except KeyError:
+            pass
+        if subindex == 0:
+            # the whole record is the concatenation of its subindices
+            items = sorted((key[1], value) for key, value in self.parameters.items() if key[0] == index)
+            if items:
+                return b''.join(value for _, value in items)
+            raise IsduError(ISDU_ERR_INDEX_NOT_AVAILABLE)
+        if any(key[0] == index for key in self.parameters):
+            raise IsduError(ISDU_ERR_SUBINDEX_NOT_AVAILABLE)
+        raise IsduError(ISDU_ERR_INDEX_NOT_AVAILABLE)
+
+    def write_parameter(self, index, subindex, data):
+        data = bytes(data)
+        if index == 0x02:
+            if len(data) != 1:
+                raise IsduError(ISDU_ERR_LENGTH_OVERRUN if len(data) > 1 else ISDU_ERR_LENGTH_UNDERRUN)
+            self.on_system_command(data[0])
+            return
+        if self.access.get(index, 'rw') == 'ro':
+            raise IsduError(ISDU_ERR_ACCESS_DENIED)
+        key = (index, subindex)
+        if key not in self.parameters:
+            if any(k[0] == index for k in self.parameters):
+                raise IsduError(ISDU_ERR_SUBINDEX_NOT_AVAILABLE)
+            raise IsduError(ISDU_ERR_INDEX_NOT_AVAILABLE)
+        expected_length = len(self.parameters[key])
+        if len(data) > expected_length:
+            raise IsduError(ISDU_ERR_LENGTH_OVERRUN)
+        if len(data) < expected_length:
+            raise IsduError(ISDU_ERR_LENGTH_UNDERRUN)
+        self.parameters[key] = data
+
+
+class SimPort(PortABC):
+    """Port of a simulated IO-Link master with a :class:`SimDevice` connected to it.
+
+    :param SimDevice device: the connected device, a default device is created if omitted.
+    :param float cycle_time: process data cycle time in seconds, defaults to the device's minimum cycle time.
+    :param bool realtime: if set, the port waits for the wall clock to catch up with the virtual clock.
+    """
+
+    def __init__(self, device=None, cycle_time=None, realtime=False, **kwargs):
+        self.device = device if device is not None else SimDevice()
+        if cycle_time is None:
+            cycle_time = self.device.min_cycle_time
+        if cycle_time < self.device.min_cycle_time:
+            raise ValueError('cycle time is shorter than the minimum cycle time of the device')
+        self.cycle_time = cycle_time
+        self.realtime = realtime
+
+        self._cycle_time_ns = int(round(cycle_time * 1e9))
+        self._isdu_cycles = max(1, -(-int(round(self.device.isdu_latency * 1e9)) // self._cycle_time_ns))
+        self._now_ns = 0
+        self._isdu_due_ns = 0
+        self._start = time.perf_counter()
+        self._powered = False
+        self._port = None
+        self._connect()
+
+    @property
+    def time(self):
+        """Virtual time of the port in seconds."""
+        return self._now_ns / 1e9
+
+    def power_on(self):
+        self._check_port()
+        self._powered = True
+
+    def power_off(self):
+        self._check_port()
+        self._powered = False
+        self.device.state = 'INACTIVE'
+        self.device.pd_out_valid = False
+
+    def change_device_state_to(self, target_state):
+        self._check_port()
+        target_state_to_op_states_str = {
+            'Inactive': 'INACTIVE',
+            'PreOperate': 'PREOPERATE',
+            'Operate': 'OPERATE',
+        }
+        self._go_to_state(target_state_to_op_states_str[target_state])
+
+    def get_device_pd_input_and_status(self):
+        self._check_port()
+        device = self.device
+        self._advance(1)
+        if device.state != 'OPERATE':
+            return b'', 0
+        return bytes(device.pd_in), STATUS_PD_VALID
+
+    def get_device_pd_input_into(self, buf):
+        self._check_port()
+        device = self.device
+        self._advance(1)
+        if device.state != 'OPERATE':
+            return 0, 0
+        n = device.pd_in_length
+        buf[:n] = device.pd_in
+        return n, STATUS_PD_VALID
+
+    def set_device_pd_output(self, data):
+        self._check_port()
+        if len(data) != self.device.pd_out_length:
+            raise ValueError('expected {} bytes of output process data'.format(self.device.pd_out_length))
+        self._check_link()
+        self.device.pd_out = self._pd_output = bytes(data)
+        self.device.pd_out_valid = True
+
+    def invalidate_pd_output(self):
+        self._check_port()
+        self._check_link()
+        self.device.pd_out_valid = False
+
+    def read_device_isdu(self, index, subindex):
+        self._check_port()
+        self._check_isdu_channel()
+        self._advance(self._isdu_cycles)
+        return self.device.read_parameter(index, subindex)
+
+    def write_device_isdu(self, index, subindex, data):
+        self._check_port()
+        self._check_isdu_channel()
+        self._advance(self._isdu_cycles)
+        self.device.write_parameter(index, subindex, data)
+
+    def start_isdu_request(self, index, subindex, data=None):
+        # the response is due after the device's ISDU latency, the cycles in between are left to the caller
+        self._check_port()
+        self._check_isdu_channel()
+        self._isdu_request = (index, subindex, None if data is None else bytes(data))
+        self._isdu_due_ns = self._now_ns + self._isdu_cycles * self._cycle_time_ns
+
+    def poll_isdu_response(self):
+        return self._now_ns >= self._isdu_due_ns
+
+    def get_isdu_response(self):
+        request = self._isdu_request
+        if request is None:
+            raise RuntimeError('no ISDU request was started')
+        self._isdu_request = None
+        self._check_isdu_channel()
+        remaining_ns = self._isdu_due_ns - self._now_ns
+        if remaining_ns > 0:
+            self._advance(-(-remaining_ns // self._cycle_time_ns))
+        index, subindex, data = request
+        if data is None:
+            return self.device.read_parameter(index, subindex)
+        self.device.write_parameter(index, subindex, data)
+
+    def get_device_identity(self):
+        # the master reads it from the Direct Parameter Page at the start-up of the device
+        self._check_port()
+        self._check_isdu_channel()
+        device = self.device
+        return DeviceIdentity(device.vendor_id, device.device_id, bytes(device.serial_number),
+                              device.revision_id, device.function_id)
+
+    def reconnect(self):
+        self._connect()
+
+    def shut_down(self):
+        self._port = None
+
+    def _advance(self, cycles):
+        device = self.device
+        if not device.plugged:
+            raise ConnectionError('Device not connected')
+        if device.state == 'OPERATE':
+            for _ in range(cycles):
+                device.cycle_count += 1
+                device.on_cycle()
+        self._now_ns += cycles * self._cycle_time_ns
+        if self.realtime:
+            delay = self._start + self._now_ns / 1e9 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _check_port(self):
+        if not self._port:
+            raise UnboundLocalError
+
+    def _check_link(self):
+        if not self.device.plugged:
+            raise ConnectionError('Device not connected')
+
+    def _check_isdu_channel(self):
+        self._check_link()
+        if self.device.state == 'INACTIVE':
+            raise TimeoutError('Device does not respond')
+
+    def _connect(self):
+        self._port = True
+        self._powered = True
+
+    def _go_to_state(self, mode):
+        self._check_link()
+        if not self._powered:
+            raise ConnectionRefusedError
+        self.device.state = mode
+        if mode != 'OPERATE':
+            self.device.pd_out_valid = False
+        self._advance(1)
@@ -0,0 +1,11 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .codec import Field, RecordCodec
+from .descriptor import DeviceDescriptor, IoddDevice, Variable
+from .parser import load_iodd, parse_iodd
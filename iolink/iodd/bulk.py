@@ -0,0 +1,98 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Vectorized decoding of recorded process data with NumPy.
+
+NumPy is an optional dependency of iolink, install it with
+``pip install iolink[numpy]`` to use this module.
+"""
+
+from .codec import _OCTET_TYPES, _struct_format
+
+import numpy as np
+
+
+_NUMPY_FORMATS = {
+    'B': 'u1', 'H': '>u2', 'I': '>u4', 'Q': '>u8',
+    'b': 'i1', 'h': '>i2', 'i': '>i4', 'q': '>i8',
+    'f': '>f4',
+}
+
+
+def _result_format(field):
+    if field.type in _OCTET_TYPES:
+        return 'S{}'.format(field.bit_length // 8)
+    if field.type == 'BooleanT':
+        return '?'
+    if field.type == 'Float32T':
+        return 'f4'
+    size = next(size for size in (1, 2, 4, 8) if field.bit_length <= size * 8)
+    return '{}{}'.format('i' if field.type == 'IntegerT' else 'u', size)
+
+
+def decode_frames(codec, buffer, offset=0, stride=None, columns=False):
+    """Decodes a buffer of consecutive records in one vectorized pass.
+
+    :param RecordCodec codec: layout of the records, e.g. ``descriptor.pd_in``.
+    :param buffer: bytes-like object that holds the records.
+    :param int offset: position of the first record in `buffer`.
+    :param int stride: distance between the starts of two records, defaults to the record length.
+    :param bool columns: return a dict with one array per item instead of a structured array.
+    :return: a NumPy structured array with a field per record item, or a dict of arrays.
+    """
+    length = codec.length
+    if stride is None:
+        stride = length
+    available = memoryview(buffer).nbytes - offset
+    count = (available - length) // stride + 1 if available >= length else 0
+
+    aligned = []
+    bit_fields = []
+    for field in codec.fields:
+        fmt = _struct_format(field)
+        if fmt is None:
+            bit_fields.append(field)
+        else:
+            start = length - (field.bit_offset + field.bit_length) // 8
+            aligned.append((field, start, _NUMPY_FORMATS.get(fmt, 'S{}'.format(field.bit_length // 8))))
+
+    result = np.empty(count, dtype=[(field.name, _result_format(field)) for field in codec.fields])
+
+    if aligned:
+        # a view of the records with the big-endian layout of the device, converted on assignment
+        layout = np.dtype({'names': [field.name for field, _, _ in aligned],
+                           'formats': [fmt for _, _, fmt in aligned],
+                           'offsets': [start for _, start, _ in aligned],
+                           'itemsize': length})
+        records = np.ndarray((count,), dtype=layout, buffer=buffer, offset=offset, strides=(stride,))
+        for field, _, _ in aligned:
+            result[field.name] = records[field.name]
+
+    if bit_fields:
+        octets = np.ndarray((count, length), dtype=np.uint8, buffer=buffer, offset=offset, strides=(stride, 1))
+        for field in bit_fields:
+            first = length - 1 - (field.bit_offset + field.bit_length - 1) // 8
+            last = length - 1 - field.bit_offset // 8
+            if (last - first + 1) * 8 > 64:
+                raise ValueError('{} spans more than 8 octets'.format(field.name))
+            raw = np.zeros(count, dtype=np.uint64)
+            for i in range(first, last + 1):
+                raw = (raw << np.uint64(8)) | octets[:, i]
+            raw = (raw >> np.uint64(field.bit_offset % 8)) & np.uint64((1 << field.bit_length) - 1)
+            if field.type == 'BooleanT':
+                result[field.name] = raw != 0
+            elif field.type == 'IntegerT':
+                values = raw.astype(np.int64)
+                sign = 1 << (field.bit_length - 1)
+                result[field.name] = np.where(values & sign, values - (sign << 1), values)
+            else:
+                result[field.name] = raw
+
+    if columns:
+        return {name: result[name] for name in result.dtype.names}
+    return result
@@ -0,0 +1,129 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Codecs for IO-Link records, compiled once into struct layouts and bit masks.
+
+Record items are placed by their bit offset, which counts from the least
+significant bit of the last octet of the record (IO-Link Interface and System
+Specification, Annex F). Items that start and end on octet boundaries and have
+a native width are decoded with one precompiled ``struct.Struct``, all other
+items are extracted from the record as a big integer with shifts and masks.
+"""
+
+from typing import NamedTuple
+import struct
+
+
+class Field(NamedTuple):
+    """One item of a record."""
+    name: str
+    type: str
+    bit_offset: int
+    bit_length: int
+    subindex: int = 0
+
+
+_INT_FORMATS = {
+    ('UIntegerT', 8): 'B', ('UIntegerT', 16): 'H', ('UIntegerT', 32): 'I', ('UIntegerT', 64): 'Q',
+    ('IntegerT', 8): 'b', ('IntegerT', 16): 'h', ('IntegerT', 32): 'i', ('IntegerT', 64): 'q',
+    ('Float32T', 32): 'f',
+}
+_OCTET_TYPES = ('StringT', 'OctetStringT', 'TimeT', 'TimeSpanT')
+
+
+def _struct_format(field):
+    if field.bit_offset % 8 or field.bit_length % 8:
+        return None
+    if field.type in _OCTET_TYPES:
+        return '{}s'.format(field.bit_length // 8)
+    return _INT_FORMATS.get((field.type, field.bit_length))
+
+
+class RecordCodec:
+    """Encodes and decodes the items of a record of fixed length.
+
+    :param int bit_length: length of the whole record in bits.
+    :param fields: the :class:`Field` of each item.
+    """
+
+    def __init__(self, bit_length, fields):
+        self.bit_length = bit_length
+        self.length = (bit_length + 7) // 8
+        self.fields = tuple(fields)
+        self._compile()
+
+    def __getstate__(self):
+        # struct.Struct objects can't be pickled, they are compiled again on load
+        return {'bit_length': self.bit_length, 'fields': self.fields}
+
+    def __setstate__(self, state):
+        self.__init__(state['bit_length'], state['fields'])
+
+    def _compile(self):
+        aligned = []
+        bit_fields = []
+        for field in self.fields:
+            fmt = _struct_format(field)
+            if fmt is None:
+                if field.type in _OCTET_TYPES:
+                    raise ValueError('{} must be octet aligned'.format(field.name))
+                mask = (1 << field.bit_length) - 1
+                sign = 1 << (field.bit_length - 1) if field.type == 'IntegerT' else 0
+                bit_fields.append((field.name, field.bit_offset, mask, sign, field.type == 'BooleanT'))
+            else:
+                start = self.length - (field.bit_offset + field.bit_length) // 8
+                aligned.append((start, field, fmt))
+
+        aligned.sort(key=lambda item: item[0])
+        layout = ['>']
+        position = 0
+        for start, field, fmt in aligned:
+            if start < position:
+                raise ValueError('{} overlaps another item'.format(field.name))
+            if start > position:
+                layout.append('{}x'.format(start - position))
+            layout.append(fmt)
+            position = start + field.bit_length // 8
+        if position < self.length:
+            layout.append('{}x'.format(self.length - position))
+
+        self._struct = struct.Struct(''.join(layout))
+        self._struct_names = tuple(field.name for _, field, _ in aligned)
+        self._struct_defaults = tuple(b'' if field.type in _OCTET_TYPES else 0 for _, field, _ in aligned)
+        self._string_names = tuple(field.name for _, field, _ in aligned if field.type == 'StringT')
+        self._bit_fields = tuple(bit_fields)
+
+    def decode(self, data) -> dict:
+        """Decodes a record into a dict that maps the item names to their values."""
+        if len(data) < self.length:
+            raise ValueError('expected a record of {} bytes, got {} bytes'.format(self.length, len(data)))
+        values = dict(zip(self._struct_names, self._struct.unpack_from(data)))
+        for name in self._string_names:
+            values[name] = values[name].rstrip(b'\x00').decode('utf8')
+        if self._bit_fields:
+            raw = int.from_bytes(data[:self.length], 'big')
+            for name, shift, mask, sign, is_bool in self._bit_fields:
+                value = (raw >> shift) & mask
+                if is_bool:
+                    value = bool(value)
+                elif value & sign:
+                    value -= mask + 1
+                values[name] = value
+        return values
+
+    def encode(self, values) -> bytes:
+        """Encodes a record, items that are missing in `values` are set to zero."""
+        args = [values.get(name, default) for name, default in zip(self._struct_names, self._struct_defaults)]
+        args = [value.encode('utf8') if isinstance(value, str) else value for value in args]
+        data = self._struct.pack(*args)
+        if self._bit_fields:
+            raw = 0
+            for name, shift, mask, _, _ in self._bit_fields:
+                raw |= (int(values.get(name, 0)) & mask) << shift
+            data = (int.from_bytes(data, 'big') | raw).to_bytes(self.length, 'big')
+        return data
@@ -0,0 +1,130 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .codec import Field, RecordCodec
+
+from typing import Optional
+
+
+class Variable:
+    """ISDU parameter of a device as described by its IODD.
+
+    :param str name: name of the parameter, e.g. 'Product Name'.
+    :param str id: ID of the variable in the IODD, e.g. 'V_ProductName'.
+    :param int index: ISDU index.
+    :param str access: 'ro', 'wo' or 'rw'.
+    :param str type: IODD datatype, e.g. 'UIntegerT' or 'RecordT'.
+    :param int bit_length: length of the datatype in bits, the maximum length for strings.
+    :param fields: the :class:`~iolink.iodd.codec.Field` of each record item for records.
+    """
+
+    def __init__(self, name, id, index, access, type, bit_length, fields=None):
+        self.name = name
+        self.id = id
+        self.index = index
+        self.access = access
+        self.type = type
+        self.bit_length = bit_length
+        if type == 'RecordT':
+            self.codec = RecordCodec(bit_length, fields)
+        elif type in ('StringT', 'OctetStringT'):
+            self.codec = None
+        else:
+            # single values are octet aligned records with one item
+            self.codec = RecordCodec(-(-bit_length // 8) * 8, [Field('', type, 0, bit_length)])
+
+    def decode(self, data):
+        if self.type == 'StringT':
+            return bytes(data).rstrip(b'\x00').decode('utf8')
+        if self.type == 'OctetStringT':
+            return bytes(data)
+        if self.type == 'RecordT':
+            return self.codec.decode(data)
+        return self.codec.decode(data)['']
+
+    def encode(self, value) -> bytes:
+        if self.type == 'StringT':
+            value = value.encode('utf8')
+        if self.type in ('StringT', 'OctetStringT'):
+            if len(value) * 8 > self.bit_length:
+                raise ValueError('{} is longer than {} bytes'.format(self.name, self.bit_length // 8))
+            return bytes(value)
+        if self.type == 'RecordT':
+            return self.codec.encode(value)
+        return self.codec.encode({'': value})
+
+
+class DeviceDescriptor:
+    """Compiled description of a device, see :func:`iolink.iodd.load_iodd`.
+
+    Everything that is needed to encode and decode the process data and the
+    parameters is compiled when the descriptor is created.
+    """
+
+    def __init__(self, vendor_id, device_id, vendor_name, device_name,
+                 pd_in: Optional[RecordCodec], pd_out: Optional[RecordCodec], variables):
+        self.vendor_id = vendor_id
+        self.device_id = device_id
+        self.vendor_name = vendor_name
+        self.device_name = device_name
+        self.pd_in = pd_in
+        self.pd_out = pd_out
+        self.variables = {}
+        for variable in variables:
+            self.variables[variable.name] = variable
+            self.variables[variable.id] = variable
+
+    def decode_pd_in(self, data) -> Optional[dict]:
+        """Decodes the input process data into a dict that maps the item names to their values.
+
+        Returns None for an empty frame, which ports return while the device isn't in Operate.
+        """
+        if not len(data):
+            return None
+        return self.pd_in.decode(data)
+
+    def encode_pd_out(self, values=None, **fields) -> bytes:
+        """Encodes the output process data from item names and values.
+
+        Items can be given as a dict, as keyword arguments or both.
+        Items that are left out are set to zero.
+        """
+        if values:
+            fields = dict(values, **fields)
+        return self.pd_out.encode(fields)
+
+
+class IoddDevice:
+    """Typed access to a device on a port through its :class:`DeviceDescriptor`.
+
+    :param PortABC port: the port the device is connected to.
+    :param DeviceDescriptor descriptor: the description of the device.
+    """
+
+    def __init__(self, port, descriptor):
+        self.port = port
+        self.descriptor = descriptor
+
+    def read_parameter(self, name):
+        """Reads a parameter by its name or ID and returns its decoded value."""
+        variable = self.descriptor.variables[name]
+        return variable.decode(self.port.read_device_isdu(variable.index, 0))
+
+    def write_parameter(self, name, value):
+        """Encodes a value and writes it to a parameter given by its name or ID."""
+        variable = self.descriptor.variables[name]
+        self.port.write_device_isdu(variable.index, 0, variable.encode(value))
+
+    def get_pd_input(self):
+        """Gets the decoded input process data and the state information."""
+        data, status = self.port.get_device_pd_input_and_status()
+        return self.descriptor.decode_pd_in(data), status
+
+    def set_pd_output(self, values=None, **fields):
+        """Encodes and sets the output process data, see :meth:`DeviceDescriptor.encode_pd_out`."""
+        self.port.set_device_pd_output(self.descriptor.encode_pd_out(values, **fields))
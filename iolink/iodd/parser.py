@@ -0,0 +1,178 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .codec import Field, RecordCodec
+from .descriptor import DeviceDescriptor, Variable
+
+from xml.etree import ElementTree
+import hashlib
+import os
+import pickle
+
+
+# bump this when the layout of the compiled descriptors changes
+CACHE_VERSION = 1
+
+_XSI_TYPE = '{http://www.w3.org/2001/XMLSchema-instance}type'
+
+# Variables of the IODD standard definitions that an IODD refers to with StdVariableRef
+_STD_VARIABLES = {
+    'V_SystemCommand': ('System Command', 0x02, 'wo', 'UIntegerT', 8),
+    'V_VendorName': ('Vendor Name', 0x10, 'ro', 'StringT', 64 * 8),
+    'V_VendorText': ('Vendor Text', 0x11, 'ro', 'StringT', 64 * 8),
+    'V_ProductName': ('Product Name', 0x12, 'ro', 'StringT', 64 * 8),
+    'V_ProductID': ('Product ID', 0x13, 'ro', 'StringT', 64 * 8),
+    'V_ProductText': ('Product Text', 0x14, 'ro', 'StringT', 64 * 8),
+    'V_SerialNumber': ('Serial Number', 0x15, 'ro', 'StringT', 16 * 8),
+    'V_HardwareRevision': ('Hardware Revision', 0x16, 'ro', 'StringT', 64 * 8),
+    'V_FirmwareRevision': ('Firmware Revision', 0x17, 'ro', 'StringT', 64 * 8),
+    'V_ApplicationSpecificTag': ('Application Specific Tag', 0x18, 'rw', 'StringT', 32 * 8),
+    'V_FunctionTag': ('Function Tag', 0x19, 'rw', 'StringT', 32 * 8),
+    'V_LocationTag': ('Location Tag', 0x1A, 'rw', 'StringT', 32 * 8),
+    'V_ErrorCount': ('Error Count', 0x20, 'ro', 'UIntegerT', 16),
+    'V_DeviceStatus': ('Device Status', 0x24, 'ro', 'UIntegerT', 8),
+}
+
+
+def load_iodd(path, cache_dir=None, process_data_id=None) -> DeviceDescriptor:
+    """Parses an IODD file and compiles it into a :class:`DeviceDescriptor`.
+
+    :param str path: path of the IODD XML file.
+    :param str cache_dir: if given, the compiled descriptor is pickled into this
+        directory and loaded from there as long as the IODD file doesn't change.
+    :param str process_data_id: ID of the ProcessData to use if the IODD describes
+        more than one, the first one is used by default.
+    """
+    if cache_dir is None:
+        return parse_iodd(path, process_data_id)
+
+    stat = os.stat(path)
+    key = '{}|{}|{}|{}|{}'.format(os.path.abspath(path), stat.st_mtime_ns, stat.st_size, process_data_id,
+                                  CACHE_VERSION)
+    cache_file = os.path.join(cache_dir, hashlib.sha1(key.encode('utf8')).hexdigest() + '.pickle')
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    descriptor = parse_iodd(path, process_data_id)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    with open(temp_file, 'wb') as f:
+        pickle.dump(descriptor, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, cache_file)
+    return descriptor
+
+
+def parse_iodd(source, process_data_id=None) -> DeviceDescriptor:
+    """Parses an IODD from a file name or file object, see :func:`load_iodd`."""
+    root = ElementTree.parse(source).getroot()
+    for element in root.iter():
+        if isinstance(element.tag, str) and '}' in element.tag:
+            element.tag = element.tag.split('}', 1)[1]
+
+    texts = {text.get('id'): text.get('value')
+             for text in root.iterfind('ExternalTextCollection/PrimaryLanguage/Text')}
+    datatypes = {datatype.get('id'): datatype
+                 for datatype in root.iterfind('.//DatatypeCollection/Datatype')}
+    context = (texts, datatypes)
+
+    identity = root.find('ProfileBody/DeviceIdentity')
+    device_function = root.find('ProfileBody/DeviceFunction')
+
+    variables = []
+    for element in device_function.iterfind('VariableCollection/*'):
+        if element.tag == 'StdVariableRef':
+            variable_id = element.get('id')
+            if variable_id in _STD_VARIABLES:
+                variables.append(Variable(id=variable_id, fields=None,
+                                          **dict(zip(('name', 'index', 'access', 'type', 'bit_length'),
+                                                     _STD_VARIABLES[variable_id]))))
+        elif element.tag == 'Variable':
+            datatype = _datatype(element, context)
+            type_, bit_length = _type_info(datatype, context)
+            variables.append(Variable(_name(element, context) or element.get('id'),
+                                      element.get('id'),
+                                      int(element.get('index')),
+                                      element.get('accessRights'),
+                                      type_,
+                                      bit_length,
+                                      _record_fields(datatype, context) if type_ == 'RecordT' else None))
+
+    pd_in = pd_out = None
+    for process_data in device_function.iterfind('ProcessDataCollection/ProcessData'):
+        if process_data_id is None or process_data.get('id') == process_data_id:
+            pd_in = _process_data_codec(process_data.find('ProcessDataIn'), context)
+            pd_out = _process_data_codec(process_data.find('ProcessDataOut'), context)
+            break
+
+    device_name = identity.find('DeviceName')
+    return DeviceDescriptor(vendor_id=int(identity.get('vendorId')),
+                            device_id=int(identity.get('deviceId')),
+                            vendor_name=identity.get('vendorName'),
+                            device_name=texts.get(device_name.get('textId')) if device_name is not None else None,
+                            pd_in=pd_in,
+                            pd_out=pd_out,
+                            variables=variables)
+
+
+def _name(element, context):
+    name = element.find('Name')
+    if name is None:
+        return None
+    return context[0].get(name.get('textId'))
+
+
+def _datatype(element, context):
+    for tag in ('Datatype', 'SimpleDatatype'):
+        datatype = element.find(tag)
+        if datatype is not None:
+            return datatype
+    return context[1][element.find('DatatypeRef').get('datatypeId')]
+
+
+def _type_info(datatype, context):
+    type_ = datatype.get(_XSI_TYPE)
+    if type_ == 'BooleanT':
+        return type_, 1
+    if type_ == 'Float32T':
+        return type_, 32
+    if type_ in ('TimeT', 'TimeSpanT'):
+        return type_, 64
+    if type_ in ('StringT', 'OctetStringT'):
+        return type_, int(datatype.get('fixedLength')) * 8
+    if type_ == 'ArrayT':
+        # arrays are passed on as raw octets
+        _, element_bit_length = _type_info(_datatype(datatype, context), context)
+        return 'OctetStringT', -(-int(datatype.get('count')) * element_bit_length // 8) * 8
+    return type_, int(datatype.get('bitLength'))
+
+
+def _record_fields(datatype, context):
+    fields = []
+    for item in datatype.iterfind('RecordItem'):
+        type_, bit_length = _type_info(_datatype(item, context), context)
+        subindex = int(item.get('subindex'))
+        fields.append(Field(_name(item, context) or 'Subindex {}'.format(subindex),
+                            type_,
+                            int(item.get('bitOffset')),
+                            bit_length,
+                            subindex))
+    return fields
+
+
+def _process_data_codec(element, context):
+    if element is None:
+        return None
+    datatype = _datatype(element, context)
+    type_, bit_length = _type_info(datatype, context)
+    if type_ == 'RecordT':
+        return RecordCodec(bit_length, _record_fields(datatype, context))
+    return RecordCodec(int(element.get('bitLength')),
+                       [Field(_name(element, context) or element.get('id'), type_, 0, bit_length)])
@@ -0,0 +1,153 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .backup import backup_parameters, restore_parameters
+from .misc import available_interfaces
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, NamedTuple, Optional
+
+
+class PortResult(NamedTuple):
+    """Result of an operation on one port of a :class:`PortManager`."""
+    value: Any
+    error: Optional[BaseException]
+
+
+class PortManager:
+    """Opens several ports in parallel and fans operations out to all of them.
+
+    Every operation is run on all ports concurrently, so bringing up N ports
+    takes about as long as bringing up the slowest one.
+
+    :param str interface: ID of the IO-Link master device, see :func:`iolink.get_port`.
+    :param port_kwargs: list with the keyword arguments for each port, e.g.
+        ``[{'com_port': 'COM3'}, {'com_port': 'COM4'}]``, or the number of ports
+        if they don't need any arguments.
+    """
+
+    def __init__(self, interface, port_kwargs):
+        if isinstance(port_kwargs, int):
+            port_kwargs = [{} for _ in range(port_kwargs)]
+        self.interface = interface
+        self.port_kwargs = list(port_kwargs)
+        self.ports = []
+        self._executor = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Connects all ports concurrently.
+
+        If any of the ports fails to connect, the others are shut down again
+        and the first error is raised.
+        """
+        port_class = available_interfaces[self.interface]
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.port_kwargs)),
+                                            thread_name_prefix='iolink-manager')
+        futures = [self._executor.submit(port_class, **kwargs) for kwargs in self.port_kwargs]
+        errors = [future.exception() for future in futures]
+        if any(errors):
+            for future, error in zip(futures, errors):
+                if error is None:
+                    future.result().shut_down()
+            self._executor.shutdown()
+            self._executor = None
+            raise next(error for error in errors if error is not None)
+        self.ports = [future.result() for future in futures]
+
+    def close(self):
+        """Shuts down all ports."""
+        if self._executor is None:
+            return
+        results = self.map(lambda port: port.shut_down())
+        self._executor.shutdown()
+        self._executor = None
+        self.ports = []
+        self._raise_first_error(results)
+
+    def map(self, func) -> List[PortResult]:
+        """Calls `func` with each port concurrently.
+
+        :return: a result for each port, in the order of the ports.
+        """
+        if self._executor is None:
+            raise UnboundLocalError
+        return self._results([self._executor.submit(func, port) for port in self.ports])
+
+    def _map_each(self, func, values) -> List[PortResult]:
+        """Calls `func` with each port and the value at the position of the port concurrently."""
+        if self._executor is None:
+            raise UnboundLocalError
+        return self._results([self._executor.submit(func, port, value) for port, value in zip(self.ports, values)])
+
+    @staticmethod
+    def _results(futures):
+        results = []
+        for future in futures:
+            error = future.exception()
+            results.append(PortResult(None if error else future.result(), error))
+        return results
+
+    def power_on(self):
+        self._raise_first_error(self.map(lambda port: port.power_on()))
+
+    def power_off(self):
+        self._raise_first_error(self.map(lambda port: port.power_off()))
+
+    def change_device_state_to(self, target_state: str):
+        self._raise_first_error(self.map(lambda port: port.change_device_state_to(target_state)))
+
+    def read_isdu_all(self, index: int, subindex: int) -> List[PortResult]:
+        """Reads a parameter from the devices on all ports."""
+        return self.map(lambda port: port.read_device_isdu(index, subindex))
+
+    def get_pd_all(self) -> List[PortResult]:
+        """Gets the input process data and state information from the devices on all ports."""
+        return self.map(lambda port: port.get_device_pd_input_and_status())
+
+    def backup_parameters_all(self, indices, batch_size=32) -> List[PortResult]:
+        """Reads the parameters of the devices on all ports into snapshots, see :func:`iolink.backup.backup_parameters`."""
+        indices = list(indices)
+        return self.map(lambda port: backup_parameters(port, indices, batch_size))
+
+    def restore_parameters_all(self, snapshots, batch_size=32) -> List[PortResult]:
+        """Restores parameters to the devices on all ports, see :func:`iolink.backup.restore_parameters`.
+
+        :param snapshots: one snapshot for all devices, or a list with a snapshot for each port.
+        """
+        if not isinstance(snapshots, (list, tuple)):
+            snapshots = [snapshots] * len(self.ports)
+        if len(snapshots) != len(self.ports):
+            raise ValueError('expected a snapshot for each of the {} ports'.format(len(self.ports)))
+        return self._map_each(lambda port, snapshot: restore_parameters(port, snapshot, batch_size), snapshots)
+
+    def identify_all(self, cache, port_ids=None, indices=None, resolve_descriptor=None) -> List[PortResult]:
+        """Identifies the devices on all ports, see :meth:`iolink.fingerprint.FingerprintCache.identify`.
+
+        :param FingerprintCache cache: the cache of the known devices.
+        :param port_ids: a name for each port that stays the same across restarts,
+            by default the interface and the position of the port.
+        """
+        if port_ids is None:
+            port_ids = ['{}:{}'.format(self.interface, number) for number in range(len(self.ports))]
+        if len(port_ids) != len(self.ports):
+            raise ValueError('expected a name for each of the {} ports'.format(len(self.ports)))
+        return self._map_each(lambda port, port_id: cache.identify(port, port_id, indices, resolve_descriptor),
+                              port_ids)
+
+    @staticmethod
+    def _raise_first_error(results):
+        for result in results:
+            if result.error is not None:
+                raise result.error
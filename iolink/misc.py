@@ -6,19 +6,22 @@
 # This software is proprietary to Analog Devices, Inc. and its licensors.
 ################################################################################
 
-from .interfaces.iqlink.iqlink import IqLinkPort
+from .interfaces import InterfaceRegistry
 
 from contextlib import contextmanager
 
-available_interfaces = {'iqLink': IqLinkPort}
+available_interfaces = InterfaceRegistry()
 
 
 @contextmanager
-def get_port(interface):
+def get_port(interface, **kwargs):
     """Factory of specific instances of the abstract Port class.
 
-    :param str interface: ID of your IO-Link master device - currently only `iqLink` is supported.
+    :param str interface: ID of your IO-Link master device - `iqLink`, `sim` for the simulated port,
+        `replay` to play back a recording or an interface registered by another package.
+    :param kwargs: passed on to the port, e.g. `com_port` for the iqLink, `device` for the simulated port
+        or `path` for the recording.
     """
-    port = available_interfaces[interface]()
+    port = available_interfaces[interface](**kwargs)
     yield port
     port.shut_down()
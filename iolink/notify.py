@@ -0,0 +1,344 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from collections import deque
+from typing import NamedTuple
+import struct
+import threading
+
+_UNSET = object()
+
+EDGES = ('rising', 'falling', 'both')
+
+
+class PdChange(NamedTuple):
+    """Change of a subscribed part of the input process data."""
+    value: object
+    previous: object
+    status: int
+    timestamp: float
+    cycle: int
+
+
+class Subscription:
+    """Handle of a subscription, returned by the subscribe methods of :class:`PdNotifier`."""
+
+    def __init__(self, notifier, field, target, deadband=None):
+        self.field = field
+        self.deadband = deadband
+        # a callable or a queue
+        self._deliver = target if callable(target) else target.put_nowait
+        self._notifier = notifier
+        self._value = _UNSET
+
+    def cancel(self):
+        self._notifier.unsubscribe(self)
+
+    def _update(self, value, status, timestamp, cycle):
+        previous = self._value
+        if value == previous:
+            return None
+        if previous is not _UNSET:
+            if (self.deadband is not None and value is not None and previous is not None
+                    and abs(value - previous) <= self.deadband):
+                return None
+        else:
+            previous = None
+        self._value = value
+        return PdChange(value, previous, status, timestamp, cycle)
+
+
+class _BytesField:
+    def __init__(self, offset, length):
+        self.key = ('bytes', offset, length)
+        self._offset = offset
+        self._end = offset + length
+        self.subscriptions = ()
+
+    def mask(self, frame_length):
+        if self._end > frame_length:
+            return -1
+        return ((1 << 8 * (self._end - self._offset)) - 1) << 8 * (frame_length - self._end)
+
+    def extract(self, frame, as_int):
+        if self._end > len(frame):
+            return None
+        return frame[self._offset:self._end]
+
+
+class _ValueField(_BytesField):
+    def __init__(self, offset, format):
+        self._struct = struct.Struct(format)
+        super().__init__(offset, self._struct.size)
+        self.key = ('value', offset, self._struct.format)
+
+    def extract(self, frame, as_int):
+        if self._end > len(frame):
+            return None
+        return self._struct.unpack_from(frame, self._offset)[0]
+
+
+class _BitsField:
+    def __init__(self, bit_offset, bit_length):
+        self.key = ('bits', bit_offset, bit_length)
+        self._bit_offset = bit_offset
+        self._end = bit_offset + bit_length
+        self._mask = ((1 << bit_length) - 1) << bit_offset
+        self.subscriptions = ()
+
+    def mask(self, frame_length):
+        return self._mask
+
+    def extract(self, frame, as_int):
+        if self._end > 8 * len(frame):
+            return None
+        return (as_int & self._mask) >> self._bit_offset
+
+
+class _StatusField:
+    def __init__(self, mask, edge):
+        self.key = ('status', mask, edge)
+        self.mask = mask
+        self.edge = edge
+
+
+class PdNotifier:
+    """Notifies subscribers of changes of the input process data.
+
+    The thread that polls the port passes every frame to :meth:`publish`,
+    which only compares it with the previous frame. Changed frames are
+    matched against the subscriptions and delivered on a thread of the
+    notifier, so the number of subscribers doesn't slow down the bus cycle.
+    Subscribers that watch the same field share the decoding of its value.
+
+    A subscription receives a :class:`PdChange`, the first one with the value
+    of the field when the next frame is processed, then one for each change.
+    The target of a subscription is a callable or a queue with a
+    ``put_nowait`` method, e.g. :class:`queue.Queue`. Callbacks must not
+    block, they delay all other subscribers.
+
+    :param int max_pending: frames that may wait for delivery, the oldest ones are dropped beyond that.
+    """
+
+    def __init__(self, max_pending=1024):
+        self.dropped = 0
+        self.callback_errors = 0
+
+        self._last_data = None
+        self._last_status = None
+        self._frames = deque()
+        self._max_pending = max_pending
+        # sequence numbers of the last published and the last delivered frame
+        self._published = 0
+        self._processed = 0
+        self._condition = threading.Condition()
+        self._wakeup = threading.Event()
+
+        self._lock = threading.Lock()
+        self._fields = {}
+        self._field_list = ()
+        self._status_subscriptions = ()
+        self._pending = []
+        # the last frame that was delivered
+        self._frame = None
+        self._frame_int = 0
+        self._status = 0
+
+        self._stop = False
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        if self._thread is not None:
+            raise RuntimeError('notifier is already running')
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name='PdNotifier', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the delivery, frames that are still pending are dropped."""
+        if self._thread is None:
+            return
+        self._stop = True
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+
+    def publish(self, data, status, timestamp=0.0, cycle=0):
+        """Passes a frame of input process data to the notifier, called by the polling thread.
+
+        The signature matches the listener of :class:`~iolink.cyclic.CyclicPdEngine`.
+
+        :param data: the input process data, a bytes-like object that is copied if it changed.
+        :param int status: the state information of the port.
+        """
+        if status == self._last_status and data == self._last_data:
+            return
+        data = bytes(data)
+        self._last_data = data
+        self._last_status = status
+        if len(self._frames) >= self._max_pending:
+            try:
+                self._frames.popleft()
+                self.dropped += 1
+            except IndexError:
+                # the notifier thread took it in the meantime
+                pass
+        self._published += 1
+        self._frames.append((self._published, data, status, timestamp, cycle))
+        self._wakeup.set()
+
+    def flush(self, timeout=None):
+        """Waits until all published frames are delivered.
+
+        :return: `False` if the timeout expired before.
+        """
+        with self._condition:
+            published = self._published
+            return self._condition.wait_for(lambda: self._processed >= published and not self._pending, timeout)
+
+    def subscribe_bytes(self, target, offset, length) -> Subscription:
+        """Subscribes to a range of bytes, the value is `bytes` or `None` if the frame is too short.
+
+        :param target: callable or queue that receives the :class:`PdChange` objects.
+        :param int offset: offset of the first byte in the process data.
+        :param int length: number of bytes.
+        """
+        return self._subscribe(_BytesField(offset, length), target)
+
+    def subscribe_bits(self, target, bit_offset, bit_length, deadband=None) -> Subscription:
+        """Subscribes to a range of bits, the value is an unsigned int.
+
+        Bit offsets count from the least significant bit of the last octet, as
+        in IODDs, so the fields of :class:`~iolink.iodd.RecordCodec` can be
+        used directly.
+
+        :param deadband: changes up to this amount from the last delivered value are ignored.
+        """
+        return self._subscribe(_BitsField(bit_offset, bit_length), target, deadband)
+
+    def subscribe_value(self, target, offset, format, deadband=None) -> Subscription:
+        """Subscribes to a number at a byte offset, decoded with a :mod:`struct` format.
+
+        :param str format: the format, e.g. ``'>h'`` for a big endian int16.
+        :param deadband: changes up to this amount from the last delivered value are ignored.
+        """
+        return self._subscribe(_ValueField(offset, format), target, deadband)
+
+    def subscribe_status(self, target, mask, edge='rising') -> Subscription:
+        """Subscribes to edges of bits of the state information.
+
+        The value is the status masked with `mask`. The first frame only
+        serves as reference, it triggers no event.
+
+        :param int mask: the watched bits, e.g. ``0x2`` for the target reached bit of the PD42.
+        :param str edge: 'rising', 'falling' or 'both'.
+        """
+        if edge not in EDGES:
+            raise ValueError('edge must be one of {}'.format(', '.join(EDGES)))
+        subscription = Subscription(self, _StatusField(mask, edge), target)
+        with self._lock:
+            self._status_subscriptions += (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if isinstance(subscription.field, _StatusField):
+                self._status_subscriptions = tuple(s for s in self._status_subscriptions if s is not subscription)
+                return
+            field = self._fields.get(subscription.field.key)
+            if field is None:
+                return
+            field.subscriptions = tuple(s for s in field.subscriptions if s is not subscription)
+            if not field.subscriptions:
+                del self._fields[field.key]
+                self._field_list = tuple(self._fields.values())
+            if subscription in self._pending:
+                self._pending.remove(subscription)
+
+    def _subscribe(self, field, target, deadband=None):
+        with self._lock:
+            field = self._fields.setdefault(field.key, field)
+            subscription = Subscription(self, field, target, deadband)
+            field.subscriptions += (subscription,)
+            self._field_list = tuple(self._fields.values())
+            self._pending.append(subscription)
+        self._wakeup.set()
+        return subscription
+
+    def _run(self):
+        frames = self._frames
+        while not self._stop:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stop:
+                break
+            processed = self._processed
+            while frames:
+                processed, *frame = frames.popleft()
+                self._deliver_frame(*frame)
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if pending and self._frame is not None:
+                frame, status = self._frame, self._status
+                self._deliver([(s, s._update(s.field.extract(frame, self._frame_int), status, 0.0, 0))
+                               for s in pending])
+            with self._condition:
+                self._processed = processed
+                self._condition.notify_all()
+
+    def _deliver_frame(self, frame, status, timestamp, cycle):
+        previous, previous_status = self._frame, self._status
+        as_int = int.from_bytes(frame, 'big')
+        if previous is None or len(previous) != len(frame):
+            diff = -1
+        else:
+            diff = as_int ^ self._frame_int
+        self._frame = frame
+        self._frame_int = as_int
+        self._status = status
+
+        changes = []
+        if diff:
+            length = len(frame)
+            for field in self._field_list:
+                if diff & field.mask(length):
+                    value = field.extract(frame, as_int)
+                    for subscription in field.subscriptions:
+                        changes.append((subscription, subscription._update(value, status, timestamp, cycle)))
+        if previous is not None and status != previous_status:
+            rising = ~previous_status & status
+            falling = previous_status & ~status
+            for subscription in self._status_subscriptions:
+                mask = subscription.field.mask
+                edge = subscription.field.edge
+                if edge == 'rising':
+                    triggered = rising & mask
+                elif edge == 'falling':
+                    triggered = falling & mask
+                else:
+                    triggered = (rising | falling) & mask
+                if triggered:
+                    changes.append((subscription, PdChange(status & mask, previous_status & mask,
+                                                           status, timestamp, cycle)))
+        self._deliver(changes)
+
+    def _deliver(self, changes):
+        for subscription, change in changes:
+            if change is None:
+                continue
+            try:
+                subscription._deliver(change)
+            except Exception:
+                self.callback_errors += 1
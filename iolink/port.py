@@ -6,17 +6,46 @@
 # This software is proprietary to Analog Devices, Inc. and its licensors.
 ################################################################################
 
-from typing import Tuple
+from typing import Iterable, List, NamedTuple, Tuple
 from abc import ABC, abstractmethod
 
+# largest process data and ISDU objects that IO-Link can transfer, in bytes
+PD_MAX_LENGTH = 32
+ISDU_MAX_LENGTH = 232
+
+# ISDU error codes (IO-Link Interface and System Specification, Annex C)
+ISDU_ERR_INDEX_NOT_AVAILABLE = 0x8011
+ISDU_ERR_SUBINDEX_NOT_AVAILABLE = 0x8012
+ISDU_ERR_ACCESS_DENIED = 0x8023
+ISDU_ERR_LENGTH_OVERRUN = 0x8033
+ISDU_ERR_LENGTH_UNDERRUN = 0x8034
+
 
 class IsduError(Exception):
     def __init__(self, error_code):
         self.error_code = error_code
 
 
+class DeviceIdentity(NamedTuple):
+    """Identification of the device on a port.
+
+    `revision_id` is the IO-Link protocol revision of the device and
+    `function_id` its function ID, both from the Direct Parameter Page 1.
+    """
+    vendor_id: int
+    device_id: int
+    serial_number: bytes
+    revision_id: int = 0
+    function_id: int = 0
+
+
 class PortABC(ABC):
     """Abstract base class that represents one Masters IO-Link port."""
+    # the last output process data, kept by ports that support partial updates
+    _pd_output = None
+    # `(index, subindex, data)` of the ISDU request started with start_isdu_request()
+    _isdu_request = None
+
     @abstractmethod
     def power_on(self):
         """Switches on the IO-Link power line of the port."""
@@ -40,16 +69,69 @@ class PortABC(ABC):
         """Gets the input process data from a device and the state information."""
         pass
 
+    def get_device_pd_input_into(self, buf) -> Tuple[int, int]:
+        """Reads the input process data from a device into a preallocated buffer.
+
+        Intended for polling loops: pass the same writable buffer (e.g. a
+        ``memoryview`` of a ``bytearray``) on every call so that no new objects
+        have to be created per cycle.
+
+        :param buf: writable buffer that is large enough for the process data.
+        :return: number of bytes written to `buf` and the state information.
+        """
+        data, status = self.get_device_pd_input_and_status()
+        n = len(data)
+        buf[:n] = data
+        return n, status
+
     @abstractmethod
     def set_device_pd_output(self, data: bytes):
         """Sets the output process data for a device."""
         pass
 
+    def set_device_pd_output_fields(self, offset: int, data: bytes):
+        """Sets part of the output process data, the other bytes keep their last value.
+
+        The complete output has to be set with :meth:`set_device_pd_output`
+        once before.
+
+        :param int offset: position of `data` in the output process data in bytes.
+        :param bytes data: the new content of the fields.
+        """
+        frame = self._pd_output
+        if frame is None:
+            raise ValueError('the complete output process data has to be set first')
+        end = offset + len(data)
+        if offset < 0 or end > len(frame):
+            raise ValueError('the fields exceed the output process data')
+        self.set_device_pd_output(frame[:offset] + bytes(data) + frame[end:])
+
+    @abstractmethod
+    def invalidate_pd_output(self):
+        """Marks the output process data as invalid, so that the device goes to its safe state.
+
+        The next call of :meth:`set_device_pd_output` makes it valid again.
+        """
+        pass
+
     @abstractmethod
     def read_device_isdu(self, index: int, subindex: int):
         """Reads content of a parameter from the device."""
         pass
 
+    def read_device_isdu_into(self, index: int, subindex: int, buf) -> int:
+        """Reads the content of a parameter into a preallocated buffer.
+
+        :param buf: writable buffer, e.g. a ``memoryview`` slice of a ``bytearray``.
+        :return: number of bytes written to `buf`.
+        """
+        data = self.read_device_isdu(index, subindex)
+        n = len(data)
+        if n > len(buf):
+            raise ValueError('the parameter has {} bytes, the buffer only room for {}'.format(n, len(buf)))
+        buf[:n] = data
+        return n
+
     @abstractmethod
     def write_device_isdu(self, index: int, subindex: int, data):
         """Writes content of a parameter from the device.
@@ -58,6 +140,162 @@ class PortABC(ABC):
         """
         pass
 
+    def read_device_isdu_many(self, items: Iterable[Tuple[int, int]]) -> List:
+        """Reads the content of several parameters from the device.
+
+        A parameter that can't be read doesn't abort the batch, its
+        :class:`IsduError` is returned in place of the content instead.
+
+        :param items: `(index, subindex)` of each parameter.
+        :return: a list with the content or the error for each parameter.
+        """
+        results = []
+        for index, subindex in items:
+            try:
+                results.append(self.read_device_isdu(index, subindex))
+            except IsduError as e:
+                results.append(e)
+        return results
+
+    def write_device_isdu_many(self, items: Iterable[Tuple[int, int, bytes]]) -> List:
+        """Writes the content of several parameters to the device.
+
+        :param items: `(index, subindex, data)` of each parameter.
+        :return: a list with `None` or the :class:`IsduError` for each parameter.
+        """
+        results = []
+        for index, subindex, data in items:
+            try:
+                self.write_device_isdu(index, subindex, data)
+                results.append(None)
+            except IsduError as e:
+                results.append(e)
+        return results
+
+    def start_isdu_request(self, index: int, subindex: int, data=None):
+        """Starts an ISDU request without waiting for the response.
+
+        Together with :meth:`poll_isdu_response` and :meth:`get_isdu_response`
+        this lets a caller exchange process data while the request is on the
+        way. Only one request can be started at a time.
+
+        :param data: content to write, `None` to read the parameter.
+        """
+        self._isdu_request = (index, subindex, data)
+
+    def poll_isdu_response(self) -> bool:
+        """Returns `True` once :meth:`get_isdu_response` would not have to wait for the device."""
+        return True
+
+    def get_isdu_response(self):
+        """Finishes the started ISDU request, waits for the device if needed.
+
+        :return: the content of a read parameter, `None` for a write.
+        """
+        request = self._isdu_request
+        if request is None:
+            raise RuntimeError('no ISDU request was started')
+        self._isdu_request = None
+        index, subindex, data = request
+        if data is None:
+            return self.read_device_isdu(index, subindex)
+        self.write_device_isdu(index, subindex, data)
+
+    def get_device_identity(self) -> DeviceIdentity:
+        """Returns the vendor ID, device ID, serial number, revision ID and function ID of the device.
+
+        Masters that keep the identification from the start-up of the device
+        answer without any ISDU request. The default reads the Direct
+        Parameter Page 1 (index 0x00) and the serial number (index 0x15).
+        """
+        page = self.read_device_isdu(0x00, 0)
+        # the function ID in bytes 12 and 13 is the last field that is used
+        if len(page) < 14:
+            raise ValueError('the Direct Parameter Page 1 has only {} bytes'.format(len(page)))
+        try:
+            serial_number = bytes(self.read_device_isdu(0x15, 0))
+        except IsduError:
+            # the serial number is optional
+            serial_number = b''
+        return DeviceIdentity(int.from_bytes(page[7:9], 'big'), int.from_bytes(page[9:12], 'big'), serial_number,
+                              page[4], int.from_bytes(page[12:14], 'big'))
+
+    def reconnect(self):
+        """Connects to the master again after the connection was lost.
+
+        Ports that don't keep a connection to a master do nothing.
+        """
+        pass
+
     @abstractmethod
     def shut_down(self):
         pass
+
+
+class PortWrapper(PortABC):
+    """Base class for ports that add behaviour to another port.
+
+    All methods are delegated to the wrapped port, subclasses override the
+    ones they are interested in.
+
+    :param PortABC port: the wrapped port.
+    """
+    def __init__(self, port: PortABC):
+        self.port = port
+
+    def power_on(self):
+        self.port.power_on()
+
+    def power_off(self):
+        self.port.power_off()
+
+    def change_device_state_to(self, target_state: str):
+        self.port.change_device_state_to(target_state)
+
+    def get_device_pd_input_and_status(self) -> Tuple[bytes, int]:
+        return self.port.get_device_pd_input_and_status()
+
+    def get_device_pd_input_into(self, buf) -> Tuple[int, int]:
+        return self.port.get_device_pd_input_into(buf)
+
+    def set_device_pd_output(self, data: bytes):
+        self.port.set_device_pd_output(data)
+
+    def set_device_pd_output_fields(self, offset: int, data: bytes):
+        self.port.set_device_pd_output_fields(offset, data)
+
+    def invalidate_pd_output(self):
+        self.port.invalidate_pd_output()
+
+    def read_device_isdu(self, index: int, subindex: int):
+        return self.port.read_device_isdu(index, subindex)
+
+    def read_device_isdu_into(self, index: int, subindex: int, buf) -> int:
+        return self.port.read_device_isdu_into(index, subindex, buf)
+
+    def write_device_isdu(self, index: int, subindex: int, data):
+        self.port.write_device_isdu(index, subindex, data)
+
+    def read_device_isdu_many(self, items: Iterable[Tuple[int, int]]) -> List:
+        return self.port.read_device_isdu_many(items)
+
+    def write_device_isdu_many(self, items: Iterable[Tuple[int, int, bytes]]) -> List:
+        return self.port.write_device_isdu_many(items)
+
+    def start_isdu_request(self, index: int, subindex: int, data=None):
+        self.port.start_isdu_request(index, subindex, data)
+
+    def poll_isdu_response(self) -> bool:
+        return self.port.poll_isdu_response()
+
+    def get_isdu_response(self):
+        return self.port.get_isdu_response()
+
+    def get_device_identity(self) -> DeviceIdentity:
+        return self.port.get_device_identity()
+
+    def reconnect(self):
+        self.port.reconnect()
+
+    def shut_down(self):
+        self.port.shut_down()
@@ -0,0 +1,251 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Recording of process data into a memory-mapped ring file and replaying it.
+
+The file starts with a header, followed by `capacity` records of a fixed size::
+
+    header: magic (8s) version (u16) pd_size (u16) record_size (u32) capacity (u64) count (u64)
+    record: timestamp in ns since the epoch (i64) status (u8) length (u8) process data (pd_size bytes)
+
+All numbers are little-endian. `count` is the number of records written so
+far, record ``n`` is stored in slot ``n % capacity``.
+"""
+
+from .port import PortABC, IsduError, ISDU_ERR_INDEX_NOT_AVAILABLE
+
+from typing import NamedTuple
+import mmap
+import struct
+import time
+
+
+MAGIC = b'IOLREC\x00\x00'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sHHIQQ')
+_HEADER_SIZE = 64
+_COUNT = struct.Struct('<Q')
+_COUNT_OFFSET = 24
+_RECORD_HEADER = struct.Struct('<qBB')
+
+
+class PdRecord(NamedTuple):
+    timestamp_ns: int
+    status: int
+    data: bytes
+
+
+class PdRecorder:
+    """Appends process data records to a preallocated, memory-mapped ring file.
+
+    :param str path: the file, it is created or overwritten.
+    :param int pd_size: maximum length of the process data per record.
+    :param int capacity: number of records in the ring, the oldest ones are overwritten.
+    """
+
+    def __init__(self, path, pd_size=32, capacity=100_000):
+        if not 0 < pd_size <= 255:
+            # the length of a record is stored in a byte
+            raise ValueError('pd_size must be between 1 and 255')
+        self.path = path
+        self.pd_size = pd_size
+        self.capacity = capacity
+        # keep the records 8 byte aligned
+        self.record_size = -(-(_RECORD_HEADER.size + pd_size) // 8) * 8
+        self.count = 0
+
+        size = _HEADER_SIZE + capacity * self.record_size
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        self._file = open(path, 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        # the port reads into a buffer of its own, views of the mapping would keep it from being closed
+        self._buffer = memoryview(bytearray(pd_size))
+        _HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, pd_size, self.record_size, capacity, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, port):
+        """Gets the input process data from a port and appends it.
+
+        :return: the length of the process data and the state information.
+        """
+        offset = _HEADER_SIZE + (self.count % self.capacity) * self.record_size
+        data_offset = offset + _RECORD_HEADER.size
+        n, status = port.get_device_pd_input_into(self._buffer)
+        self._mmap[data_offset:data_offset + n] = self._buffer[:n]
+        self._commit(offset, time.time_ns(), status, n)
+        return n, status
+
+    def append(self, data, status, timestamp_ns=None):
+        """Appends process data that was received by other means, e.g. from a :class:`~iolink.cyclic.PdSnapshot`."""
+        if len(data) > self.pd_size:
+            raise ValueError('process data is longer than {} bytes'.format(self.pd_size))
+        offset = _HEADER_SIZE + (self.count % self.capacity) * self.record_size
+        data_offset = offset + _RECORD_HEADER.size
+        self._mmap[data_offset:data_offset + len(data)] = data
+        self._commit(offset, time.time_ns() if timestamp_ns is None else timestamp_ns, status, len(data))
+
+    def flush(self):
+        self._mmap.flush()
+
+    def close(self):
+        if self._mmap.closed:
+            return
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+    def _commit(self, offset, timestamp_ns, status, length):
+        _RECORD_HEADER.pack_into(self._mmap, offset, timestamp_ns, status, length)
+        # the count is updated last so that readers never see a record before it is complete
+        self.count += 1
+        _COUNT.pack_into(self._mmap, _COUNT_OFFSET, self.count)
+
+
+class PdRecordReader:
+    """Reads a file written by :class:`PdRecorder`, also while it is still being written.
+
+    :param str path: the file.
+    """
+
+    # position of the process data within a record
+    data_offset = _RECORD_HEADER.size
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.pd_size, self.record_size, self.capacity, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{} is not a process data recording'.format(path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def __iter__(self):
+        return iter(self.read())
+
+    @property
+    def count(self):
+        """Number of records written so far, including the ones that were overwritten."""
+        return _COUNT.unpack_from(self._mmap, _COUNT_OFFSET)[0]
+
+    @property
+    def buffer(self):
+        """All slots as one buffer, e.g. for :func:`iolink.iodd.bulk.decode_frames`
+        with ``offset=data_offset`` and ``stride=record_size``."""
+        return memoryview(self._mmap)[_HEADER_SIZE:_HEADER_SIZE + self.capacity * self.record_size]
+
+    def read(self, start=0):
+        """Returns the records from number `start` on that are still in the ring, oldest first.
+
+        Once the ring is full, the oldest record is left out since the writer
+        may be overwriting it.
+        """
+        count = self.count
+        start = max(start, count - self.capacity)
+        records = [self.read_record(n) for n in range(start, count)]
+        # drop the records that the writer reached while they were read
+        stale = self.count - self.capacity + 1 - start
+        if stale > 0:
+            records = records[stale:]
+        return records
+
+    def read_record(self, n):
+        """Returns record number `n`, without checking whether it is still in the ring."""
+        offset = _HEADER_SIZE + (n % self.capacity) * self.record_size
+        timestamp_ns, status, length = _RECORD_HEADER.unpack_from(self._mmap, offset)
+        data_offset = offset + _RECORD_HEADER.size
+        return PdRecord(timestamp_ns, status, self._mmap[data_offset:data_offset + length])
+
+    def close(self):
+        self._mmap.close()
+
+
+class ReplayPort(PortABC):
+    """Port that plays back a recording of :class:`PdRecorder` as the input process data.
+
+    :param str path: the recording.
+    :param float speed: playback speed relative to the recording, 0 plays back as fast as possible.
+    :param bool loop: start over at the end of the recording instead of raising `EOFError`.
+    :param dict parameters: ISDU parameters of the device, maps `(index, subindex)` to bytes.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, parameters=None, **kwargs):
+        self.speed = speed
+        self.loop = loop
+        self.parameters = dict(parameters or {})
+        self._pd_output = None
+        self._reader = PdRecordReader(path)
+        # the records that are in the file when the port is opened are played back
+        self._last = self._reader.count
+        self._first = max(0, self._last - self._reader.capacity)
+        if self._first == self._last:
+            self._reader.close()
+            raise EOFError('{} is empty'.format(path))
+        self._position = self._first
+        self._start = None
+
+    def power_on(self):
+        pass
+
+    def power_off(self):
+        pass
+
+    def change_device_state_to(self, target_state):
+        pass
+
+    def get_device_pd_input_and_status(self):
+        if self._position == self._last:
+            if not self.loop:
+                raise EOFError('end of recording')
+            self._position = self._first
+            self._start = None
+        record = self._reader.read_record(self._position)
+        self._position += 1
+
+        if self.speed:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = (now, record.timestamp_ns)
+            due = self._start[0] + (record.timestamp_ns - self._start[1]) / 1e9 / self.speed
+            if due > now:
+                time.sleep(due - now)
+        return record.data, record.status
+
+    def set_device_pd_output(self, data):
+        self._pd_output = bytes(data)
+
+    def invalidate_pd_output(self):
+        pass
+
+    def read_device_isdu(self, index, subindex):
+        try:
+            return self.parameters[(index, subindex)]
+        except KeyError:
+            raise IsduError(ISDU_ERR_INDEX_NOT_AVAILABLE)
+
+    def write_device_isdu(self, index, subindex, data):
+        if (index, subindex) not in self.parameters:
+            raise IsduError(ISDU_ERR_INDEX_NOT_AVAILABLE)
+        self.parameters[(index, subindex)] = bytes(data)
+
+    def shut_down(self):
+        self._reader.close()
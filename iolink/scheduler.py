@@ -0,0 +1,184 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .cyclic import CyclicPdEngine
+
+from concurrent.futures import Future
+from typing import NamedTuple
+import heapq
+import itertools
+import math
+import threading
+import time
+
+# priorities of ISDU requests, the process data always comes first
+URGENT = 0
+BACKGROUND = 1
+
+
+class SchedulerMetrics(NamedTuple):
+    """Counters of a :class:`PortScheduler`."""
+    queue_depth: int
+    max_queue_depth: int
+    completed: int
+    failed: int
+    deadline_misses: int
+    overruns: int
+
+
+class PortScheduler(CyclicPdEngine):
+    """Exchanges the process data of a port at a fixed cycle time and runs ISDU requests in between.
+
+    Every cycle starts with the process data. The time until the next cycle
+    advances the ISDU requests step by step: the request is started, polled
+    until the device has responded and finished, see
+    :meth:`~iolink.port.PortABC.start_isdu_request`. At least one step runs
+    after every cycle, so that ISDU requests progress when the cycles take
+    all of the time.
+
+    Requests start in the order of their priority, :data:`URGENT` before
+    :data:`BACKGROUND`, then of their deadline and then of their submission. A
+    started request is not interrupted by a more urgent one. A request whose
+    deadline passes before it starts fails with `TimeoutError`, one that
+    finishes after its deadline still delivers its result. Both count as a
+    deadline miss. Requests that are submitted after the scheduler stopped
+    fail right away.
+
+    :param PortABC port: the port, it must not be used by anyone else while the scheduler runs.
+    :param float cycle_time: process data cycle time in seconds.
+    :param int buffer_size: size of the input buffers, must fit the devices process data.
+    :param listener: called after every cycle, see :class:`~iolink.cyclic.CyclicPdEngine`.
+    """
+
+    def __init__(self, port, cycle_time, buffer_size=64, listener=None):
+        super().__init__(port, cycle_time, buffer_size, listener)
+        # requests that delivered their result and requests that failed
+        self.completed = 0
+        self.failed = 0
+        self.deadline_misses = 0
+        self.max_queue_depth = 0
+
+        # entries are (priority, expiry, order, index, subindex, data, future)
+        self._queue = []
+        self._queue_lock = threading.Lock()
+        self._order = itertools.count()
+        self._active = None
+        # the error of the requests that are submitted after the scheduler stopped
+        self._stopped = None
+
+    @property
+    def queue_depth(self):
+        """Number of requests that wait to be started."""
+        return len(self._queue)
+
+    def metrics(self) -> SchedulerMetrics:
+        return SchedulerMetrics(len(self._queue), self.max_queue_depth, self.completed, self.failed,
+                                self.deadline_misses, self.overruns)
+
+    def submit_read(self, index: int, subindex: int, priority=BACKGROUND, deadline=None) -> Future:
+        """Queues the read of a parameter.
+
+        :param int priority: :data:`URGENT` or :data:`BACKGROUND`.
+        :param float deadline: seconds from now by which the request should be finished, `None` for no deadline.
+        :return: a :class:`concurrent.futures.Future` of the content of the parameter.
+        """
+        return self._submit(index, subindex, None, priority, deadline)
+
+    def submit_write(self, index: int, subindex: int, data, priority=BACKGROUND, deadline=None) -> Future:
+        """Queues the write of a parameter, see :meth:`submit_read`."""
+        return self._submit(index, subindex, bytes(data), priority, deadline)
+
+    def read_device_isdu(self, index: int, subindex: int, priority=URGENT, timeout=None):
+        """Reads a parameter through the queue and waits for the content."""
+        return self.submit_read(index, subindex, priority).result(timeout)
+
+    def write_device_isdu(self, index: int, subindex: int, data, priority=URGENT, timeout=None):
+        """Writes a parameter through the queue and waits until it is written."""
+        self.submit_write(index, subindex, data, priority).result(timeout)
+
+    def _submit(self, index, subindex, data, priority, deadline):
+        if priority not in (URGENT, BACKGROUND):
+            raise ValueError('unknown priority {}'.format(priority))
+        expiry = math.inf if deadline is None else time.perf_counter() + deadline
+        future = Future()
+        with self._queue_lock:
+            if self._stopped is not None:
+                raise self._stopped
+            heapq.heappush(self._queue, (priority, expiry, next(self._order), index, subindex, data, future))
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        return future
+
+    def start(self):
+        with self._queue_lock:
+            self._stopped = None
+        super().start()
+
+    def _run(self):
+        try:
+            super()._run()
+        finally:
+            # nothing serves the requests anymore
+            error = self.error if self.error is not None else ConnectionError('scheduler stopped')
+            with self._queue_lock:
+                self._stopped = error
+                entries, self._queue = self._queue, []
+            if self._active is not None:
+                entries.append(self._active)
+                self._active = None
+            for entry in entries:
+                if not entry[-1].done():
+                    entry[-1].set_exception(error)
+                    self.failed += 1
+
+    def _between_cycles(self, next_cycle):
+        perf_counter = time.perf_counter
+        while self._step() and perf_counter() < next_cycle:
+            pass
+
+    def _step(self):
+        """Advances the ISDU requests by one step, returns `False` if there is nothing to do until the next cycle."""
+        port = self.port
+        active = self._active
+        if active is None:
+            with self._queue_lock:
+                if not self._queue:
+                    return False
+                entry = heapq.heappop(self._queue)
+            _, expiry, _, index, subindex, data, future = entry
+            if not future.set_running_or_notify_cancel():
+                return True
+            if time.perf_counter() > expiry:
+                self.deadline_misses += 1
+                self.failed += 1
+                future.set_exception(TimeoutError('deadline passed before the request was started'))
+                return True
+            self._active = entry
+            try:
+                port.start_isdu_request(index, subindex, data)
+            except Exception as e:
+                # e.g. an invalid write, it fails the request but not the process data
+                self._active = None
+                self.failed += 1
+                future.set_exception(e)
+            return True
+
+        future = active[-1]
+        try:
+            if not port.poll_isdu_response():
+                return False
+            result = port.get_isdu_response()
+        except Exception as e:
+            self.failed += 1
+            future.set_exception(e)
+        else:
+            self.completed += 1
+            future.set_result(result)
+        self._active = None
+        if time.perf_counter() > active[1]:
+            self.deadline_misses += 1
+        return True
@@ -0,0 +1,293 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .port import IsduError, PortABC, PortWrapper
+
+from typing import NamedTuple, Optional
+import threading
+import time
+
+RUNNING = 'RUNNING'
+RECOVERING = 'RECOVERING'
+FAILED = 'FAILED'
+CLOSED = 'CLOSED'
+
+# system commands must not be repeated after a reconnect
+_SYSTEM_COMMAND_INDEX = 0x02
+
+
+class StateTransition(NamedTuple):
+    """Change of the state of a :class:`SupervisedPort`."""
+    previous: str
+    state: str
+    error: Optional[BaseException]
+    attempts: int
+    timestamp: float
+
+
+class SupervisedPort(PortWrapper):
+    """Port that recovers on its own when the connection to the device is lost.
+
+    A `ConnectionError` of the wrapped port, or a device that doesn't report
+    valid process data for `invalid_status_limit` reads in a row, starts the
+    recovery on a thread of the port: it reconnects, switches the power and
+    the device state back to what was requested, and restores the last
+    output process data and the parameters written through this port. Failed
+    attempts are repeated with an exponentially growing delay.
+
+    While the port recovers, reads and ISDU requests raise `ConnectionError`
+    at once, so a loop that serves several ports isn't held up. Power, device
+    state and output process data are recorded and applied by the recovery.
+
+    :param PortABC port: the wrapped port.
+    :param float initial_delay: delay before the first attempt in seconds.
+    :param float max_delay: longest delay between two attempts.
+    :param float backoff: factor by which the delay grows after each failed attempt.
+    :param int max_attempts: attempts before the port goes to the state 'FAILED', `None` for no limit.
+    :param int invalid_status_limit: reads without `status_mask` set in the state
+        information, while the device should be in Operate, that count as a lost device.
+        `None` disables the watch.
+    :param int status_mask: the bits that signal valid input process data.
+    :param listener: called with a :class:`StateTransition` on every change of the state,
+        on the thread that caused it.
+    """
+
+    def __init__(self, port, initial_delay=0.1, max_delay=10.0, backoff=2.0, max_attempts=None,
+                 invalid_status_limit=None, status_mask=0x01, listener=None):
+        super().__init__(port)
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.max_attempts = max_attempts
+        self.invalid_status_limit = invalid_status_limit
+        self.status_mask = status_mask
+        self.listener_errors = 0
+
+        self._listeners = [listener] if listener is not None else []
+        self._state = RUNNING
+        self._error = None
+        self._condition = threading.Condition()
+        self._closing = threading.Event()
+        self._thread = None
+        self._invalid_reads = 0
+
+        # what the recovery restores
+        self._powered = True
+        self._target_state = None
+        self._pd_output = None
+        self._pd_output_valid = False
+        self._parameters = {}
+
+    @property
+    def state(self):
+        """'RUNNING', 'RECOVERING', 'FAILED' or 'CLOSED'."""
+        return self._state
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def wait_for_state(self, state, timeout=None):
+        """Waits until the port is in the given state.
+
+        :return: `False` if the timeout expired before.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._state == state, timeout)
+
+    def recover(self, error=None):
+        """Starts the recovery, unless it is already running or the port is closed."""
+        with self._condition:
+            if self._state in (RECOVERING, CLOSED):
+                return
+            previous = self._state
+            self._state = RECOVERING
+            self._error = error
+            self._condition.notify_all()
+            self._thread = threading.Thread(target=self._recover, name='SupervisedPort', daemon=True)
+            self._thread.start()
+        self._notify(StateTransition(previous, RECOVERING, error, 0, time.monotonic()))
+
+    def power_on(self):
+        self._powered = True
+        self._apply(self.port.power_on)
+
+    def power_off(self):
+        self._powered = False
+        self._target_state = None
+        self._apply(self.port.power_off)
+
+    def change_device_state_to(self, target_state: str):
+        self._target_state = target_state
+        self._apply(self.port.change_device_state_to, target_state)
+
+    def get_device_pd_input_and_status(self):
+        self._check_running()
+        try:
+            data, status = self.port.get_device_pd_input_and_status()
+        except ConnectionError as e:
+            self.recover(e)
+            raise
+        if self.invalid_status_limit is not None:
+            self._watch_status(status)
+        return data, status
+
+    def get_device_pd_input_into(self, buf):
+        self._check_running()
+        try:
+            n, status = self.port.get_device_pd_input_into(buf)
+        except ConnectionError as e:
+            self.recover(e)
+            raise
+        if self.invalid_status_limit is not None:
+            self._watch_status(status)
+        return n, status
+
+    def set_device_pd_output(self, data: bytes):
+        self._pd_output = data
+        self._pd_output_valid = True
+        self._apply(self.port.set_device_pd_output, data)
+
+    # patches the output recorded by this port, so that it is restored as a whole
+    set_device_pd_output_fields = PortABC.set_device_pd_output_fields
+
+    def invalidate_pd_output(self):
+        self._pd_output_valid = False
+        self._apply(self.port.invalidate_pd_output)
+
+    def read_device_isdu(self, index: int, subindex: int):
+        return self._call(self.port.read_device_isdu, index, subindex)
+
+    def read_device_isdu_into(self, index: int, subindex: int, buf) -> int:
+        return self._call(self.port.read_device_isdu_into, index, subindex, buf)
+
+    def write_device_isdu(self, index: int, subindex: int, data):
+        self._call(self.port.write_device_isdu, index, subindex, data)
+        self._record_parameter(index, subindex, data)
+
+    def read_device_isdu_many(self, items):
+        return self._call(self.port.read_device_isdu_many, items)
+
+    def write_device_isdu_many(self, items):
+        items = list(items)
+        results = self._call(self.port.write_device_isdu_many, items)
+        for (index, subindex, data), result in zip(items, results):
+            if result is None:
+                self._record_parameter(index, subindex, data)
+        return results
+
+    def start_isdu_request(self, index: int, subindex: int, data=None):
+        self._call(self.port.start_isdu_request, index, subindex, data)
+        self._isdu_request = (index, subindex, data)
+
+    def poll_isdu_response(self) -> bool:
+        return self._call(self.port.poll_isdu_response)
+
+    def get_isdu_response(self):
+        request, self._isdu_request = self._isdu_request, None
+        result = self._call(self.port.get_isdu_response)
+        if request is not None and request[2] is not None:
+            self._record_parameter(*request)
+        return result
+
+    def get_device_identity(self):
+        return self._call(self.port.get_device_identity)
+
+    def shut_down(self):
+        self._closing.set()
+        with self._condition:
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self._set_state(CLOSED)
+        self.port.shut_down()
+
+    def _check_running(self):
+        if self._state != RUNNING:
+            raise ConnectionError('port is {}: {}'.format(self._state.lower(), self._error))
+
+    def _call(self, func, *args):
+        self._check_running()
+        try:
+            return func(*args)
+        except ConnectionError as e:
+            self.recover(e)
+            raise
+
+    def _apply(self, func, *args):
+        # requests that the recovery repeats are only recorded while it runs
+        if self._state != RUNNING:
+            return
+        self._call(func, *args)
+
+    def _record_parameter(self, index, subindex, data):
+        if index != _SYSTEM_COMMAND_INDEX:
+            self._parameters[(index, subindex)] = bytes(data)
+
+    def _watch_status(self, status):
+        if status & self.status_mask or self._target_state != 'Operate':
+            self._invalid_reads = 0
+            return
+        self._invalid_reads += 1
+        if self._invalid_reads >= self.invalid_status_limit:
+            self._invalid_reads = 0
+            self.recover(ConnectionError('no valid process data for {} reads'.format(self.invalid_status_limit)))
+
+    def _recover(self):
+        delay = self.initial_delay
+        attempts = 0
+        while not self._closing.wait(delay):
+            attempts += 1
+            try:
+                self._restore()
+            except Exception as e:
+                self._error = e
+                if self.max_attempts is not None and attempts >= self.max_attempts:
+                    self._set_state(FAILED, e, attempts)
+                    return
+                delay = min(delay * self.backoff, self.max_delay)
+                continue
+            self._invalid_reads = 0
+            self._set_state(RUNNING, None, attempts)
+            return
+
+    def _restore(self):
+        port = self.port
+        port.reconnect()
+        if not self._powered:
+            port.power_off()
+            return
+        port.power_on()
+        if self._target_state is not None:
+            port.change_device_state_to(self._target_state)
+        if self._pd_output is not None and self._pd_output_valid:
+            port.set_device_pd_output(self._pd_output)
+        if self._parameters:
+            items = [(index, subindex, data) for (index, subindex), data in self._parameters.items()]
+            for result in port.write_device_isdu_many(items):
+                if isinstance(result, IsduError):
+                    raise result
+
+    def _set_state(self, state, error=None, attempts=0):
+        with self._condition:
+            previous = self._state
+            if previous == state:
+                return
+            self._state = state
+            self._error = error
+            self._condition.notify_all()
+        self._notify(StateTransition(previous, state, error, attempts, time.monotonic()))
+
+    def _notify(self, transition):
+        for listener in list(self._listeners):
+            try:
+                listener(transition)
+            except Exception:
+                self.listener_errors += 1
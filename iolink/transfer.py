@@ -0,0 +1,131 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Transfer of objects that are larger than one ISDU.
+
+An ISDU carries at most 232 bytes, so devices store larger objects, e.g.
+firmware images or data logs, across the consecutive subindices of one
+index. The functions here read and write such objects segment by segment
+into and out of preallocated buffers or files, without joining the
+segments in memory.
+"""
+
+from .port import IsduError, ISDU_MAX_LENGTH, ISDU_ERR_SUBINDEX_NOT_AVAILABLE
+
+# subindices are 8 bit, 0 addresses the whole record
+_MAX_SUBINDEX = 255
+
+
+def read_isdu_segments(port, index: int, sink, length=None, first_subindex=1, progress=None) -> int:
+    """Reads an object from consecutive subindices.
+
+    With a known `length`, the transfer ends after that many bytes, the rest of
+    a last segment that is longer is dropped. Otherwise it ends with the first segment that is shorter than an ISDU, the first subindex
+    that doesn't exist or the last subindex.
+
+    :param PortABC port: the port of the device.
+    :param int index: index of the object.
+    :param sink: writable buffer with room for the object, or a file-like object with a
+        ``write`` method. Without a `length`, a ``bytearray`` is extended as needed.
+    :param int length: size of the object in bytes, if known.
+    :param int first_subindex: subindex of the first segment.
+    :param progress: called with the number of bytes read so far and `length` after each segment.
+    :return: number of bytes read.
+    """
+    write = getattr(sink, 'write', None)
+    growable = write is None and length is None and isinstance(sink, bytearray)
+    # segments that don't go straight into the sink are read into the chunk
+    chunk = memoryview(bytearray(ISDU_MAX_LENGTH))
+    target = None if write is not None or growable else memoryview(sink).cast('B')
+
+    done = 0
+    for subindex in range(first_subindex, _MAX_SUBINDEX + 1):
+        if length is not None and done >= length:
+            break
+        direct = target is not None and (length is None or length - done >= ISDU_MAX_LENGTH)
+        try:
+            if direct:
+                n = port.read_device_isdu_into(index, subindex, target[done:done + ISDU_MAX_LENGTH])
+            else:
+                n = port.read_device_isdu_into(index, subindex, chunk)
+        except IsduError as e:
+            # an object that fills its last segment completely
+            if length is None and done and e.error_code == ISDU_ERR_SUBINDEX_NOT_AVAILABLE:
+                break
+            raise
+        if length is not None:
+            n = min(n, length - done)
+        if write is not None:
+            write(chunk[:n])
+        elif growable:
+            sink[done:done + n] = chunk[:n]
+        elif not direct:
+            target[done:done + n] = chunk[:n]
+        done += n
+        if progress is not None:
+            progress(done, length)
+        if n < ISDU_MAX_LENGTH and length is None:
+            break
+    if length is not None and done < length:
+        raise ValueError('object ended after {} of {} bytes'.format(done, length))
+    return done
+
+
+def read_isdu_object(port, index: int, length=None, first_subindex=1, progress=None) -> bytearray:
+    """Reads an object from consecutive subindices into a new ``bytearray``.
+
+    See :func:`read_isdu_segments` for the parameters.
+    """
+    data = bytearray() if length is None else bytearray(length)
+    read_isdu_segments(port, index, data, length, first_subindex, progress)
+    return data
+
+
+def write_isdu_segments(port, index: int, source, first_subindex=1, segment_size=ISDU_MAX_LENGTH,
+                        progress=None) -> int:
+    """Writes an object to consecutive subindices.
+
+    :param PortABC port: the port of the device.
+    :param int index: index of the object.
+    :param source: bytes-like object, or a binary file-like object with a ``readinto`` method.
+    :param int first_subindex: subindex of the first segment.
+    :param int segment_size: bytes per subindex, at most 232.
+    :param progress: called with the number of bytes written so far and the size of the
+        object after each segment, the size is `None` for files.
+    :return: number of bytes written.
+    """
+    if not 0 < segment_size <= ISDU_MAX_LENGTH:
+        raise ValueError('segment size must be between 1 and {}'.format(ISDU_MAX_LENGTH))
+    readinto = getattr(source, 'readinto', None)
+    if readinto is not None:
+        chunk = bytearray(segment_size)
+        view = memoryview(chunk)
+        total = None
+    else:
+        data = memoryview(source).cast('B')
+        total = len(data)
+
+    done = 0
+    subindex = first_subindex
+    while True:
+        if readinto is not None:
+            n = readinto(view)
+            segment = view[:n]
+        else:
+            segment = data[done:done + segment_size]
+            n = len(segment)
+        if not n:
+            break
+        if subindex > _MAX_SUBINDEX:
+            raise ValueError('object does not fit index 0x{:X} from subindex {}'.format(index, first_subindex))
+        port.write_device_isdu(index, subindex, segment)
+        done += n
+        subindex += 1
+        if progress is not None:
+            progress(done, total)
+    return done
@@ -0,0 +1,388 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+from .cyclic import PdSnapshot
+from .port import PortABC
+
+from multiprocessing import shared_memory
+import multiprocessing
+import struct
+import threading
+import time
+
+# Layout of the slot of one port in the shared memory:
+#   input:  sequence, length, status, error flags, timestamp, cycle, data
+#   output: sequence, length, data
+# A sequence number is odd while its side of the slot is being written.
+_SEQ = struct.Struct('<Q')
+_INPUT_HEADER = struct.Struct('<QHBB4xdQ')
+_OUTPUT_HEADER = struct.Struct('<QH6x')
+# the headers after the sequence, writers store them while the sequence is odd
+_INPUT_FIELDS = struct.Struct('<HBB4xdQ')
+_OUTPUT_FIELDS = struct.Struct('<H6x')
+
+# error flags of the input
+_INPUT_ERROR = 0x01
+_OUTPUT_ERROR = 0x02
+
+# commands that are not methods of the port
+_LAST_ERROR = 'last_error'
+_LAST_OUTPUT_ERROR = 'last_output_error'
+_STOP = None
+
+# how long a reader waits for a write of the input to finish, before it gives up on the worker
+_READ_TIMEOUT = 1.0
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+class _Slot:
+    """Offsets of the slot of one port in the shared memory."""
+
+    def __init__(self, buf, number, pd_size):
+        self.buf = buf
+        self.pd_size = pd_size
+        size = _INPUT_HEADER.size + _OUTPUT_HEADER.size + 2 * _align(pd_size)
+        self.input = number * size
+        self.input_data = self.input + _INPUT_HEADER.size
+        self.output = self.input_data + _align(pd_size)
+        self.output_data = self.output + _OUTPUT_HEADER.size
+
+    @staticmethod
+    def size(pd_size):
+        return _INPUT_HEADER.size + _OUTPUT_HEADER.size + 2 * _align(pd_size)
+
+    def read_input(self):
+        buf = self.buf
+        deadline = None
+        while True:
+            seq = _SEQ.unpack_from(buf, self.input)[0]
+            if not seq & 1:
+                _, n, status, error, timestamp, cycle = _INPUT_HEADER.unpack_from(buf, self.input)
+                data = bytes(buf[self.input_data:self.input_data + n])
+                if _SEQ.unpack_from(buf, self.input)[0] == seq:
+                    return data, status, error, timestamp, cycle
+            # the worker might have died in the middle of a write
+            if deadline is None:
+                deadline = time.perf_counter() + _READ_TIMEOUT
+            elif time.perf_counter() > deadline:
+                raise ConnectionError('the worker stopped in the middle of publishing the process data')
+
+    def write_output(self, data):
+        if len(data) > self.pd_size:
+            raise ValueError('the process data exceeds the slot size of {} bytes'.format(self.pd_size))
+        buf = self.buf
+        seq = _SEQ.unpack_from(buf, self.output)[0]
+        _SEQ.pack_into(buf, self.output, seq + 1)
+        _OUTPUT_FIELDS.pack_into(buf, self.output + _SEQ.size, len(data))
+        buf[self.output_data:self.output_data + len(data)] = data
+        _SEQ.pack_into(buf, self.output, seq + 2)
+
+
+class _WorkerSlot(_Slot):
+    """The worker's side of a slot, it exchanges the process data with the port."""
+
+    def __init__(self, buf, number, pd_size):
+        super().__init__(buf, number, pd_size)
+        # ports may keep a reference to the buffer, so they don't get the shared memory itself
+        self.input_buffer = bytearray(pd_size)
+        self.seq = 0
+        self.cycle = 0
+        self.output_seq = 0
+        self.error = None
+        self.output_error = None
+
+    def exchange(self, port):
+        buf = self.buf
+        seq = _SEQ.unpack_from(buf, self.output)[0]
+        if seq != self.output_seq and not seq & 1:
+            _, n = _OUTPUT_HEADER.unpack_from(buf, self.output)
+            data = bytes(buf[self.output_data:self.output_data + n])
+            if _SEQ.unpack_from(buf, self.output)[0] == seq:
+                # an output is set once, one that is rejected isn't tried again on every cycle
+                self.output_seq = seq
+                try:
+                    port.set_device_pd_output(data)
+                    self.output_error = None
+                except Exception as e:
+                    self.output_error = e
+        output_error = _OUTPUT_ERROR if self.output_error is not None else 0
+        try:
+            n, status = port.get_device_pd_input_into(self.input_buffer)
+        except Exception as e:
+            self.error = e
+            self._publish(0, 0, _INPUT_ERROR | output_error)
+            return
+        self.error = None
+        self.cycle += 1
+        self._publish(n, status, output_error)
+
+    def _publish(self, n, status, error):
+        buf = self.buf
+        _SEQ.pack_into(buf, self.input, self.seq + 1)
+        _INPUT_FIELDS.pack_into(buf, self.input + _SEQ.size, n, status, error, time.perf_counter(), self.cycle)
+        buf[self.input_data:self.input_data + n] = self.input_buffer[:n]
+        self.seq += 2
+        _SEQ.pack_into(buf, self.input, self.seq)
+
+
+def _serve(port_class, port_kwargs, shm_name, pd_size, cycle_time, conn):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ports = []
+    try:
+        for kwargs in port_kwargs:
+            ports.append(port_class(**kwargs))
+    except Exception as e:
+        for port in ports:
+            port.shut_down()
+        conn.send((False, e))
+        shm.close()
+        return
+    conn.send((True, None))
+
+    slots = [_WorkerSlot(shm.buf, number, pd_size) for number in range(len(ports))]
+    next_cycle = time.perf_counter()
+    try:
+        while True:
+            for port, slot in zip(ports, slots):
+                if port is not None:
+                    slot.exchange(port)
+
+            next_cycle += cycle_time
+            timeout = next_cycle - time.perf_counter()
+            if timeout < 0:
+                next_cycle = time.perf_counter()
+                timeout = 0
+            # serve commands until the next cycle is due
+            while conn.poll(timeout):
+                command = conn.recv()
+                if command is _STOP:
+                    return
+                number, method, args = command
+                try:
+                    if method == _LAST_ERROR:
+                        result = slots[number].error
+                    elif method == _LAST_OUTPUT_ERROR:
+                        result = slots[number].output_error
+                    else:
+                        result = getattr(ports[number], method)(*args)
+                    conn.send((True, result))
+                except Exception as e:
+                    conn.send((False, e))
+                if method == 'shut_down':
+                    ports[number] = None
+                timeout = max(0, next_cycle - time.perf_counter())
+                if not timeout:
+                    break
+    finally:
+        for port in ports:
+            if port is not None:
+                port.shut_down()
+        shm.close()
+
+
+class PortWorker:
+    """Process that owns one or more ports and exchanges their process data on its own.
+
+    The worker runs a process data cycle for each of its ports and publishes
+    the input in shared memory, where :class:`WorkerPort` reads it without
+    any call into the worker. Outputs take the same way back. Everything
+    else, e.g. ISDU requests, is sent to the worker through a pipe. As each
+    worker has its own interpreter, workers don't compete for the GIL.
+
+    :param str interface: ID of the IO-Link master device, see :func:`iolink.get_port`.
+    :param port_kwargs: list with the keyword arguments for each port of the worker.
+    :param float cycle_time: process data cycle time in seconds, 0 to cycle as fast as possible.
+    :param int pd_size: size of the process data slots, must fit the devices process data.
+    :param mp_context: the :mod:`multiprocessing` context, 'spawn' by default.
+    """
+
+    def __init__(self, interface, port_kwargs, cycle_time=0.001, pd_size=64, mp_context=None):
+        if isinstance(port_kwargs, int):
+            port_kwargs = [{} for _ in range(port_kwargs)]
+        self.interface = interface
+        self.port_kwargs = list(port_kwargs)
+        self.cycle_time = cycle_time
+        self.pd_size = pd_size
+        self.ports = []
+        self._context = mp_context if mp_context is not None else multiprocessing.get_context('spawn')
+        self._process = None
+        self._conn = None
+        self._shm = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Starts the worker process and opens its ports."""
+        from .misc import available_interfaces
+
+        if self._process is not None:
+            raise RuntimeError('worker is already running')
+        port_class = available_interfaces[self.interface]
+        self._shm = shared_memory.SharedMemory(create=True, size=_Slot.size(self.pd_size) * len(self.port_kwargs))
+        self._conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_serve,
+            args=(port_class, self.port_kwargs, self._shm.name, self.pd_size, self.cycle_time, child_conn),
+            name='iolink-worker',
+            daemon=True)
+        self._process.start()
+        child_conn.close()
+        try:
+            ok, error = self._conn.recv()
+        except EOFError:
+            ok, error = False, ConnectionError('worker process ended')
+        if not ok:
+            self._cleanup()
+            raise error
+        self.ports = [WorkerPort(self, number) for number in range(len(self.port_kwargs))]
+
+    def stop(self):
+        """Shuts down the ports and ends the worker process."""
+        if self._process is None:
+            return
+        try:
+            with self._lock:
+                self._conn.send(_STOP)
+        except OSError:
+            pass
+        self._process.join()
+        self._cleanup()
+
+    def _cleanup(self):
+        if self._process is not None and self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._process = None
+        self._conn.close()
+        self._conn = None
+        for port in self.ports:
+            port._slot.buf = None
+        self.ports = []
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def _command(self, number, method, *args):
+        with self._lock:
+            if self._conn is None:
+                raise UnboundLocalError
+            try:
+                self._conn.send((number, method, args))
+                ok, result = self._conn.recv()
+            except (EOFError, OSError):
+                raise ConnectionError('worker process ended')
+        if not ok:
+            raise result
+        return result
+
+
+class WorkerPort(PortABC):
+    """A port of a :class:`PortWorker`, as seen from the parent process.
+
+    Reads of the input process data return the latest frame of the worker's
+    cycle and never wait for the bus, outputs are written in the next cycle.
+    An output that the port rejects is reported by :attr:`output_error`.
+    """
+
+    def __init__(self, worker, number):
+        self.worker = worker
+        self.number = number
+        self._slot = _Slot(worker._shm.buf, number, worker.pd_size)
+        self._output_lock = threading.Lock()
+
+    def snapshot(self) -> PdSnapshot:
+        """Returns the input process data of the latest cycle with its timestamp and cycle number."""
+        data, status, error, timestamp, cycle = self._slot.read_input()
+        if error & _INPUT_ERROR:
+            self._raise_last_error()
+        return PdSnapshot(data, status, timestamp, cycle)
+
+    @property
+    def output_error(self):
+        """The exception of the last output that the worker couldn't set, `None` if it was set."""
+        if not self._slot.read_input()[2] & _OUTPUT_ERROR:
+            return None
+        return self.worker._command(self.number, _LAST_OUTPUT_ERROR)
+
+    def power_on(self):
+        self.worker._command(self.number, 'power_on')
+
+    def power_off(self):
+        self.worker._command(self.number, 'power_off')
+
+    def change_device_state_to(self, target_state: str):
+        self.worker._command(self.number, 'change_device_state_to', target_state)
+
+    def get_device_pd_input_and_status(self):
+        data, status, error, _, _ = self._slot.read_input()
+        if error & _INPUT_ERROR:
+            self._raise_last_error()
+        return data, status
+
+    def set_device_pd_output(self, data: bytes):
+        with self._output_lock:
+            self._slot.write_output(data)
+        self._pd_output = bytes(data)
+
+    def invalidate_pd_output(self):
+        self.worker._command(self.number, 'invalidate_pd_output')
+
+    def read_device_isdu(self, index: int, subindex: int):
+        return self.worker._command(self.number, 'read_device_isdu', index, subindex)
+
+    def write_device_isdu(self, index: int, subindex: int, data):
+        self.worker._command(self.number, 'write_device_isdu', index, subindex, bytes(data))
+
+    def read_device_isdu_many(self, items):
+        return self.worker._command(self.number, 'read_device_isdu_many', list(items))
+
+    def write_device_isdu_many(self, items):
+        return self.worker._command(self.number, 'write_device_isdu_many', list(items))
+
+    def get_device_identity(self):
+        return self.worker._command(self.number, 'get_device_identity')
+
+    def reconnect(self):
+        self.worker._command(self.number, 'reconnect')
+
+    def shut_down(self):
+        self.worker._command(self.number, 'shut_down')
+
+    def _raise_last_error(self):
+        error = self.worker._command(self.number, _LAST_ERROR)
+        raise error if error is not None else ConnectionError('process data exchange failed')
+
+
+class ProcessPort(WorkerPort):
+    """Port that runs in a worker process of its own, see :class:`PortWorker`.
+
+    It is registered as the interface 'process', e.g.
+    ``iolink.get_port('process', port_interface='iqLink', com_port='COM3')``.
+
+    :param str port_interface: ID of the IO-Link master device of the port.
+    :param float cycle_time: process data cycle time of the worker in seconds.
+    :param int pd_size: size of the process data slot.
+    :param port_kwargs: keyword arguments of the port.
+    """
+
+    def __init__(self, port_interface, cycle_time=0.001, pd_size=64, **port_kwargs):
+        worker = PortWorker(port_interface, [port_kwargs], cycle_time=cycle_time, pd_size=pd_size)
+        worker.start()
+        super().__init__(worker, 0)
+
+    def shut_down(self):
+        self.worker.stop()
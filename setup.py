@@ -14,6 +14,17 @@ setuptools.setup(
     url='https://github.com/trinamic/iolink',
     packages=setuptools.find_packages(),
     include_package_data=True,
+    entry_points={
+        'iolink.interfaces': [
+            'iqLink = iolink.interfaces.iqlink.iqlink:IqLinkPort',
+            'sim = iolink.interfaces.sim.sim:SimPort',
+            'replay = iolink.record:ReplayPort',
+            'process = iolink.worker:ProcessPort',
+        ],
+    },
+    extras_require={
+        'numpy': ['numpy'],
+    },
     project_urls={
         'Documentation': 'https://iolink.readthedocs.io',
     },
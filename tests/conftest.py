@@ -17,3 +17,4 @@ def pytest_addoption(parser):
 def opt(request):
     opt = {'interface': request.config.getoption("--interface")}
     return opt
+
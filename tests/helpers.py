@@ -0,0 +1,27 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Helpers that are shared by the tests."""
+
+from iolink.interfaces.sim.sim import SimDevice
+
+import time
+
+
+class LoopbackDevice(SimDevice):
+    """Simulated device that returns its process data output as input."""
+
+    def on_cycle(self):
+        self.pd_in[:] = self.pd_out
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
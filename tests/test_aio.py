@@ -0,0 +1,42 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the asyncio wrapper against the simulated port."""
+
+from iolink import aio
+from iolink.interfaces.sim.sim import SimDevice
+import asyncio
+
+
+def test_isdu_on_many_ports():
+    async def read_product_name(n):
+        device = SimDevice(product_name='Device {}'.format(n).encode())
+        async with aio.get_port('sim', device=device) as port:
+            await port.change_device_state_to('Operate')
+            return await port.read_device_isdu(0x12, 0)
+
+    async def main():
+        return await asyncio.gather(*(read_product_name(n) for n in range(24)))
+
+    names = asyncio.run(main())
+    assert names == ['Device {}'.format(n).encode() for n in range(24)]
+
+
+def test_pd_frames():
+    async def main():
+        async with aio.get_port('sim', device=SimDevice(pd_in_length=3)) as port:
+            await port.change_device_state_to('Operate')
+            frames = []
+            async for frame in port.pd_frames(interval=0.001):
+                frames.append(frame)
+                if len(frames) == 5:
+                    break
+            return frames
+
+    frames = asyncio.run(main())
+    assert frames == [(bytes(3), 1)] * 5
@@ -0,0 +1,89 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the backup and restore of device parameters against simulated ports."""
+
+from iolink.backup import ParameterSnapshot, backup_parameters, restore_parameters
+from iolink.instrument import InstrumentedPort
+from iolink.interfaces.sim.sim import SimDevice
+from iolink.port import ISDU_ERR_INDEX_NOT_AVAILABLE
+from iolink.manager import PortManager
+import iolink
+import pytest
+
+PARAMETERS = {0x40 + n: bytes([n, 0, 0, n]) for n in range(40)}
+
+
+def device():
+    return SimDevice(parameters=PARAMETERS)
+
+
+def test_backup_and_restore():
+    source = device()
+    for n in (1, 2, 3):
+        source.parameters[(0x40 + n, 0)] = b'\xff\xff\xff\xff'
+    with iolink.get_port('sim', device=source) as port:
+        port.change_device_state_to('PreOperate')
+        snapshot = backup_parameters(port, list(PARAMETERS) + [(0x99, 0)], batch_size=16)
+    assert len(snapshot.parameters) == 40
+    assert snapshot.errors == {(0x99, 0): ISDU_ERR_INDEX_NOT_AVAILABLE}
+
+    target = device()
+    with iolink.get_port('sim', device=target) as port:
+        port.change_device_state_to('PreOperate')
+        instrumented = InstrumentedPort(port)
+        result = restore_parameters(instrumented, snapshot, batch_size=16)
+        assert instrumented.stats['write_device_isdu_many'].histogram.count == 1
+    assert result.written == [(0x41, 0), (0x42, 0), (0x43, 0)]
+    assert len(result.unchanged) == 37
+    assert not result.errors
+    assert target.parameters == source.parameters
+
+
+def test_binary_format(tmp_path):
+    snapshot = ParameterSnapshot({(0x40, 0): b'\x01\x02', (0x41, 3): b''})
+    path = tmp_path / 'device.bak'
+    snapshot.save(path)
+    assert ParameterSnapshot.load(path) == snapshot
+
+    data = bytearray(snapshot.to_bytes())
+    with pytest.raises(ValueError):
+        ParameterSnapshot.from_bytes(bytes(data[:-1]))
+    data[-5] ^= 0xFF
+    with pytest.raises(ValueError):
+        ParameterSnapshot.from_bytes(bytes(data))
+
+    # the count is part of the header, which the checksum doesn't cover
+    data = bytearray(snapshot.to_bytes())
+    data[10] = 3
+    with pytest.raises(ValueError):
+        ParameterSnapshot.from_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        ParameterSnapshot({(0x40, 0): bytes(256)}).to_bytes()
+
+
+def test_many_ports():
+    devices = [device() for _ in range(4)]
+    devices[2].access[0x45] = 'ro'
+    with PortManager('sim', [{'device': d} for d in devices]) as manager:
+        manager.change_device_state_to('PreOperate')
+        snapshot = ParameterSnapshot({(0x45, 0): b'\x00\x00\x00\x01'})
+        results = manager.restore_parameters_all(snapshot)
+        assert [r.value.written for r in results] == [[(0x45, 0)], [(0x45, 0)], [], [(0x45, 0)]]
+        assert list(results[2].value.errors) == [(0x45, 0)]
+
+        backups = manager.backup_parameters_all([0x45])
+        assert [r.value.parameters[(0x45, 0)] for r in backups] == [b'\x00\x00\x00\x01'] * 2 + [
+            PARAMETERS[0x45]] + [b'\x00\x00\x00\x01']
+
+        # a snapshot for each port, in the order of the ports
+        snapshots = [ParameterSnapshot({(0x45, 0): bytes([0, 0, 0, n])}) for n in range(4)]
+        manager.restore_parameters_all(snapshots)
+        backups = manager.backup_parameters_all([0x45])
+        assert [r.value.parameters[(0x45, 0)][3] for r in backups] == [0, 1, PARAMETERS[0x45][3], 3]
@@ -0,0 +1,101 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the ISDU parameter cache against the simulated port."""
+
+import iolink
+from iolink.cache import CachedPort, PERMANENT, NEVER
+from iolink.interfaces.sim.sim import SimDevice, SimPort
+import pytest
+import time
+
+
+@pytest.fixture
+def port():
+    device = SimDevice(parameters={0x40: bytes([1]), 0x51: bytes([0, 32]), 0xC3: bytes([0, 0])})
+    port = CachedPort(SimPort(device=device), policies={0x12: PERMANENT, 0x40: PERMANENT, 0x51: 0.05, 0xC3: NEVER})
+    port.change_device_state_to('Operate')
+    yield port
+    port.shut_down()
+
+
+def test_permanent_entries(port):
+    assert port.read_device_isdu(0x12, 0) == b'Simulated Device'
+    assert port.read_device_isdu(0x12, 0) == b'Simulated Device'
+    assert port.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+
+
+def test_ttl_entries(port):
+    port.read_device_isdu(0x51, 0)
+    port.port.device.parameters[(0x51, 0)] = bytes([0, 16])
+    assert port.read_device_isdu(0x51, 0) == bytes([0, 32])
+    time.sleep(0.06)
+    assert port.read_device_isdu(0x51, 0) == bytes([0, 16])
+
+
+def test_uncached_entries(port):
+    port.read_device_isdu(0xC3, 0)
+    port.read_device_isdu(0xC3, 0)
+    assert port.hits == 0
+
+
+def test_write_through(port):
+    port.read_device_isdu(0x40, 0)
+    port.write_device_isdu(0x40, 0, bytes([8]))
+    assert port.read_device_isdu(0x40, 0) == bytes([8])
+    assert port.misses == 1
+    port.write_device_isdu(0x02, 0, bytes([0x82]))
+    assert port.read_device_isdu(0x40, 0) == bytes([1])
+
+
+@pytest.mark.parametrize('invalidate', [
+    lambda port: port.power_off(),
+    lambda port: port.power_on(),
+    lambda port: port.reconnect(),
+    lambda port: port.change_device_state_to('Inactive'),
+])
+def test_invalidation(port, invalidate):
+    port.read_device_isdu(0x12, 0)
+    invalidate(port)
+    assert port.stats()['entries'] == 0
+
+
+def test_invalidation_on_device_swap(port):
+    assert port.read_device_isdu(0x12, 0) == b'Simulated Device'
+    port.port.device = SimDevice(serial_number=b'BBBB', product_name=b'Other Device')
+    port.change_device_state_to('Operate')
+    assert port.stats()['entries'] == 0
+    assert port.read_device_isdu(0x12, 0) == b'Other Device'
+
+    # without a change of the state, the check is left to the caller
+    port.port.device = SimDevice(serial_number=b'CCCC', product_name=b'Third Device')
+    port.port.change_device_state_to('Operate')
+    assert port.read_device_isdu(0x12, 0) == b'Other Device'
+    assert not port.check_device()
+    assert port.read_device_isdu(0x12, 0) == b'Third Device'
+    assert port.check_device()
+
+
+def test_invalidation_on_lost_connection(port):
+    port.read_device_isdu(0x12, 0)
+    port.port.device.unplug()
+    with pytest.raises(ConnectionError):
+        port.get_device_pd_input_and_status()
+    assert port.stats()['entries'] == 0
+
+
+def test_batches(port):
+    port.read_device_isdu(0x12, 0)
+    names, levels, missing = port.read_device_isdu_many([(0x12, 0), (0x40, 0), (0x99, 0)])
+    assert names == b'Simulated Device'
+    assert levels == bytes([1])
+    assert isinstance(missing, iolink.IsduError)
+    assert port.hits == 1
+    assert port.write_device_isdu_many([(0x40, 0, bytes([4])), (0x12, 0, b'Other')])[0] is None
+    assert port.read_device_isdu(0x40, 0) == bytes([4])
+    assert port.hits == 2
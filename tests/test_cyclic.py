@@ -0,0 +1,37 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the cyclic process data engine against the simulated port."""
+
+import iolink
+from iolink.cyclic import CyclicPdEngine
+from tests.helpers import LoopbackDevice, wait_for
+
+
+def test_cyclic_exchange():
+    device = LoopbackDevice(pd_in_length=4, pd_out_length=4)
+    with iolink.get_port(interface='sim', device=device) as port:
+        port.change_device_state_to('Operate')
+        with CyclicPdEngine(port, cycle_time=0.001) as engine:
+            engine.set_device_pd_output(bytes([1, 2, 3, 4]))
+            wait_for(lambda: engine.snapshot().data == bytes([1, 2, 3, 4]))
+            first = engine.snapshot()
+            wait_for(lambda: engine.cycles > first.cycle + 10)
+            last = engine.snapshot()
+        assert last.cycle > first.cycle
+        assert last.timestamp > first.timestamp
+        assert engine.error is None
+
+
+def test_engine_reports_errors():
+    with iolink.get_port(interface='sim') as port:
+        port.change_device_state_to('Operate')
+        with CyclicPdEngine(port, cycle_time=0.001) as engine:
+            port.device.unplug()
+            wait_for(lambda: engine.error is not None)
+        assert isinstance(engine.error, ConnectionError)
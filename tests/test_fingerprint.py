@@ -0,0 +1,117 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the device identification and the fingerprint cache against the simulated port."""
+
+import iolink
+from iolink.cache import CachedPort
+from iolink.fingerprint import FingerprintCache
+from iolink.instrument import InstrumentedPort
+from iolink.interfaces.sim.sim import SimDevice
+from iolink.iodd import DeviceDescriptor, Variable
+from iolink.manager import PortManager
+from iolink.port import PortABC
+import pytest
+
+
+def device(serial_number=b'SN0001'):
+    return SimDevice(vendor_id=0x03FA, device_id=0x0004DB, serial_number=serial_number)
+
+
+def resolve_descriptor(fingerprint, parameters):
+    return DeviceDescriptor(fingerprint.vendor_id, fingerprint.device_id, 'Analog Devices',
+                            parameters[(0x12, 0)].decode(),
+                            None, None, [Variable('Standby Current', 'V_StandbyCurrent', 81, 'rw', 'IntegerT', 16)])
+
+
+def test_device_identity():
+    with iolink.get_port('sim', device=device()) as port:
+        port.change_device_state_to('PreOperate')
+        assert port.get_device_identity() == (0x03FA, 0x0004DB, b'SN0001', 0x11, 0)
+
+        # without help from the master, the Direct Parameter Page 1 is read
+        port.device.parameters[(0x00, 0)] = (bytes([0, 0, 0, 0, 0x11, 0, 0]) + bytes([0x03, 0xFA, 0x00, 0x04, 0xDB])
+                                             + bytes([0x00, 0x02]) + bytes(2))
+        assert PortABC.get_device_identity(port) == (0x03FA, 0x0004DB, b'SN0001', 0x11, 0x0002)
+
+        port.device.parameters[(0x00, 0)] = port.device.parameters[(0x00, 0)][:13]
+        with pytest.raises(ValueError):
+            PortABC.get_device_identity(port)
+
+
+def test_warm_restart_skips_the_identification(tmp_path):
+    with iolink.get_port('sim', device=device()) as port:
+        port.change_device_state_to('PreOperate')
+        cache = FingerprintCache(tmp_path)
+        fingerprint, entry = cache.identify(port, 'COM3', resolve_descriptor=resolve_descriptor)
+    assert fingerprint == ('COM3', 0x03FA, 0x0004DB, b'SN0001', 0x11, 0)
+    assert entry.parameters[(0x12, 0)] == b'Simulated Device'
+    assert (0x11, 0) in entry.errors
+    assert cache.misses == 1
+
+    with iolink.get_port('sim', device=device()) as port:
+        port.change_device_state_to('PreOperate')
+        instrumented = InstrumentedPort(port)
+        cache = FingerprintCache(tmp_path)
+        _, entry = cache.identify(instrumented, 'COM3', resolve_descriptor=resolve_descriptor)
+        assert cache.hits == 1
+        assert 'read_device_isdu_many' not in instrumented.stats
+        assert entry.descriptor.device_name == 'Simulated Device'
+        assert entry.descriptor.variables['V_StandbyCurrent'].decode(b'\xff\xfe') == -2
+
+        cached = CachedPort(instrumented)
+        cached.preload(entry.parameters)
+        assert cached.read_device_isdu(0x10, 0) == b'Analog Devices'
+        assert 'read_device_isdu' not in instrumented.stats
+
+    # another device on the same port is identified again
+    with iolink.get_port('sim', device=device(b'SN0002')) as port:
+        port.change_device_state_to('PreOperate')
+        cache.identify(port, 'COM3')
+    assert cache.misses == 1
+
+    # so is the same device with another function
+    updated = device()
+    updated.function_id = 0x0001
+    with iolink.get_port('sim', device=updated) as port:
+        port.change_device_state_to('PreOperate')
+        cache.identify(port, 'COM3')
+    assert cache.misses == 2
+
+
+def test_damaged_entries_are_ignored(tmp_path):
+    with iolink.get_port('sim', device=device()) as port:
+        port.change_device_state_to('PreOperate')
+        fingerprint, entry = FingerprintCache(tmp_path).identify(port, 'COM3')
+    for path in tmp_path.iterdir():
+        path.write_bytes(b'damaged')
+    cache = FingerprintCache(tmp_path)
+    assert cache.get(fingerprint) is None
+    cache.put(fingerprint, entry)
+    assert FingerprintCache(tmp_path).get(fingerprint) == entry
+    cache.remove(fingerprint)
+    assert FingerprintCache(tmp_path).get(fingerprint) is None
+
+    # entries whose classes have moved are read again
+    cache.put(fingerprint, entry)
+    for path in tmp_path.iterdir():
+        data = path.read_bytes()
+        path.write_bytes(data.replace(b'iolink.fingerprint', b'iolink.fingerprinx'))
+    assert FingerprintCache(tmp_path).get(fingerprint) is None
+
+
+def test_many_ports(tmp_path):
+    devices = [device(b'SN%04d' % n) for n in range(3)]
+    cache = FingerprintCache(tmp_path)
+    with PortManager('sim', [{'device': d} for d in devices]) as manager:
+        manager.change_device_state_to('PreOperate')
+        results = manager.identify_all(cache)
+        assert [r.value[0].port for r in results] == ['sim:0', 'sim:1', 'sim:2']
+        assert [r.value[0].serial_number for r in results] == [b'SN0000', b'SN0001', b'SN0002']
+        manager.identify_all(cache)
+    assert (cache.hits, cache.misses) == (3, 3)
@@ -0,0 +1,42 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the latency instrumentation against the simulated port."""
+
+from iolink.instrument import InstrumentedPort, LatencyHistogram, to_prometheus
+from iolink.interfaces.sim.sim import SimPort
+import iolink
+import pytest
+
+
+def test_histogram_precision():
+    histogram = LatencyHistogram(significant_bits=6)
+    for value in range(1, 100_001):
+        histogram.record(value)
+    assert histogram.count == 100_000
+    for percentile in (50, 90, 99, 99.9):
+        assert histogram.percentile(percentile) == pytest.approx(percentile * 1000, rel=1 / 32)
+    assert histogram.percentile(100) == 100_000
+
+
+def test_instrumented_port():
+    port = InstrumentedPort(SimPort(), name='sim0')
+    port.change_device_state_to('Operate')
+    for _ in range(100):
+        port.get_device_pd_input_and_status()
+    with pytest.raises(iolink.IsduError):
+        port.read_device_isdu(0x99, 0)
+    port.enabled = False
+    port.get_device_pd_input_and_status()
+
+    snapshot = port.snapshot()
+    assert snapshot['get_device_pd_input_and_status']['count'] == 100
+    assert snapshot['read_device_isdu']['errors'] == {'IsduError': 1}
+    text = to_prometheus([port])
+    assert 'iolink_call_duration_seconds_count{port="sim0",operation="get_device_pd_input_and_status"} 100' in text
+    assert 'iolink_call_errors_total{port="sim0",operation="read_device_isdu",error="IsduError"} 1' in text
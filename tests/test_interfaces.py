@@ -0,0 +1,48 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the registry of the interfaces."""
+
+from iolink.interfaces import InterfaceRegistry
+from iolink.interfaces.sim.sim import SimPort
+import iolink
+import pytest
+import subprocess
+import sys
+
+
+def test_import_loads_no_interfaces():
+    code = 'import iolink, sys; print(sorted(m for m in sys.modules if m.startswith("iolink.interfaces.")))'
+    output = subprocess.check_output([sys.executable, '-c', code], text=True)
+    assert output.strip() == '[]'
+
+
+def test_builtin_interfaces():
+    registry = InterfaceRegistry()
+    assert {'iqLink', 'sim', 'replay'} <= set(registry)
+    assert registry['sim'] is SimPort
+
+
+def test_registered_interface():
+    class LoggingSimPort(SimPort):
+        pass
+
+    iolink.misc.available_interfaces['logging-sim'] = LoggingSimPort
+    try:
+        with iolink.get_port('logging-sim') as port:
+            assert isinstance(port, LoggingSimPort)
+    finally:
+        del iolink.misc.available_interfaces['logging-sim']
+
+
+def test_missing_iqcomm_lib(monkeypatch):
+    from iolink.interfaces.iqlink import iqlink
+    monkeypatch.setattr(iqlink, '_iqcomm_lib', None)
+    monkeypatch.setattr(iqlink, '_find_iqcomm_lib', lambda: None)
+    with pytest.raises(FileNotFoundError):
+        iqlink.IqLinkPort()
@@ -0,0 +1,160 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the IODD codec with a cut down IODD of the PD42-1-1243-IOLINK."""
+
+import iolink
+from iolink.iodd import IoddDevice, load_iodd
+from iolink.interfaces.sim.sim import SimDevice
+import os
+import pytest
+import struct
+
+IODD = '''<?xml version="1.0" encoding="utf-8"?>
+<IODevice xmlns="http://www.io-link.com/IODD/2010/10" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <ProfileBody>
+    <DeviceIdentity vendorId="1018" vendorName="Analog Devices" deviceId="1243">
+      <DeviceName textId="TN_DeviceName" />
+    </DeviceIdentity>
+    <DeviceFunction>
+      <DatatypeCollection>
+        <Datatype id="DT_Current" xsi:type="IntegerT" bitLength="16" />
+      </DatatypeCollection>
+      <VariableCollection>
+        <StdVariableRef id="V_SystemCommand" />
+        <StdVariableRef id="V_ProductName" />
+        <Variable id="V_MicrostepResolution" index="64" accessRights="rw">
+          <Datatype xsi:type="UIntegerT" bitLength="8" />
+          <Name textId="TN_MicrostepResolution" />
+        </Variable>
+        <Variable id="V_StandbyCurrent" index="81" accessRights="rw">
+          <DatatypeRef datatypeId="DT_Current" />
+          <Name textId="TN_StandbyCurrent" />
+        </Variable>
+        <Variable id="V_InitializePosition" index="97" accessRights="rw">
+          <Datatype xsi:type="BooleanT" />
+          <Name textId="TN_InitializePosition" />
+        </Variable>
+      </VariableCollection>
+      <ProcessDataCollection>
+        <ProcessData id="PD_1">
+          <ProcessDataIn id="PD_In" bitLength="104">
+            <Datatype xsi:type="RecordT" bitLength="104">
+              <RecordItem subindex="1" bitOffset="72">
+                <SimpleDatatype xsi:type="IntegerT" bitLength="32" />
+                <Name textId="TN_ActualPosition" />
+              </RecordItem>
+              <RecordItem subindex="2" bitOffset="40">
+                <SimpleDatatype xsi:type="IntegerT" bitLength="32" />
+                <Name textId="TN_ActualVelocity" />
+              </RecordItem>
+              <RecordItem subindex="3" bitOffset="8">
+                <SimpleDatatype xsi:type="IntegerT" bitLength="32" />
+                <Name textId="TN_CustomData" />
+              </RecordItem>
+              <RecordItem subindex="4" bitOffset="1">
+                <SimpleDatatype xsi:type="BooleanT" />
+                <Name textId="TN_PositionReached" />
+              </RecordItem>
+              <RecordItem subindex="5" bitOffset="4">
+                <SimpleDatatype xsi:type="IntegerT" bitLength="3" />
+                <Name textId="TN_Trend" />
+              </RecordItem>
+            </Datatype>
+            <Name textId="TN_PDIn" />
+          </ProcessDataIn>
+          <ProcessDataOut id="PD_Out" bitLength="72">
+            <Datatype xsi:type="RecordT" bitLength="72">
+              <RecordItem subindex="1" bitOffset="40">
+                <SimpleDatatype xsi:type="IntegerT" bitLength="32" />
+                <Name textId="TN_TargetPosition" />
+              </RecordItem>
+              <RecordItem subindex="2" bitOffset="8">
+                <SimpleDatatype xsi:type="IntegerT" bitLength="32" />
+                <Name textId="TN_TargetVelocity" />
+              </RecordItem>
+              <RecordItem subindex="3" bitOffset="0">
+                <SimpleDatatype xsi:type="UIntegerT" bitLength="8" />
+                <Name textId="TN_Mode" />
+              </RecordItem>
+            </Datatype>
+            <Name textId="TN_PDOut" />
+          </ProcessDataOut>
+        </ProcessData>
+      </ProcessDataCollection>
+    </DeviceFunction>
+  </ProfileBody>
+  <ExternalTextCollection>
+    <PrimaryLanguage xml:lang="en">
+      <Text id="TN_DeviceName" value="PD42-1-1243-IOLINK" />
+      <Text id="TN_MicrostepResolution" value="Microstep Resolution" />
+      <Text id="TN_StandbyCurrent" value="Standby Current" />
+      <Text id="TN_InitializePosition" value="Initialize Position" />
+      <Text id="TN_ActualPosition" value="Actual Position" />
+      <Text id="TN_ActualVelocity" value="Actual Velocity" />
+      <Text id="TN_CustomData" value="Custom Data" />
+      <Text id="TN_PositionReached" value="Position Reached" />
+      <Text id="TN_Trend" value="Trend" />
+      <Text id="TN_TargetPosition" value="Target Position" />
+      <Text id="TN_TargetVelocity" value="Target Velocity" />
+      <Text id="TN_Mode" value="Mode" />
+      <Text id="TN_PDIn" value="Process Data In" />
+      <Text id="TN_PDOut" value="Process Data Out" />
+    </PrimaryLanguage>
+  </ExternalTextCollection>
+</IODevice>
+'''
+
+
+@pytest.fixture
+def iodd_file(tmp_path):
+    path = tmp_path / 'pd42-1-1243.xml'
+    path.write_text(IODD, encoding='utf8')
+    return str(path)
+
+
+def test_process_data(iodd_file):
+    descriptor = load_iodd(iodd_file)
+    assert descriptor.device_name == 'PD42-1-1243-IOLINK'
+    frame = struct.pack('>lllB', 51_200, -100, 24_000, 0b1101_0010)
+    assert descriptor.decode_pd_in(frame) == {
+        'Actual Position': 51_200,
+        'Actual Velocity': -100,
+        'Custom Data': 24_000,
+        'Position Reached': True,
+        'Trend': -3,
+    }
+    assert descriptor.encode_pd_out({'Target Position': 51_200}, Mode=1) == struct.pack('>llB', 51_200, 0, 1)
+
+    assert descriptor.decode_pd_in(b'') is None
+    with pytest.raises(ValueError, match='13 bytes, got 5'):
+        descriptor.decode_pd_in(frame[:5])
+
+
+def test_parameters(iodd_file):
+    descriptor = load_iodd(iodd_file)
+    device = SimDevice(parameters={0x40: bytes([8]), 0x51: bytes([0, 32]), 0x61: bytes([0])})
+    with iolink.get_port(interface='sim', device=device) as port:
+        port.change_device_state_to('PreOperate')
+        pd42 = IoddDevice(port, descriptor)
+        assert pd42.read_parameter('Product Name') == 'Simulated Device'
+        assert pd42.read_parameter('V_MicrostepResolution') == 8
+        pd42.write_parameter('Standby Current', 40)
+        assert pd42.read_parameter('Standby Current') == 40
+        pd42.write_parameter('Initialize Position', True)
+        assert pd42.read_parameter('Initialize Position') is True
+
+
+def test_compiled_cache(iodd_file, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = load_iodd(iodd_file, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    second = load_iodd(iodd_file, cache_dir=cache_dir)
+    assert second is not first
+    frame = struct.pack('>lllB', 1, 2, 3, 0x02)
+    assert second.decode_pd_in(frame) == first.decode_pd_in(frame)
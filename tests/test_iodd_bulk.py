@@ -0,0 +1,46 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the vectorized decoding of recorded process data against the single frame codec."""
+
+from iolink.iodd import Field, RecordCodec
+import pytest
+import struct
+
+np = pytest.importorskip('numpy')
+from iolink.iodd.bulk import decode_frames  # noqa: E402
+
+PD42_PD_IN = RecordCodec(104, [
+    Field('Actual Position', 'IntegerT', 72, 32, 1),
+    Field('Actual Velocity', 'IntegerT', 40, 32, 2),
+    Field('Custom Data', 'IntegerT', 8, 32, 3),
+    Field('Position Reached', 'BooleanT', 1, 1, 4),
+    Field('Trend', 'IntegerT', 4, 3, 5),
+    Field('Window', 'UIntegerT', 6, 10, 6),
+])
+
+
+def frames(count):
+    return [struct.pack('>lllB', n * 100, -n, n * n, n % 256) for n in range(count)]
+
+
+def test_decode_frames():
+    records = frames(300)
+    decoded = decode_frames(PD42_PD_IN, b''.join(records))
+    assert len(decoded) == 300
+    for record, row in zip(records, decoded):
+        expected = PD42_PD_IN.decode(record)
+        assert {name: row[name].item() for name in decoded.dtype.names} == expected
+
+
+def test_decode_columns_with_stride():
+    # e.g. a recording with a 3 byte header in front of every frame
+    records = [b'\xAA\xBB\xCC' + record for record in frames(10)]
+    columns = decode_frames(PD42_PD_IN, b''.join(records), offset=3, stride=16, columns=True)
+    assert list(columns['Actual Position']) == [n * 100 for n in range(10)]
+    assert list(columns['Position Reached']) == [bool(n & 0x2) for n in range(10)]
@@ -0,0 +1,198 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the ctypes layer of the iqLink port against the stub library in benchmarks."""
+
+from iolink import IsduError
+from iolink.interfaces.iqlink import iqlink
+import ctypes
+import os
+import pytest
+import shutil
+import subprocess
+import sys
+
+STUB_SOURCE = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'iqcomm_stub.c')
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32' or shutil.which('cc') is None,
+                                reason='needs a C compiler to build the stub library')
+
+
+@pytest.fixture(scope='module')
+def stub_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('iqcomm') / 'libiqcomm_stub.so')
+    subprocess.run(['cc', '-shared', '-fPIC', '-O2', '-o', path, STUB_SOURCE], check=True)
+    return path
+
+
+@pytest.fixture
+def stub(stub_path, monkeypatch):
+    monkeypatch.setenv('IOLINK_IQCOMM_LIB', stub_path)
+    monkeypatch.setattr(iqlink, '_iqcomm_lib', None)
+    monkeypatch.setattr(iqlink, '_iqcomm_functions', None)
+    lib = ctypes.cdll.LoadLibrary(stub_path)
+    ctypes.c_int.in_dll(lib, 'stub_connected').value = 1
+    return lib
+
+
+@pytest.fixture
+def port(stub):
+    port = iqlink.IqLinkPort()
+    port.change_device_state_to('Operate')
+    yield port
+    port.shut_down()
+
+
+def test_pd_loopback(port):
+    port.set_device_pd_output(bytes(range(13)))
+    assert port.get_device_pd_input_and_status() == (bytes(range(13)), 1)
+
+    buf = bytearray(16)
+    assert port.get_device_pd_input_into(buf) == (13, 1)
+    assert buf[:13] == bytes(range(13))
+
+
+def test_pd_output_must_be_bytes(port):
+    with pytest.raises(ValueError):
+        port.set_device_pd_output(bytearray(13))
+
+
+def test_lengths_are_not_truncated(port):
+    with pytest.raises(ValueError):
+        port.set_device_pd_output(bytes(33))
+    with pytest.raises(ValueError):
+        port.write_device_isdu(0x10, 0, bytes(65536 + 6))
+    with pytest.raises(ValueError):
+        port.start_isdu_request(0x10, 0, bytes(233))
+    with pytest.raises(ctypes.ArgumentError):
+        port.read_device_isdu(0x10, 1.0)
+
+
+def test_connection_errors(stub, port):
+    ctypes.c_int.in_dll(stub, 'stub_connected').value = 0
+    with pytest.raises(ConnectionError, match='Link lost'):
+        port.get_device_pd_input_and_status()
+    with pytest.raises(ConnectionError, match='Link lost'):
+        port.set_device_pd_output(bytes(13))
+    with pytest.raises(TimeoutError, match='Timeout'):
+        port.read_device_isdu(0x10, 0)
+
+
+def test_isdu(stub, port):
+    stub.stub_set_parameter(0x10, b'vendor', 6)
+    assert port.read_device_isdu(0x10, 0) == b'vendor'
+    port.write_device_isdu(0x10, 0, b'other')
+    assert port.read_device_isdu(0x10, 0) == b'other'
+    with pytest.raises(IsduError) as e:
+        port.read_device_isdu(0x20, 0)
+    assert e.value.error_code == 0x8011
+
+    results = port.read_device_isdu_many([(0x10, 0), (0x20, 0)])
+    assert results[0] == b'other'
+    assert isinstance(results[1], IsduError)
+    results = port.write_device_isdu_many([(0x10, 0, b'x'), (0x20, 0, b'y')])
+    assert results[0] is None
+    assert isinstance(results[1], IsduError)
+
+
+def calls(stub, name):
+    return ctypes.c_int.in_dll(stub, name).value
+
+
+def test_unchanged_pd_output_is_not_written_again(stub, port):
+    value_calls = calls(stub, 'stub_set_pd_value_calls')
+    validity_calls = calls(stub, 'stub_set_pd_validity_calls')
+    for _ in range(3):
+        port.set_device_pd_output(bytes(13))
+    assert calls(stub, 'stub_set_pd_value_calls') == value_calls + 1
+    assert calls(stub, 'stub_set_pd_validity_calls') == validity_calls + 1
+
+    port.set_device_pd_output_fields(4, b'\x01\x02')
+    assert port.get_device_pd_input_and_status() == (bytes(4) + b'\x01\x02' + bytes(7), 1)
+    assert calls(stub, 'stub_set_pd_value_calls') == value_calls + 2
+    assert calls(stub, 'stub_set_pd_validity_calls') == validity_calls + 1
+
+    port.invalidate_pd_output()
+    assert port.get_device_pd_input_and_status()[1] == 0
+    port.set_device_pd_output_fields(4, b'\x01\x02')
+    assert port.get_device_pd_input_and_status()[1] == 1
+    assert calls(stub, 'stub_set_pd_value_calls') == value_calls + 2
+    assert calls(stub, 'stub_set_pd_validity_calls') == validity_calls + 3
+
+
+def test_pd_output_is_written_again_after_errors(stub, port):
+    port.set_device_pd_output(bytes(13))
+    ctypes.c_int.in_dll(stub, 'stub_connected').value = 0
+    with pytest.raises(ConnectionError):
+        port.set_device_pd_output(bytes([1] * 13))
+    ctypes.c_int.in_dll(stub, 'stub_connected').value = 1
+    value_calls = calls(stub, 'stub_set_pd_value_calls')
+    port.set_device_pd_output(bytes(13))
+    assert calls(stub, 'stub_set_pd_value_calls') == value_calls + 1
+
+
+def test_pd_output_is_written_again_after_input_errors(stub, port):
+    port.set_device_pd_output(bytes(13))
+    ctypes.c_int.in_dll(stub, 'stub_connected').value = 0
+    with pytest.raises(ConnectionError):
+        port.get_device_pd_input_and_status()
+    ctypes.c_int.in_dll(stub, 'stub_connected').value = 1
+    value_calls = calls(stub, 'stub_set_pd_value_calls')
+    validity_calls = calls(stub, 'stub_set_pd_validity_calls')
+    port.set_device_pd_output(bytes(13))
+    assert calls(stub, 'stub_set_pd_value_calls') == value_calls + 1
+    assert calls(stub, 'stub_set_pd_validity_calls') == validity_calls + 1
+
+
+def test_isdu_into_buffers(stub, port):
+    stub.stub_set_parameter(0x10, b'vendor', 6)
+    buf = bytearray(16)
+    assert port.read_device_isdu_into(0x10, 0, memoryview(buf)[4:]) == 6
+    assert buf[4:10] == b'vendor'
+    port.write_device_isdu(0x10, 0, bytearray(b'abc'))
+    port.write_device_isdu(0x10, 0, memoryview(b'xyz'))
+    assert port.read_device_isdu(0x10, 0) == b'xyz'
+    results = port.write_device_isdu_many([(0x10, 0, bytearray(b'12'))])
+    assert results == [None]
+    assert port.read_device_isdu(0x10, 0) == b'12'
+
+
+def test_isdu_steps(stub, port):
+    stub.stub_set_parameter(0x10, b'vendor', 6)
+    port.start_isdu_request(0x10, 0)
+    assert port.poll_isdu_response()
+    assert port.get_isdu_response() == b'vendor'
+    port.start_isdu_request(0x10, 0, b'abc')
+    assert port.get_isdu_response() is None
+    assert port.read_device_isdu(0x10, 0) == b'abc'
+    port.start_isdu_request(0x20, 0)
+    with pytest.raises(IsduError):
+        port.get_isdu_response()
+    with pytest.raises(RuntimeError):
+        port.get_isdu_response()
+
+
+def test_device_identity_without_isdu(stub, port):
+    reads = calls(stub, 'stub_start_read_od_calls')
+    assert port.get_device_identity() == (0x0362, 0x000107, b'SN0042', 0x11, 0x0002)
+    assert calls(stub, 'stub_start_read_od_calls') == reads
+
+
+def test_reconnect_to_the_detected_master(stub):
+    com_port = ctypes.c_int.in_dll(stub, 'stub_com_port')
+    com_port.value = 5
+    connect_calls = calls(stub, 'stub_connect_calls')
+    try:
+        port = iqlink.IqLinkPort()
+    finally:
+        com_port.value = 0
+    # the driver detects the master on its own
+    assert calls(stub, 'stub_connect_calls') == connect_calls + 1
+    port.reconnect()
+    assert calls(stub, 'stub_last_connect_com_port') == 5
+    port.shut_down()
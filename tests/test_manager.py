@@ -0,0 +1,36 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the multi-port manager against simulated ports."""
+
+from iolink.manager import PortManager
+from iolink.interfaces.sim.sim import SimDevice
+import iolink
+import pytest
+
+
+def test_fan_out():
+    devices = [SimDevice(pd_in_length=1, serial_number='{:04}'.format(n).encode()) for n in range(8)]
+    with PortManager('sim', [{'device': device} for device in devices]) as manager:
+        manager.power_on()
+        manager.change_device_state_to('Operate')
+        serial_numbers = manager.read_isdu_all(0x15, 0)
+        assert [result.value for result in serial_numbers] == [b'%04d' % n for n in range(8)]
+        assert all(result.error is None for result in manager.get_pd_all())
+
+
+def test_per_port_errors():
+    with PortManager('sim', 2) as manager:
+        manager.change_device_state_to('PreOperate')
+        manager.ports[1].device.access[0x12] = 'wo'
+        first, second = manager.read_isdu_all(0x12, 0)
+        assert first.value == b'Simulated Device'
+        assert isinstance(second.error, iolink.IsduError)
+        manager.ports[1].device.unplug()
+        with pytest.raises(ConnectionError):
+            manager.change_device_state_to('Operate')
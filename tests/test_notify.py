@@ -0,0 +1,103 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the notifications of process data changes."""
+
+import iolink
+from iolink.cyclic import CyclicPdEngine
+from iolink.interfaces.sim.sim import SimDevice
+from iolink.notify import PdNotifier
+import pytest
+import queue
+
+
+@pytest.fixture
+def notifier():
+    with PdNotifier() as notifier:
+        yield notifier
+
+
+def values(changes):
+    return [change.value for change in changes]
+
+
+def test_bytes_and_bits(notifier):
+    byte_changes = []
+    bit_changes = []
+    notifier.subscribe_bytes(byte_changes.append, 1, 2)
+    notifier.subscribe_bits(bit_changes.append, 0, 4)
+    for frame in (b'\x00\x01\x02\x03', b'\x09\x01\x02\x03', b'\x09\x01\x05\x03', b'\x09\x01\x05\x0c'):
+        notifier.publish(frame, 0)
+    assert notifier.flush(timeout=2.0)
+    assert values(byte_changes) == [b'\x01\x02', b'\x01\x05']
+    assert byte_changes[1].previous == b'\x01\x02'
+    assert values(bit_changes) == [3, 12]
+
+
+def test_deadband(notifier):
+    changes = []
+    notifier.subscribe_value(changes.append, 0, '>h', deadband=10)
+    for value in (0, 5, -10, 11, 15, 22):
+        notifier.publish(value.to_bytes(2, 'big', signed=True), 0)
+    assert notifier.flush(timeout=2.0)
+    assert values(changes) == [0, 11, 22]
+
+
+def test_status_edges(notifier):
+    rising = queue.Queue()
+    both = []
+    notifier.subscribe_status(rising, 0x2)
+    notifier.subscribe_status(both.append, 0x2, edge='both')
+    for status in (0x1, 0x3, 0x3, 0x1, 0x3):
+        notifier.publish(b'\x00', status)
+    assert notifier.flush(timeout=2.0)
+    assert rising.qsize() == 2
+    assert rising.get_nowait().previous == 0
+    assert values(both) == [2, 0, 2]
+    with pytest.raises(ValueError):
+        notifier.subscribe_status(both.append, 0x2, edge='up')
+
+
+def test_late_subscription_and_cancel(notifier):
+    notifier.publish(b'\x01\x02', 0)
+    assert notifier.flush(timeout=2.0)
+    changes = []
+    subscription = notifier.subscribe_bytes(changes.append, 0, 1)
+    assert notifier.flush(timeout=2.0)
+    assert values(changes) == [b'\x01']
+    subscription.cancel()
+    notifier.publish(b'\x02\x02', 0)
+    assert notifier.flush(timeout=2.0)
+    assert values(changes) == [b'\x01']
+
+
+def test_failing_callback(notifier):
+    changes = []
+    notifier.subscribe_bytes(lambda change: 1 / 0, 0, 1)
+    notifier.subscribe_bytes(changes.append, 0, 1)
+    notifier.publish(b'\x01', 0)
+    assert notifier.flush(timeout=2.0)
+    assert notifier.callback_errors == 1
+    assert values(changes) == [b'\x01']
+
+
+class CounterDevice(SimDevice):
+    def on_cycle(self):
+        self.pd_in[1] = (self.cycle_count // 10) & 0xFF
+
+
+def test_cyclic_engine_listener(notifier):
+    changes = queue.Queue()
+    notifier.subscribe_bytes(changes, 1, 1)
+    with iolink.get_port(interface='sim', device=CounterDevice()) as port:
+        port.change_device_state_to('Operate')
+        with CyclicPdEngine(port, cycle_time=0.001, listener=notifier.publish):
+            first = changes.get(timeout=2.0)
+            second = changes.get(timeout=2.0)
+    assert second.cycle > first.cycle
+    assert second.value != first.value
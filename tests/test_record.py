@@ -0,0 +1,79 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test recording process data from the simulated port and playing it back."""
+
+import iolink
+from iolink.record import PdRecorder, PdRecordReader
+from iolink.interfaces.sim.sim import SimDevice
+from iolink.port import PortWrapper
+import pytest
+import time
+
+
+class CountingDevice(SimDevice):
+    def on_cycle(self):
+        self.pd_in[:] = (self.cycle_count % 65536).to_bytes(2, 'big')
+
+
+class BufferKeepingPort(PortWrapper):
+    def get_device_pd_input_into(self, buf):
+        self.buf = memoryview(buf)
+        return self.port.get_device_pd_input_into(buf)
+
+
+def record(path, frames, capacity):
+    with iolink.get_port(interface='sim', device=CountingDevice()) as port:
+        port.change_device_state_to('Operate')
+        with PdRecorder(path, pd_size=2, capacity=capacity) as recorder:
+            for _ in range(frames):
+                recorder.record(port)
+                time.sleep(0.0001)
+
+
+def test_record_and_read(tmp_path):
+    path = str(tmp_path / 'pd.rec')
+    record(path, 10, capacity=100)
+    with PdRecordReader(path) as reader:
+        records = reader.read()
+    assert [int.from_bytes(r.data, 'big') for r in records] == list(range(2, 12))
+    assert all(r.status == 1 for r in records)
+    assert all(a.timestamp_ns < b.timestamp_ns for a, b in zip(records, records[1:]))
+
+
+def test_recorder_closes_its_mapping(tmp_path):
+    path = str(tmp_path / 'pd.rec')
+    with pytest.raises(ValueError):
+        PdRecorder(path, pd_size=256)
+    with iolink.get_port('sim', device=CountingDevice()) as port:
+        port.change_device_state_to('Operate')
+        # like the iqLink port, it keeps the buffer it was given
+        port = BufferKeepingPort(port)
+        recorder = PdRecorder(path, pd_size=8, capacity=10)
+        recorder.record(port)
+        recorder.close()
+    assert recorder._mmap.closed
+
+
+def test_ring_wraps(tmp_path):
+    path = str(tmp_path / 'pd.rec')
+    record(path, 25, capacity=10)
+    with PdRecordReader(path) as reader:
+        assert reader.count == 25
+        records = reader.read(start=20)
+    assert [int.from_bytes(r.data, 'big') for r in records] == list(range(22, 27))
+
+
+def test_replay(tmp_path):
+    path = str(tmp_path / 'pd.rec')
+    record(path, 10, capacity=100)
+    with iolink.get_port(interface='replay', path=path, speed=0) as port:
+        frames = [port.get_device_pd_input_and_status() for _ in range(10)]
+        with pytest.raises(EOFError):
+            port.get_device_pd_input_and_status()
+    assert [int.from_bytes(data, 'big') for data, _ in frames] == list(range(2, 12))
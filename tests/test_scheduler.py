@@ -0,0 +1,97 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the scheduling of ISDU requests between the process data cycles against the simulated port."""
+
+import iolink
+from iolink import IsduError
+from iolink.interfaces.sim.sim import SimDevice
+from iolink.scheduler import BACKGROUND, URGENT, PortScheduler
+import pytest
+
+PARAMETERS = {0x40: b'\x00\x01', 0x41: b'\x00\x02', 0x42: b'\x00\x03'}
+
+
+@pytest.fixture
+def port():
+    with iolink.get_port('sim', device=SimDevice(parameters=PARAMETERS, isdu_latency=0.005)) as port:
+        port.change_device_state_to('Operate')
+        yield port
+
+
+def test_requests_run_in_order_of_priority_and_deadline(port):
+    scheduler = PortScheduler(port, cycle_time=0.001)
+    finished = []
+    futures = [scheduler.submit_read(0x40, 0),
+               scheduler.submit_read(0x41, 0, priority=URGENT),
+               scheduler.submit_read(0x42, 0, priority=BACKGROUND, deadline=10.0)]
+    for future in futures:
+        future.add_done_callback(finished.append)
+    assert scheduler.metrics().queue_depth == 3
+
+    with scheduler:
+        assert [future.result(2.0) for future in futures] == [b'\x00\x01', b'\x00\x02', b'\x00\x03']
+        scheduler.write_device_isdu(0x40, 0, b'\x00\x10', timeout=2.0)
+        assert scheduler.read_device_isdu(0x40, 0, timeout=2.0) == b'\x00\x10'
+    assert finished == [futures[1], futures[2], futures[0]]
+    # the process data kept being exchanged while the device worked on the requests
+    assert scheduler.cycles >= 5 * 5
+    metrics = scheduler.metrics()
+    assert metrics.completed == 5
+    assert metrics.failed == 0
+    assert metrics.max_queue_depth == 3
+    assert metrics.deadline_misses == 0
+
+
+def test_deadlines_and_errors(port):
+    scheduler = PortScheduler(port, cycle_time=0.001)
+    late = scheduler.submit_read(0x40, 0, deadline=0.0)
+    missing = scheduler.submit_read(0x99, 0, priority=URGENT)
+    with scheduler:
+        with pytest.raises(IsduError):
+            missing.result(2.0)
+        with pytest.raises(TimeoutError):
+            late.result(2.0)
+    assert scheduler.deadline_misses == 1
+    assert scheduler.completed == 0
+    assert scheduler.failed == 2
+    with pytest.raises(ValueError):
+        scheduler.submit_read(0x40, 0, priority=5)
+
+
+def test_pending_requests_fail_with_the_port(port):
+    scheduler = PortScheduler(port, cycle_time=0.001)
+    with scheduler:
+        port.device.unplug()
+        with pytest.raises(ConnectionError):
+            scheduler.submit_read(0x40, 0).result(2.0)
+    with pytest.raises(ConnectionError):
+        scheduler.submit_read(0x40, 0)
+
+
+def test_requests_after_stop_fail(port):
+    scheduler = PortScheduler(port, cycle_time=0.001)
+    with scheduler:
+        pass
+    with pytest.raises(ConnectionError):
+        scheduler.submit_read(0x40, 0)
+    assert scheduler.queue_depth == 0
+
+
+def test_invalid_request_fails_only_its_future(port, monkeypatch):
+    def write_parameter(index, subindex, data):
+        raise ValueError('invalid write')
+
+    monkeypatch.setattr(port.device, 'write_parameter', write_parameter)
+    scheduler = PortScheduler(port, cycle_time=0.001)
+    with scheduler:
+        with pytest.raises(ValueError):
+            scheduler.write_device_isdu(0x40, 0, b'\x00\x10', timeout=2.0)
+        assert scheduler.read_device_isdu(0x40, 0, timeout=2.0) == b'\x00\x01'
+        assert scheduler.error is None
+    assert scheduler.failed == 1
@@ -0,0 +1,110 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the simulated IO-Link port that doesn't need any hardware."""
+
+import iolink
+from tests.helpers import LoopbackDevice
+from iolink.interfaces.sim.sim import STATUS_PD_VALID
+from iolink.port import ISDU_ERR_ACCESS_DENIED, ISDU_ERR_LENGTH_OVERRUN
+import pytest
+
+
+@pytest.fixture
+def port():
+    device = LoopbackDevice(pd_in_length=4, pd_out_length=4, parameters={0x51: bytes([0, 32])})
+    with iolink.get_port(interface='sim', device=device) as port:
+        port.change_device_state_to('Operate')
+        yield port
+
+
+def test_process_data(port):
+    port.set_device_pd_output(bytes([1, 2, 3, 4]))
+    pd_in, status = port.get_device_pd_input_and_status()
+    assert pd_in == bytes([1, 2, 3, 4])
+    assert status & STATUS_PD_VALID
+
+
+def test_process_data_fields(port):
+    with pytest.raises(ValueError):
+        port.set_device_pd_output_fields(0, b'\x01')
+    port.set_device_pd_output(bytes([1, 2, 3, 4]))
+    port.set_device_pd_output_fields(1, b'\x05\x06')
+    assert port.device.pd_out == bytes([1, 5, 6, 4])
+    with pytest.raises(ValueError):
+        port.set_device_pd_output_fields(3, b'\x07\x08')
+
+    port.invalidate_pd_output()
+    assert not port.device.pd_out_valid
+    port.set_device_pd_output_fields(0, b'\x07')
+    assert port.device.pd_out == bytes([7, 5, 6, 4])
+    assert port.device.pd_out_valid
+
+
+def test_process_data_needs_operate(port):
+    port.change_device_state_to('PreOperate')
+    assert port.get_device_pd_input_and_status() == (b'', 0)
+
+
+def test_virtual_clock(port):
+    start = port.time
+    for _ in range(1000):
+        port.get_device_pd_input_and_status()
+    assert port.time - start == pytest.approx(1000 * port.cycle_time)
+    port.read_device_isdu(0x51, 0)
+    assert port.time - start == pytest.approx(1000 * port.cycle_time + port.device.isdu_latency)
+
+
+def test_isdu_parameter(port):
+    assert port.read_device_isdu(0x12, 0) == b'Simulated Device'
+    port.write_device_isdu(0x51, 0, bytes([0, 40]))
+    assert port.read_device_isdu(0x51, 0) == bytes([0, 40])
+    # Restore factory settings
+    port.write_device_isdu(0x02, 0, bytes([0x82]))
+    assert port.read_device_isdu(0x51, 0) == bytes([0, 32])
+
+
+def test_isdu_errors(port):
+    with pytest.raises(iolink.IsduError) as e:
+        port.write_device_isdu(0x12, 0, b'Other Device')
+    assert e.value.error_code == ISDU_ERR_ACCESS_DENIED
+    with pytest.raises(iolink.IsduError) as e:
+        port.write_device_isdu(0x51, 0, bytes([0, 0, 40]))
+    assert e.value.error_code == ISDU_ERR_LENGTH_OVERRUN
+    port.change_device_state_to('Inactive')
+    with pytest.raises(TimeoutError):
+        port.read_device_isdu(0x51, 0)
+
+
+def test_unplugged_device(port):
+    port.device.unplug()
+    with pytest.raises(ConnectionError):
+        port.get_device_pd_input_and_status()
+    port.device.plug()
+    port.change_device_state_to('Operate')
+    port.get_device_pd_input_and_status()
+
+
+def test_process_data_into_buffer(port):
+    buf = memoryview(bytearray(64))
+    port.set_device_pd_output(bytes([5, 6, 7, 8]))
+    n, status = port.get_device_pd_input_into(buf)
+    assert n == 4
+    assert buf[:n] == bytes([5, 6, 7, 8])
+    assert status & STATUS_PD_VALID
+
+
+def test_isdu_batches(port):
+    results = port.read_device_isdu_many([(0x12, 0), (0x02, 0), (0x51, 0)])
+    assert results[0] == b'Simulated Device'
+    assert results[1].error_code == ISDU_ERR_ACCESS_DENIED
+    assert results[2] == bytes([0, 32])
+    results = port.write_device_isdu_many([(0x51, 0, bytes([0, 1, 2])), (0x51, 0, bytes([0, 24]))])
+    assert results[0].error_code == ISDU_ERR_LENGTH_OVERRUN
+    assert results[1] is None
+    assert port.read_device_isdu(0x51, 0) == bytes([0, 24])
@@ -0,0 +1,93 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the recovery of supervised ports against the simulated port."""
+
+from iolink.interfaces.sim.sim import SimDevice, SimPort
+from iolink.supervisor import SupervisedPort, RUNNING, RECOVERING, FAILED, CLOSED
+import pytest
+
+
+@pytest.fixture
+def device():
+    return SimDevice(pd_in_length=2, pd_out_length=2, parameters={0x51: bytes([0, 32])})
+
+
+def supervised(device, **kwargs):
+    transitions = []
+    port = SupervisedPort(SimPort(device=device), initial_delay=0.001, max_delay=0.01,
+                          listener=transitions.append, **kwargs)
+    port.change_device_state_to('Operate')
+    return port, transitions
+
+
+def test_recovery_restores_the_device(device):
+    port, transitions = supervised(device)
+    port.set_device_pd_output(bytes([1, 2]))
+    port.write_device_isdu(0x51, 0, bytes([0, 64]))
+
+    device.unplug()
+    # a replaced device comes with its factory settings
+    device.on_system_command(0x82)
+    with pytest.raises(ConnectionError):
+        port.get_device_pd_input_and_status()
+    assert port.state == RECOVERING
+    with pytest.raises(ConnectionError):
+        port.read_device_isdu(0x51, 0)
+    port.set_device_pd_output_fields(1, bytes([3]))
+
+    device.plug()
+    assert port.wait_for_state(RUNNING, timeout=2.0)
+    assert device.state == 'OPERATE'
+    assert device.pd_out == bytes([1, 3])
+    assert device.pd_out_valid
+    assert port.read_device_isdu(0x51, 0) == bytes([0, 64])
+    assert [(t.previous, t.state) for t in transitions] == [(RUNNING, RECOVERING), (RECOVERING, RUNNING)]
+    assert isinstance(transitions[0].error, ConnectionError)
+    assert transitions[1].attempts >= 1
+
+    port.shut_down()
+    assert transitions[-1].state == CLOSED
+
+
+def test_recovery_gives_up(device):
+    port, transitions = supervised(device, max_attempts=3)
+    device.unplug()
+    with pytest.raises(ConnectionError):
+        port.get_device_pd_input_and_status()
+    assert port.wait_for_state(FAILED, timeout=2.0)
+    assert transitions[-1].attempts == 3
+
+    device.plug()
+    port.recover()
+    assert port.wait_for_state(RUNNING, timeout=2.0)
+    port.shut_down()
+
+
+def test_invalid_status_starts_recovery(device):
+    port, transitions = supervised(device, invalid_status_limit=3)
+    # the device fell back to PreOperate on its own
+    device.state = 'PREOPERATE'
+    for _ in range(3):
+        assert port.get_device_pd_input_and_status()[1] == 0
+    assert port.wait_for_state(RUNNING, timeout=2.0)
+    assert transitions[0].state == RECOVERING
+    assert device.state == 'OPERATE'
+    port.shut_down()
+
+
+def test_other_ports_keep_running(device):
+    port, _ = supervised(device)
+    other, _ = supervised(SimDevice())
+    device.unplug()
+    with pytest.raises(ConnectionError):
+        port.get_device_pd_input_and_status()
+    for _ in range(100):
+        assert other.get_device_pd_input_and_status()[1]
+    port.shut_down()
+    other.shut_down()
@@ -0,0 +1,85 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test the segmented transfer of large objects against the simulated port."""
+
+from iolink import IsduError
+from iolink.interfaces.sim.sim import SimDevice
+from iolink.transfer import read_isdu_object, read_isdu_segments, write_isdu_segments
+import io
+import iolink
+import pytest
+
+OBJECT_INDEX = 0x60
+OBJECT = bytes(n & 0xFF for n in range(1000))
+
+
+def segments(data, size=232):
+    return {(OBJECT_INDEX, 1 + n // size): data[n:n + size] for n in range(0, len(data), size)}
+
+
+@pytest.fixture
+def port():
+    with iolink.get_port('sim', device=SimDevice(parameters=segments(OBJECT))) as port:
+        port.change_device_state_to('PreOperate')
+        yield port
+
+
+def test_read_into_buffer(port):
+    buf = bytearray(len(OBJECT))
+    progress = []
+    assert read_isdu_segments(port, OBJECT_INDEX, buf, len(OBJECT),
+                              progress=lambda done, total: progress.append(done)) == len(OBJECT)
+    assert buf == OBJECT
+    assert progress == [232, 464, 696, 928, 1000]
+
+    with pytest.raises(ValueError):
+        read_isdu_segments(port, OBJECT_INDEX, bytearray(100), len(OBJECT))
+
+    # a shorter length ends the transfer in the middle of a segment
+    assert read_isdu_object(port, OBJECT_INDEX, 500) == OBJECT[:500]
+    buf = bytearray(500)
+    assert read_isdu_segments(port, OBJECT_INDEX, buf, 500) == 500
+    assert buf == OBJECT[:500]
+    f = io.BytesIO()
+    assert read_isdu_segments(port, OBJECT_INDEX, f, 500) == 500
+    assert f.getvalue() == OBJECT[:500]
+    with pytest.raises(IsduError):
+        read_isdu_object(port, OBJECT_INDEX, 2000)
+
+
+def test_read_unknown_length(port):
+    assert read_isdu_object(port, OBJECT_INDEX) == OBJECT
+    assert read_isdu_object(port, OBJECT_INDEX, len(OBJECT)) == OBJECT
+    f = io.BytesIO()
+    assert read_isdu_segments(port, OBJECT_INDEX, f) == len(OBJECT)
+    assert f.getvalue() == OBJECT
+    with pytest.raises(IsduError):
+        read_isdu_object(port, 0x99)
+
+
+def test_read_object_that_fills_its_last_segment():
+    data = OBJECT[:464]
+    with iolink.get_port('sim', device=SimDevice(parameters=segments(data))) as port:
+        port.change_device_state_to('PreOperate')
+        assert read_isdu_object(port, OBJECT_INDEX) == data
+
+
+def test_write(port):
+    data = bytes(reversed(OBJECT))
+    assert write_isdu_segments(port, OBJECT_INDEX, bytearray(data)) == len(data)
+    assert read_isdu_object(port, OBJECT_INDEX) == data
+
+    progress = []
+    assert write_isdu_segments(port, OBJECT_INDEX, io.BytesIO(OBJECT),
+                               progress=lambda done, total: progress.append((done, total))) == len(OBJECT)
+    assert progress[-1] == (len(OBJECT), None)
+    assert port.read_device_isdu(OBJECT_INDEX, 0) == OBJECT
+
+    with pytest.raises(ValueError):
+        write_isdu_segments(port, OBJECT_INDEX, data, segment_size=233)
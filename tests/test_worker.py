@@ -0,0 +1,96 @@
+################################################################################
+# Copyright © 2019 TRINAMIC Motion Control GmbH & Co. KG
+# (now owned by Analog Devices Inc.),
+#
+# Copyright © 2023 Analog Devices Inc. All Rights Reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+################################################################################
+
+"""Test ports that run in worker processes, against the simulated port."""
+
+from tests.helpers import LoopbackDevice, wait_for
+import iolink
+from iolink import IsduError
+from iolink.interfaces.sim.sim import SimDevice
+from iolink import worker as worker_module
+from iolink.worker import PortWorker
+import pytest
+
+
+class FragileDevice(SimDevice):
+    def on_cycle(self):
+        if self.cycle_count > 20:
+            self.unplug()
+
+
+@pytest.fixture(scope='module')
+def worker():
+    devices = [LoopbackDevice(parameters={0x51: bytes([0, 32])}), LoopbackDevice()]
+    with PortWorker('sim', [{'device': device} for device in devices], cycle_time=0.001) as worker:
+        for port in worker.ports:
+            port.change_device_state_to('Operate')
+        yield worker
+
+
+def test_process_data(worker):
+    first, second = worker.ports
+    first.set_device_pd_output(bytes([1, 2]))
+    second.set_device_pd_output(bytes([3, 4]))
+    wait_for(lambda: first.get_device_pd_input_and_status() == (bytes([1, 2]), 1))
+    wait_for(lambda: second.get_device_pd_input_and_status() == (bytes([3, 4]), 1))
+
+    buf = bytearray(8)
+    assert first.get_device_pd_input_into(buf) == (2, 1)
+    assert buf[:2] == bytes([1, 2])
+
+    snapshot = first.snapshot()
+    wait_for(lambda: first.snapshot().cycle > snapshot.cycle)
+
+
+def test_isdu(worker):
+    port = worker.ports[0]
+    port.write_device_isdu(0x51, 0, bytes([0, 64]))
+    assert port.read_device_isdu(0x51, 0) == bytes([0, 64])
+    with pytest.raises(IsduError) as e:
+        port.read_device_isdu(0x99, 0)
+    assert e.value.error_code == 0x8011
+    results = port.read_device_isdu_many([(0x51, 0), (0x99, 0)])
+    assert results[0] == bytes([0, 64])
+    assert isinstance(results[1], IsduError)
+    assert port.get_device_identity() == (0, 0, b'0000000000', 0x11, 0)
+
+
+def test_rejected_output():
+    device = LoopbackDevice(pd_in_length=2, pd_out_length=2)
+    with iolink.get_port('process', port_interface='sim', device=device) as port:
+        port.change_device_state_to('Operate')
+        port.set_device_pd_output(bytes([1, 2, 3]))
+        wait_for(lambda: port.output_error is not None)
+        assert isinstance(port.output_error, ValueError)
+        cycle = port.snapshot().cycle
+        wait_for(lambda: port.snapshot().cycle > cycle)
+
+        port.set_device_pd_output(bytes([4, 5]))
+        wait_for(lambda: port.get_device_pd_input_and_status() == (bytes([4, 5]), 1))
+        assert port.output_error is None
+
+
+def test_write_of_a_dead_worker(monkeypatch):
+    monkeypatch.setattr(worker_module, '_READ_TIMEOUT', 0.01)
+    slot = worker_module._Slot(bytearray(worker_module._Slot.size(8)), 0, 8)
+    # the sequence number stays odd when the worker dies while it writes the input
+    worker_module._SEQ.pack_into(slot.buf, slot.input, 1)
+    with pytest.raises(ConnectionError):
+        slot.read_input()
+
+
+def test_errors_of_the_cycle():
+    with iolink.get_port('process', port_interface='sim', device=FragileDevice()) as port:
+        port.change_device_state_to('Operate')
+        with pytest.raises(ConnectionError):
+            wait_for(lambda: port.get_device_pd_input_and_status() is None)
+
+
+def test_failing_port():
+    with pytest.raises(ValueError):
+        PortWorker('sim', [{'cycle_time': 0.0001}]).start()